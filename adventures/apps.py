@@ -13,3 +13,7 @@ from django.apps import AppConfig
 class AdventuresConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'adventures'
+
+    def ready(self):
+        # Connects the signals that bump the adventure catalog version.
+        from . import catalog  # noqa: F401
@@ -0,0 +1,21 @@
+"""
+File: catalog.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: In-memory catalog of adventures.
+Adventures are looked up by name on every start and detail request, so they are served from core.catalog
+and the catalog version is bumped whenever an adventure is saved or deleted.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from core.catalog import Catalog
+from .models import Adventure
+
+adventures = Catalog('adventures', Adventure, 'adventures.serializers.AdventureSerializer')
+
+
+@receiver(post_save, sender=Adventure)
+@receiver(post_delete, sender=Adventure)
+def adventure_changed(sender, **kwargs):
+    adventures.bump()
@@ -0,0 +1,32 @@
+"""
+File: settle_adventures.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Management command to settle finished adventures in bulk.
+Run it once (e.g. from cron) or with --loop as a long-running worker.
+"""
+
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from adventures.settlement import settle_expired
+
+
+class Command(BaseCommand):
+    help = "Settles every adventure past its deadline and stores the rewards for the players to collect."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help="Number of adventures settled per transaction.")
+        parser.add_argument('--loop', action='store_true', help="Keep running and settle adventures every --interval seconds.")
+        parser.add_argument('--interval', type=float, default=30, help="Seconds between runs when --loop is set.")
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            settled = settle_expired(chunk_size=options['chunk_size'])
+            if settled or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(f"Settled {settled} adventures."))
+
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
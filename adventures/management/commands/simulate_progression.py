@@ -0,0 +1,265 @@
+"""
+File: simulate_progression.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Management command to simulate player progression offline.
+A population of players is held in NumPy arrays and advanced one adventure at a time.
+Every player follows a strategy made of an adventure choice, a gear purchase order and a gambling rate,
+and the run reports time to level, the money distribution and how fast money enters and leaves the economy.
+Rewards, xp curves and gear bonuses come from the model formulas, so the numbers follow any change to them.
+"""
+
+import itertools
+import time
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from adventures.models import Adventure
+from gear.models import Gear
+from users.models import CustomUser
+from users.slots import machines
+from users.simulation import slot_changes
+
+ADVENTURE_CHOICES = ['highest', 'best_rate']
+GEAR_ORDERS = ['none', 'cheapest', 'xp', 'money', 'time']
+
+
+def parse_list(value, cast):
+    return [cast(item) for item in value.split(',') if item.strip()]
+
+
+class Command(BaseCommand):
+    help = "Simulates player progression over the adventure, gear and level formulas and reports time to level and inflation."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--players', type=int, default=30_000, help="Number of simulated players, split evenly between strategies.")
+        parser.add_argument('--rounds', type=int, default=2000, help="Adventures each player completes.")
+        parser.add_argument('--catalog', choices=['db', 'formulas'], default='db', help="Use the adventures and gear in the database, or generate them from the formulas.")
+        parser.add_argument('--max-level', type=int, default=30, help="Highest adventure level generated with --catalog formulas.")
+        parser.add_argument('--gear-costs', default='150,375,750,1500,3000,7500', help="Comma separated gear costs generated for every gear type with --catalog formulas.")
+        parser.add_argument('--adventure-choices', default=','.join(ADVENTURE_CHOICES), help=f"Comma separated adventure choices to simulate ({', '.join(ADVENTURE_CHOICES)}).")
+        parser.add_argument('--gear-orders', default=','.join(GEAR_ORDERS), help=f"Comma separated gear purchase orders to simulate ({', '.join(GEAR_ORDERS)}).")
+        parser.add_argument('--gamble-rates', default='0,0.1,0.5', help="Comma separated fractions of the balance bet on slots after every adventure.")
+        parser.add_argument('--machine', choices=list(machines), default='classic', help="Slot machine used for gambling.")
+        parser.add_argument('--target-levels', default='5,10,15,20,25', help="Comma separated levels reported in the time to level table.")
+        parser.add_argument('--seed', type=int, default=None, help="Seed for reproducible runs.")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        rng = np.random.default_rng(options['seed'])
+
+        adventures, gear = self.load_catalog(options)
+        if not adventures:
+            raise CommandError("There are no adventures to simulate, add some or use --catalog formulas.")
+
+        choices = parse_list(options['adventure_choices'], str)
+        orders = parse_list(options['gear_orders'], str)
+        rates = parse_list(options['gamble_rates'], float)
+        if not set(choices) <= set(ADVENTURE_CHOICES) or not set(orders) <= set(GEAR_ORDERS):
+            raise CommandError("Unknown adventure choice or gear order.")
+        if any(not 0 <= rate <= 1 for rate in rates):
+            raise CommandError("Gamble rates must be between 0 and 1.")
+
+        strategies = list(itertools.product(choices, orders, rates))
+        players = options['players']
+        if players < len(strategies):
+            raise CommandError(f"Need at least {len(strategies)} players, one per strategy.")
+        targets = parse_list(options['target_levels'], int)
+
+        result = self.simulate(rng, adventures, gear, strategies, players, options['rounds'], targets, machines[options['machine']])
+        self.report(strategies, targets, result)
+        self.stdout.write(f"Finished in {time.perf_counter() - started:.2f}s")
+
+    def load_catalog(self, options):
+        '''
+        Returns the adventures and gear to simulate as lists of unsaved or saved model instances.
+        '''
+
+        if options['catalog'] == 'db':
+            return list(Adventure.objects.order_by('required_level')), list(Gear.objects.all())
+
+        adventures = []
+        for level in range(1, options['max_level'] + 1):
+            adventure = Adventure(name=f"Level {level}", required_level=level)
+            adventure.scale_to_level()
+            adventures.append(adventure)
+
+        gear = []
+        for gear_type in ('weapon', 'armor', 'accessory'):
+            for cost in parse_list(options['gear_costs'], int):
+                item = Gear(name=f"{gear_type} {cost}", gear_type=gear_type, cost=cost)
+                item.scale_to_cost()
+                gear.append(item)
+        return adventures, gear
+
+    def adventure_tables(self, adventures, choices, max_level):
+        '''
+        Returns a (choice, level) table with the adventure each choice picks at each level, -1 if none is available.
+        '''
+
+        required = np.array([adventure.required_level for adventure in adventures])
+        expected_xp = np.array([(adventure.xp_min + adventure.xp_max) / 2 for adventure in adventures])
+        duration = np.array([max(adventure.time_to_complete, 1) for adventure in adventures])
+
+        table = np.full((len(choices), max_level + 1), -1, dtype=np.int64)
+        for level in range(max_level + 1):
+            available = np.flatnonzero(required <= level)
+            if not len(available):
+                continue
+            for row, choice in enumerate(choices):
+                if choice == 'highest':
+                    table[row, level] = available[np.argmax(required[available] * 1e9 + expected_xp[available])]
+                else:
+                    table[row, level] = available[np.argmax(expected_xp[available] / duration[available])]
+        return table
+
+    def gear_tables(self, gear, orders):
+        '''
+        Returns (order, position) tables of the gear index bought at each position of each order, -1 past the end.
+        '''
+
+        keys = {
+            'cheapest': lambda item: item.cost,
+            'xp': lambda item: -item.xp_bonus,
+            'money': lambda item: -item.money_bonus,
+            'time': lambda item: -item.time_bonus,
+        }
+        table = np.full((len(orders), len(gear) + 1), -1, dtype=np.int64)
+        for row, order in enumerate(orders):
+            if order == 'none':
+                continue
+            ranked = sorted(range(len(gear)), key=lambda i: (keys[order](gear[i]), gear[i].cost))
+            table[row, :len(ranked)] = ranked
+        return table
+
+    def simulate(self, rng, adventures, gear, strategies, players, rounds, targets, machine):
+        choices = sorted({choice for choice, _, _ in strategies}, key=ADVENTURE_CHOICES.index)
+        orders = sorted({order for _, order, _ in strategies}, key=GEAR_ORDERS.index)
+
+        strategy = np.arange(players) % len(strategies)
+        choice_of = np.array([choices.index(choice) for choice, _, _ in strategies])[strategy]
+        order_of = np.array([orders.index(order) for _, order, _ in strategies])[strategy]
+        rate_of = np.array([rate for _, _, rate in strategies])[strategy]
+
+        max_level = max(max(targets), max(adventure.required_level for adventure in adventures)) + 1
+        level_cap = max_level * 4
+        xp_needed = np.array([CustomUser(level=level).xp_needed if level else 0 for level in range(level_cap + 1)], dtype=np.int64)
+        adventure_table = self.adventure_tables(adventures, choices, max_level)
+        gear_table = self.gear_tables(gear, orders)
+
+        xp_min = np.array([adventure.xp_min for adventure in adventures])
+        xp_max = np.array([adventure.xp_max for adventure in adventures])
+        reward_min = np.array([adventure.reward_min for adventure in adventures])
+        reward_max = np.array([adventure.reward_max for adventure in adventures])
+        duration = np.array([adventure.time_to_complete for adventure in adventures], dtype=np.float64)
+
+        gear_cost = np.array([item.cost for item in gear] + [np.inf], dtype=np.float64)
+        gear_xp = np.array([item.xp_bonus for item in gear] + [0.0])
+        gear_money = np.array([item.money_bonus for item in gear] + [0.0])
+        gear_time = np.array([item.time_bonus for item in gear] + [0.0])
+
+        level = np.ones(players, dtype=np.int64)
+        xp = np.zeros(players, dtype=np.int64)
+        money = np.full(players, 100, dtype=np.int64)
+        xp_bonus = np.zeros(players)
+        money_bonus = np.zeros(players)
+        time_bonus = np.zeros(players)
+        next_gear = np.zeros(players, dtype=np.int64)
+        elapsed = np.zeros(players)
+
+        reached = np.full((players, len(targets)), np.nan)
+        target_levels = np.array(targets)
+        created = spent_gear = gambled = 0
+        checkpoints = sorted({rounds * step // 10 for step in range(1, 11)} - {0})
+        curve = []
+
+        for played in range(1, rounds + 1):
+            chosen = adventure_table[choice_of, np.minimum(level, max_level)]
+            active = chosen >= 0
+            chosen = np.where(active, chosen, 0)
+
+            # Rewards follow adventures.rewards.roll_rewards.
+            xp_reward = rng.integers(xp_min[chosen], xp_max[chosen] + 1).astype(np.float64)
+            money_reward = rng.integers(reward_min[chosen], reward_max[chosen] + 1).astype(np.float64)
+            critical = rng.integers(0, 101, size=players)
+            multiplier = np.select([critical < 5, critical < 10], [2.0, 1.5], 1.0)
+            xp_reward *= multiplier
+            money_reward *= multiplier
+            xp_reward = np.where(active, np.floor(xp_reward + np.floor(xp_reward * xp_bonus / 100)), 0).astype(np.int64)
+            money_reward = np.where(active, np.floor(money_reward + np.floor(money_reward * money_bonus / 100)), 0).astype(np.int64)
+
+            elapsed += np.where(active, np.floor(duration[chosen] * (1 - time_bonus / 100)), 0)
+            xp += xp_reward
+            money += money_reward
+            created += int(money_reward.sum())
+
+            while True:
+                leveling = (xp >= xp_needed[np.minimum(level, level_cap)]) & (level < level_cap)
+                if not leveling.any():
+                    break
+                xp -= np.where(leveling, xp_needed[np.minimum(level, level_cap)], 0)
+                level += leveling
+
+            newly = np.isnan(reached) & (level[:, None] >= target_levels[None, :])
+            reached[newly] = np.broadcast_to(elapsed[:, None], reached.shape)[newly]
+
+            bet = np.floor(money * rate_of).astype(np.int64)
+            gambling = np.flatnonzero(bet > 0)
+            if len(gambling):
+                change = slot_changes(rng, machine, bet[gambling], len(gambling))
+                money[gambling] += change
+                gambled += int(change.sum())
+
+            item = gear_table[order_of, next_gear]
+            buying = (item >= 0) & (money >= gear_cost[item])
+            if buying.any():
+                cost = np.where(buying, gear_cost[item], 0).astype(np.int64)
+                money -= cost
+                spent_gear += int(cost.sum())
+                xp_bonus = np.where(buying, np.maximum(xp_bonus, gear_xp[item]), xp_bonus)
+                money_bonus = np.where(buying, np.maximum(money_bonus, gear_money[item]), money_bonus)
+                time_bonus = np.where(buying, np.maximum(time_bonus, gear_time[item]), time_bonus)
+                next_gear += buying
+
+            if played in checkpoints:
+                curve.append((played, elapsed.mean() / 3600, money.mean(), created / players, spent_gear / players, gambled / players))
+
+        return {
+            'strategy': strategy,
+            'level': level,
+            'money': money,
+            'elapsed': elapsed,
+            'reached': reached,
+            'curve': curve,
+        }
+
+    def report(self, strategies, targets, result):
+        strategy = result['strategy']
+        hours = result['reached'] / 3600
+
+        self.stdout.write(self.style.MIGRATE_HEADING("Median hours to reach level (share of players that got there)"))
+        header = f"  {'adventure':<10} {'gear':<9} {'gamble':>6}" + "".join(f" {f'L{target}':>16}" for target in targets)
+        self.stdout.write(header)
+        for index, (choice, order, rate) in enumerate(strategies):
+            rows = strategy == index
+            cells = []
+            for column in range(len(targets)):
+                times = hours[rows, column]
+                share = np.count_nonzero(~np.isnan(times)) / len(times)
+                median = np.nanmedian(times) if share else float('nan')
+                cells.append(f" {median:>8.1f} ({share:>5.0%})")
+            self.stdout.write(f"  {choice:<10} {order:<9} {rate:>6.2f}" + "".join(cells))
+
+        self.stdout.write(self.style.MIGRATE_HEADING("Final money and level"))
+        self.stdout.write(f"  {'adventure':<10} {'gear':<9} {'gamble':>6} {'p10':>10} {'median':>10} {'p90':>10} {'mean':>10} {'level':>6}")
+        for index, (choice, order, rate) in enumerate(strategies):
+            rows = strategy == index
+            p10, median, p90 = np.percentile(result['money'][rows], [10, 50, 90])
+            self.stdout.write(
+                f"  {choice:<10} {order:<9} {rate:>6.2f} {p10:>10,.0f} {median:>10,.0f} {p90:>10,.0f} "
+                f"{result['money'][rows].mean():>10,.0f} {np.median(result['level'][rows]):>6.0f}"
+            )
+
+        self.stdout.write(self.style.MIGRATE_HEADING("Inflation (per player averages)"))
+        self.stdout.write(f"  {'round':>7} {'hours':>8} {'balance':>12} {'created':>12} {'gear sink':>12} {'gambling':>12}")
+        for played, hours_played, balance, created, spent_gear, gambled in result['curve']:
+            self.stdout.write(f"  {played:>7} {hours_played:>8.1f} {balance:>12,.0f} {created:>12,.0f} {-spent_gear:>12,.0f} {gambled:>12,.0f}")
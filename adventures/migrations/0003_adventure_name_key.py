@@ -0,0 +1,54 @@
+# Generated by Django 6.1.2 on 2026-10-17 04:20
+
+import re
+import unicodedata
+from django.db import migrations, models
+
+# Frozen copy of core.search.normalize as of this migration, so later changes to it do not alter what the migration does.
+APOSTROPHES = re.compile(r"['’`]")
+SEPARATORS = re.compile(r'[\W_]+')
+
+
+def normalize(name):
+    name = unicodedata.normalize('NFKD', str(name)).casefold()
+    name = ''.join(char for char in name if not unicodedata.combining(char))
+    name = APOSTROPHES.sub('', name)
+    return ' '.join(SEPARATORS.sub(' ', name).split())
+
+
+def populate_name_key(apps, schema_editor):
+    Adventure = apps.get_model('adventures', 'Adventure')
+
+    # Names that normalize to the same key as an earlier row get their id appended to the name itself,
+    # so the unique constraint can be added and saving the row again computes the same key.
+    seen = set()
+    rows = []
+    for row in Adventure.objects.only('pk', 'name').order_by('pk'):
+        while normalize(row.name) in seen:
+            row.name = f"{row.name} {row.pk}"
+        row.name_key = normalize(row.name)
+        seen.add(row.name_key)
+        rows.append(row)
+    Adventure.objects.bulk_update(rows, ['name', 'name_key'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adventures', '0002_alter_adventure_reward_max_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='adventure',
+            name='name_key',
+            field=models.CharField(default='', editable=False, max_length=255),
+            preserve_default=False,
+        ),
+        migrations.RunPython(populate_name_key, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='adventure',
+            name='name_key',
+            field=models.CharField(editable=False, max_length=255, unique=True),
+        ),
+    ]
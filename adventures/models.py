@@ -6,7 +6,9 @@ Description: Model for adventures in the bot.
 This model represents an adventure that can be completed by a user.
 """
 
+from django.core.exceptions import ValidationError
 from django.db import models
+from core.search import normalize
 
 class Adventure(models.Model):
     '''
@@ -18,6 +20,7 @@ class Adventure(models.Model):
     required_level = models.IntegerField(default=1)
     time_to_complete = models.BigIntegerField(default=1)
     name = models.CharField(max_length=255)
+    name_key = models.CharField(max_length=255, unique=True, editable=False)
     description = models.TextField()
     reward_min = models.BigIntegerField(default=0)
     reward_max = models.BigIntegerField(default=0)
@@ -26,7 +29,27 @@ class Adventure(models.Model):
 
     def save(self, *args, **kwargs):
         '''
-        Saves reward and xp values based on the required level.
+        Saves reward and xp values based on the required level, and the normalized name.
+        '''
+
+        self.scale_to_level()
+        self.name_key = normalize(self.name)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'name' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'name_key'}
+        super().save(*args, **kwargs)
+
+    def clean(self):
+        '''
+        Rejects a name that normalizes to the same key as another adventure's.
+        '''
+
+        if Adventure.objects.filter(name_key=normalize(self.name)).exclude(pk=self.pk).exists():
+            raise ValidationError({'name': "An adventure with this name already exists."})
+
+    def scale_to_level(self):
+        '''
+        Sets the reward, xp and time values from the required level.
         '''
 
         xp = int(30 * (1.2 ** (self.required_level - 0.5)))
@@ -39,8 +62,6 @@ class Adventure(models.Model):
 
         self.time_to_complete = int(25 * self.required_level ** 2 + 125)
 
-        super().save(*args, **kwargs)
-
     def __str__(self):
         return self.name
     def __repr__(self):
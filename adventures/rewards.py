@@ -0,0 +1,37 @@
+"""
+File: rewards.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Reward formulas for the Adventure app.
+This file contains the reward roll shared by the complete endpoint and the background settlement.
+"""
+
+import random
+
+
+def roll_rewards(adventure, xp_bonus=0, money_bonus=0):
+    '''
+    Rolls the xp and money rewards for completing an adventure.
+    Applies critical success multipliers and the user's gear bonuses (in percent).
+    Returns a tuple of (xp_reward, money_reward, message).
+    '''
+
+    xp_reward = random.randint(adventure.xp_min, adventure.xp_max)
+    money_reward = random.randint(adventure.reward_min, adventure.reward_max)
+
+    critical_success = random.randint(0, 100)
+    if critical_success < 5:
+        xp_reward *= 2
+        money_reward *= 2
+        message = "Critical success! Double rewards!"
+    elif critical_success < 10:
+        xp_reward *= 1.5
+        money_reward *= 1.5
+        message = "Success! Rewards increased by 50%!"
+    else:
+        message = "Adventure completed successfully!"
+
+    xp_reward += int(xp_reward * xp_bonus / 100)
+    money_reward += int(money_reward * money_bonus / 100)
+
+    return int(xp_reward), int(money_reward), message
@@ -10,7 +10,9 @@ Serializers for starting, checking status, and completing adventures.
 
 from rest_framework import serializers
 from .models import Adventure
-from users.models import CustomUser, CurrentAdventure
+from . import catalog
+from core.catalog import resolve_name
+from users.models import CustomUser, CurrentAdventure, AdventureResult
 
 class AdventureSerializer(serializers.ModelSerializer):
     '''
@@ -30,14 +32,7 @@ class AdventureDetailSerializer(serializers.Serializer):
     adventure_name = serializers.CharField(max_length=255)
 
     def validate(self, data):
-        adventure_name = data.get('adventure_name').title()
-
-        try:
-            adventure = Adventure.objects.get(name=adventure_name)
-        except Adventure.DoesNotExist:
-            raise serializers.ValidationError("Adventure does not exist.")
-        
-        data['adventure'] = adventure
+        data['adventure'] = resolve_name(catalog.adventures.current(), data.get('adventure_name'), "Adventure", fuzzy=True)
         return data
 
 
@@ -52,13 +47,9 @@ class AdventureStartSerializer(serializers.Serializer):
     adventure_name = serializers.CharField(max_length=255)
     
     def validate(self, data):
-        adventure_name = data.get('adventure_name').title()
         discord_id = data.get('discord_id')
 
-        try:
-            adventure = Adventure.objects.get(name=adventure_name)
-        except Adventure.DoesNotExist:
-            raise serializers.ValidationError("Adventure does not exist.")
+        adventure = resolve_name(catalog.adventures.current(), data.get('adventure_name'), "Adventure")
         
         self.user, created = CustomUser.objects.get_or_create(
             discord_id=discord_id,
@@ -75,6 +66,7 @@ class AdventureStartSerializer(serializers.Serializer):
         if self.user.level < adventure.required_level:
             raise serializers.ValidationError("User level is too low for this adventure.")
         
+        data['adventure'] = adventure
         return data
 
 class CurrentAdventureSerializer(serializers.ModelSerializer):
@@ -84,11 +76,24 @@ class CurrentAdventureSerializer(serializers.ModelSerializer):
     '''
 
     name = serializers.CharField(source='adventure.name')  
-    time_left = serializers.IntegerField()  
+    time_left = serializers.IntegerField(read_only=True)  
 
     class Meta:
         model = CurrentAdventure
-        fields = ['name', 'time_left']
+        fields = ['name', 'time_left', 'ends_at']
+
+class ActiveAdventureSerializer(serializers.ModelSerializer):
+    '''
+    Serializer for listing every active adventure.
+    This serializer is used by the bot to schedule completion notifications.
+    '''
+
+    discord_id = serializers.CharField(source='user.discord_id')
+    name = serializers.CharField(source='adventure.name')
+
+    class Meta:
+        model = CurrentAdventure
+        fields = ['discord_id', 'name', 'ends_at']
 
 class AdventureStatusSerializer(serializers.Serializer):
     '''
@@ -110,15 +115,20 @@ class AdventureStatusSerializer(serializers.Serializer):
             }
         )
 
-        if not CurrentAdventure.objects.filter(user=self.user).exists():
-            raise serializers.ValidationError("User is not on an adventure.")
+        self.current_adventure = CurrentAdventure.objects.select_related('adventure').filter(user=self.user).first()
+        self.has_result = False
+        if not self.current_adventure:
+            self.has_result = AdventureResult.objects.filter(user=self.user).exists()
+            if not self.has_result:
+                raise serializers.ValidationError("User is not on an adventure.")
     
         return data
             
 class AdventureCompleteSerializer(serializers.Serializer):
     '''
     Serializer for completing an adventure.
-    Validates the user and checks if the user is on an adventure.
+    Validates the user, checks if the user is on an adventure and that the adventure has reached its deadline.
+    If the adventure was already settled in the background, the oldest uncollected result is returned instead.
     '''
 
     discord_id = serializers.CharField(max_length=255)
@@ -135,8 +145,16 @@ class AdventureCompleteSerializer(serializers.Serializer):
             }
         )
 
-        if not CurrentAdventure.objects.filter(user=self.user).exists():
+        self.result = AdventureResult.objects.select_related('adventure').filter(user=self.user).order_by('completed_at').first()
+        if self.result:
+            return data
+
+        self.current_adventure = CurrentAdventure.objects.select_related('adventure').filter(user=self.user).first()
+        if not self.current_adventure:
             raise serializers.ValidationError("User is not on an adventure.")
+
+        if not self.current_adventure.is_complete:
+            raise serializers.ValidationError("Adventure is not complete yet.")
     
         return data
 
@@ -0,0 +1,96 @@
+"""
+File: settlement.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Background settlement for the Adventure app.
+This file contains the engine that settles every adventure past its deadline in bulk.
+Rewards are rolled with the same formulas as the complete endpoint, applied with one bulk update per chunk,
+and stored as AdventureResult rows the user collects later.
+"""
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from users.models import CustomUser, CurrentAdventure, AdventureResult
+from users import ledger, leveling
+from .rewards import roll_rewards
+
+
+class ChunkChanged(Exception):
+    '''
+    Raised when a chunk was changed by a concurrent completion while it was being settled.
+    '''
+
+
+def settle_chunk(now, chunk_size):
+    '''
+    Settles up to chunk_size adventures that ended at or before now, in a single transaction.
+    Returns the number of adventures settled.
+    '''
+
+    with transaction.atomic():
+        current_adventures = list(
+            CurrentAdventure.objects
+            .select_related('user', 'adventure')
+            .filter(ends_at__lte=now)
+            .order_by('ends_at')[:chunk_size]
+        )
+        if not current_adventures:
+            return 0
+
+        # Deleting first takes the write lock, if a row is already gone it was completed
+        # concurrently and the chunk is rolled back and read again.
+        deleted, per_model = CurrentAdventure.objects.filter(pk__in=[current_adventure.pk for current_adventure in current_adventures]).delete()
+        if per_model.get(CurrentAdventure._meta.label, 0) != len(current_adventures):
+            raise ChunkChanged()
+
+        users = []
+        results = []
+        changes = []
+        for current_adventure in current_adventures:
+            user = current_adventure.user
+            xp_reward, money_reward, message = roll_rewards(current_adventure.adventure, user.best_xp_bonus, user.best_money_bonus)
+
+            user.xp = F('xp') + xp_reward
+            user.total_xp = F('total_xp') + xp_reward
+            user.money = F('money') + money_reward
+            users.append(user)
+            changes.append((user.pk, money_reward, xp_reward))
+            results.append(AdventureResult(
+                user=user,
+                adventure=current_adventure.adventure,
+                xp_reward=xp_reward,
+                money_reward=money_reward,
+                message=message,
+                completed_at=current_adventure.ends_at,
+            ))
+
+        CustomUser.objects.bulk_update(users, ['xp', 'total_xp', 'money'])
+        AdventureResult.objects.bulk_create(results)
+        ledger.record_many(changes, 'adventure')
+
+        if settings.AUTO_LEVEL_UP:
+            leveling.level_up_users([user.pk for user in users])
+
+    return len(current_adventures)
+
+
+def settle_expired(chunk_size=500, now=None):
+    '''
+    Settles every adventure that ended at or before now, chunk_size at a time.
+    Returns the total number of adventures settled.
+    '''
+
+    now = now or timezone.now()
+    settled = 0
+
+    while True:
+        try:
+            count = settle_chunk(now, chunk_size)
+        except ChunkChanged:
+            continue
+
+        settled += count
+        if count < chunk_size:
+            return settled
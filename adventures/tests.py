@@ -1,3 +1,312 @@
-from django.test import TestCase
+"""
+File: tests.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Unit tests for the Adventures app.
+This file contains tests for starting, checking the status of, and completing adventures.
+"""
 
-# Create your tests here.
+
+
+from datetime import timedelta
+from importlib import import_module
+from io import StringIO
+from django.apps import apps
+from django.core.management import call_command
+from django.core.exceptions import ValidationError
+from django.core.management.base import CommandError
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from core.models import CatalogVersion
+from users.models import CustomUser, CurrentAdventure, AdventureResult
+from users import progression
+from .models import Adventure
+from . import catalog
+
+name_key_migration = import_module('adventures.migrations.0003_adventure_name_key')
+
+class AdventureViewsTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create(discord_id="12345", username="TestUser")
+        self.adventure = Adventure.objects.create(name="Test Adventure", description="A test adventure.", required_level=1)
+
+    def test_start_adventure_sets_deadline(self):
+        '''
+        Test that starting an adventure stores an absolute deadline.
+        '''
+        before = timezone.now()
+        response = self.client.post('/adventures/start/', {"discord_id": self.user.discord_id, "adventure_name": self.adventure.name}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['time_left'], self.adventure.time_to_complete)
+
+        current_adventure = CurrentAdventure.objects.get(user=self.user)
+        self.assertGreaterEqual(current_adventure.ends_at, before + timedelta(seconds=self.adventure.time_to_complete))
+
+    def test_start_adventure_requires_name(self):
+        '''
+        Test that a missing adventure_name is reported by the serializer instead of failing the request.
+        '''
+        response = self.client.post('/adventures/start/', {"discord_id": self.user.discord_id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('adventure_name', response.data)
+        self.assertFalse(CurrentAdventure.objects.filter(user=self.user).exists())
+
+    def test_status_is_read_only(self):
+        '''
+        Test that checking the status computes the time left without writing to the database.
+        '''
+        ends_at = timezone.now() + timedelta(seconds=100)
+        CurrentAdventure.objects.create(user=self.user, adventure=self.adventure, ends_at=ends_at)
+
+        for _ in range(2):
+            with self.assertNumQueries(2):
+                response = self.client.post('/adventures/status/', {"discord_id": self.user.discord_id}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertIn(response.data['time_left'], (99, 100))
+        self.assertEqual(CurrentAdventure.objects.get(user=self.user).ends_at, ends_at)
+
+    def test_status_complete(self):
+        '''
+        Test that the status reports completion once the deadline has passed.
+        '''
+        CurrentAdventure.objects.create(user=self.user, adventure=self.adventure, ends_at=timezone.now() - timedelta(seconds=1))
+        response = self.client.post('/adventures/status/', {"discord_id": self.user.discord_id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['complete'])
+
+    def test_complete_before_deadline(self):
+        '''
+        Test that an adventure cannot be completed before its deadline.
+        '''
+        CurrentAdventure.objects.create(user=self.user, adventure=self.adventure, ends_at=timezone.now() + timedelta(seconds=100))
+        response = self.client.post('/adventures/complete/', {"discord_id": self.user.discord_id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue(CurrentAdventure.objects.filter(user=self.user).exists())
+
+    def test_complete_after_deadline(self):
+        '''
+        Test that completing a finished adventure rewards the user and removes the adventure.
+        '''
+        CurrentAdventure.objects.create(user=self.user, adventure=self.adventure, ends_at=timezone.now() - timedelta(seconds=1))
+        response = self.client.post('/adventures/complete/', {"discord_id": self.user.discord_id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data['settled'])
+        self.assertFalse(CurrentAdventure.objects.filter(user=self.user).exists())
+        self.user.refresh_from_db()
+        self.assertGreaterEqual(self.user.xp, self.adventure.xp_min)
+        self.assertGreaterEqual(self.user.money, 100 + self.adventure.reward_min)
+
+    def test_active_adventures(self):
+        '''
+        Test that the ActiveAdventuresView lists every active adventure with its deadline.
+        '''
+        ends_at = timezone.now() + timedelta(seconds=100)
+        CurrentAdventure.objects.create(user=self.user, adventure=self.adventure, ends_at=ends_at)
+        with self.assertNumQueries(1):
+            response = self.client.get('/adventures/active/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]['discord_id'], self.user.discord_id)
+        self.assertEqual(response.data[0]['name'], self.adventure.name)
+        self.assertIsNotNone(response.data[0]['ends_at'])
+
+class SettlementTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.adventure = Adventure.objects.create(name="Test Adventure", description="A test adventure.", required_level=1)
+        self.finished_users = [CustomUser.objects.create(discord_id=str(i), username=f"User{i}") for i in range(3)]
+        self.busy_user = CustomUser.objects.create(discord_id="busy", username="BusyUser")
+
+        for user in self.finished_users:
+            CurrentAdventure.objects.create(user=user, adventure=self.adventure, ends_at=timezone.now() - timedelta(seconds=1))
+        CurrentAdventure.objects.create(user=self.busy_user, adventure=self.adventure, ends_at=timezone.now() + timedelta(seconds=100))
+
+    def test_settle_adventures_command(self):
+        '''
+        Test that the settle_adventures command settles only finished adventures and stores their results.
+        '''
+        call_command('settle_adventures', '--chunk-size', '2', stdout=StringIO())
+
+        self.assertEqual(CurrentAdventure.objects.count(), 1)
+        self.assertTrue(CurrentAdventure.objects.filter(user=self.busy_user).exists())
+        self.assertEqual(AdventureResult.objects.count(), 3)
+
+        for user in self.finished_users:
+            user.refresh_from_db()
+            result = AdventureResult.objects.get(user=user)
+            self.assertEqual(user.xp, result.xp_reward)
+            self.assertEqual(user.money, 100 + result.money_reward)
+
+    @override_settings(AUTO_LEVEL_UP=True)
+    def test_settlement_auto_level_up(self):
+        '''
+        Test that settlement spends the rewarded xp on levels when AUTO_LEVEL_UP is on.
+        '''
+        user = self.finished_users[0]
+        CustomUser.objects.filter(pk=user.pk).update(xp=100)
+        call_command('settle_adventures', stdout=StringIO())
+
+        user.refresh_from_db()
+        result = AdventureResult.objects.get(user=user)
+        self.assertEqual((user.level, user.xp), progression.level_for(1, 100 + result.xp_reward))
+        self.assertGreater(user.level, 1)
+
+    def test_collect_settled_result(self):
+        '''
+        Test that a settled adventure is reported as complete and collected through the complete endpoint.
+        '''
+        call_command('settle_adventures', stdout=StringIO())
+        user = self.finished_users[0]
+        result = AdventureResult.objects.get(user=user)
+
+        response = self.client.post('/adventures/status/', {"discord_id": user.discord_id}, format='json')
+        self.assertTrue(response.data['complete'])
+
+        response = self.client.post('/adventures/complete/', {"discord_id": user.discord_id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['xp_reward'], result.xp_reward)
+        self.assertTrue(response.data['settled'])
+        self.assertFalse(AdventureResult.objects.filter(user=user).exists())
+
+        user.refresh_from_db()
+        self.assertEqual(user.xp, result.xp_reward)
+
+        response = self.client.post('/adventures/complete/', {"discord_id": user.discord_id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+class AdventureCatalogTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.adventure = Adventure.objects.create(name="Test Adventure", description="A test adventure.", required_level=1)
+        catalog.adventures.clear()
+
+    def test_find_ignores_case_and_whitespace(self):
+        '''
+        Test that adventures are found by name regardless of case and extra whitespace.
+        '''
+        self.assertEqual(catalog.adventures.find("  test   ADVENTURE "), self.adventure)
+        self.assertIsNone(catalog.adventures.find("Missing Adventure"))
+
+    @override_settings(CATALOG_CHECK_INTERVAL=60)
+    def test_reads_served_from_memory(self):
+        '''
+        Test that once loaded, the adventure list and detail endpoints do not query the database.
+        '''
+        catalog.adventures.all()
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/adventures/list/')
+            detail = self.client.generic('GET', '/adventures/detail/', '{"adventure_name": "test adventure"}', content_type='application/json')
+        self.assertEqual(response.data[0]['name'], self.adventure.name)
+        self.assertEqual(detail.data['time_to_complete'], self.adventure.time_to_complete)
+
+    @override_settings(CATALOG_CHECK_INTERVAL=0)
+    def test_list_returns_not_modified(self):
+        '''
+        Test that the adventure list is answered with a 304 for a matching ETag and changes ETag after an edit.
+        '''
+        response = self.client.get('/adventures/list/')
+        etag = response['ETag']
+        self.assertIn('max-age', response['Cache-Control'])
+
+        # Only the catalog version is checked.
+        with self.assertNumQueries(1):
+            response = self.client.get('/adventures/list/', HTTP_IF_NONE_MATCH=f'W/{etag}')
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.adventure.description = "An edited adventure."
+        self.adventure.save()
+        response = self.client.get('/adventures/list/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]['description'], "An edited adventure.")
+
+    def test_search_and_typo_resolution(self):
+        '''
+        Test the search endpoint and that typos resolve for details but only suggest names when starting.
+        '''
+        response = self.client.get('/adventures/search/', {"q": "test advnture"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['name'], self.adventure.name)
+        self.assertEqual(response.data['results'][0]['match'], 'fuzzy')
+        self.assertEqual(self.client.get('/adventures/search/').status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.generic('GET', '/adventures/detail/', '{"adventure_name": "test advnture"}', content_type='application/json')
+        self.assertEqual(response.data['name'], self.adventure.name)
+
+        user = CustomUser.objects.create(discord_id="12345", username="TestUser")
+        response = self.client.post('/adventures/start/', {"discord_id": user.discord_id, "adventure_name": "test advnture"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['non_field_errors'][0], "Adventure does not exist. Did you mean Test Adventure?")
+
+    def test_duplicate_name_is_rejected(self):
+        '''
+        Test that a name normalizing to an existing adventure's key fails validation.
+        '''
+        duplicate = Adventure(name="TEST  adventure", description="A copy.")
+        with self.assertRaises(ValidationError):
+            duplicate.full_clean()
+
+    def test_name_key_migration_renames_duplicates(self):
+        '''
+        Test that the name_key backfill renames rows whose names collide, so saving them again keeps the same key.
+        '''
+        Adventure.objects.bulk_create([Adventure(name="test  ADVENTURE", name_key="placeholder", description="A copy.")])
+        name_key_migration.populate_name_key(apps, None)
+
+        duplicate = Adventure.objects.exclude(pk=self.adventure.pk).get()
+        self.assertEqual(duplicate.name, f"test  ADVENTURE {duplicate.pk}")
+        self.assertEqual(duplicate.name_key, f"test adventure {duplicate.pk}")
+        duplicate.save()
+        self.assertEqual(Adventure.objects.get(pk=duplicate.pk).name_key, f"test adventure {duplicate.pk}")
+        self.assertEqual(Adventure.objects.get(pk=self.adventure.pk).name_key, "test adventure")
+
+    @override_settings(CATALOG_CHECK_INTERVAL=60)
+    def test_save_and_delete_bump_version(self):
+        '''
+        Test that saving or deleting an adventure bumps the catalog version and reloads the catalog.
+        '''
+        version = catalog.adventures.current().version
+        self.adventure.required_level = 3
+        self.adventure.save()
+        self.assertEqual(CatalogVersion.objects.get(name='adventures').version, version + 1)
+        self.assertEqual(catalog.adventures.get(self.adventure.pk).required_level, 3)
+
+        self.adventure.delete()
+        self.assertIsNone(catalog.adventures.find(self.adventure.name))
+        self.assertEqual(self.client.get('/adventures/list/').data, [])
+
+    @override_settings(CATALOG_CHECK_INTERVAL=0)
+    def test_version_bumped_elsewhere_reloads(self):
+        '''
+        Test that a version bumped by another process makes this process reload the catalog.
+        '''
+        catalog.adventures.all()
+        Adventure.objects.filter(pk=self.adventure.pk).update(name="Renamed Adventure", name_key="renamed adventure")
+        self.assertIsNotNone(catalog.adventures.find(self.adventure.name))
+
+        CatalogVersion.objects.filter(name='adventures').update(version=F('version') + 1)
+        self.assertIsNone(catalog.adventures.find(self.adventure.name))
+        self.assertEqual(catalog.adventures.find("renamed adventure").pk, self.adventure.pk)
+
+class SimulateProgressionTestCase(TestCase):
+    def test_simulate_progression_from_formulas(self):
+        '''
+        Test that the progression simulator runs over generated adventures and gear and reports every section.
+        '''
+        out = StringIO()
+        call_command('simulate_progression', '--catalog', 'formulas', '--max-level', '5', '--players', '60', '--rounds', '50', '--target-levels', '2,3', '--seed', '1', stdout=out)
+        output = out.getvalue()
+        self.assertIn("Median hours to reach level", output)
+        self.assertIn("Final money and level", output)
+        self.assertIn("Inflation", output)
+
+    def test_simulate_progression_needs_adventures(self):
+        '''
+        Test that simulating the database catalog without adventures is an error.
+        '''
+        with self.assertRaises(CommandError):
+            call_command('simulate_progression', '--players', '60', '--rounds', '5', stdout=StringIO())
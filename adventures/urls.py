@@ -14,6 +14,8 @@ urlpatterns = [
     path('list/', views.GetAdventuresView.as_view(), name='get_adventures'),
     path('start/', views.StartAdventureView.as_view(), name='start_adventure'),
     path('status/', views.AdventureStatusView.as_view(), name='adventure_status'),
+    path('active/', views.ActiveAdventuresView.as_view(), name='active_adventures'),
     path('complete/', views.CompleteAdventureView.as_view(), name='complete_adventure'),
     path('detail/', views.GetSpecificAdventureView.as_view(), name='get_specific_adventure'),
+    path('search/', views.SearchAdventuresView.as_view(), name='search_adventures'),
 ]
\ No newline at end of file
@@ -10,12 +10,17 @@ checking the status of an adventure, and completing an adventure.
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from .models import Adventure
 from . import serializers as cereal
-from gear.serializers import BestGearSerializer, ShopListSerializer
-from users.models import CurrentAdventure
+from . import catalog
+from .rewards import roll_rewards
+from users.models import CurrentAdventure, AdventureResult
+from users import leveling, wallet
+from core.conditional import conditional_response
+from core.views import CatalogSearchView
+from django.conf import settings
+from django.db import transaction
 from django.utils import timezone
-import random
+from datetime import timedelta
 
 class GetAdventuresView(APIView):
     '''
@@ -23,11 +28,16 @@ class GetAdventuresView(APIView):
     '''
 
     def get(self, request):
-        serializer = cereal.AdventureSerializer
-        adventures = Adventure.objects.all()
-        serialized_adventures = serializer(adventures, many=True)
-        return Response(serialized_adventures.data, status=status.HTTP_200_OK)
+        snapshot = catalog.adventures.current()
+        return conditional_response(request, snapshot.etag, snapshot.serialized, max_age=settings.CATALOG_CHECK_INTERVAL)
     
+class SearchAdventuresView(CatalogSearchView):
+    '''
+    View to search adventures by name, see CatalogSearchView.
+    '''
+
+    catalog = catalog.adventures
+
 class GetSpecificAdventureView(APIView):
     '''
     View to get a specific adventure by name.
@@ -35,10 +45,6 @@ class GetSpecificAdventureView(APIView):
     '''
 
     def get(self, request):
-        adventure_name = request.data.get('adventure_name').title()
-        if not adventure_name:
-            return Response({"error": "adventure_name is required"}, status=status.HTTP_400_BAD_REQUEST)
-        
         serializer = cereal.AdventureDetailSerializer(data=request.data)
         
         if serializer.is_valid():
@@ -57,43 +63,40 @@ class StartAdventureView(APIView):
     '''
 
     def post(self, request):
-        discord_id = request.data.get('discord_id')
-        adventure_name = request.data.get('adventure_name').title()
-
-        if not discord_id or not adventure_name:
-            return Response({"error": "discord_id and adventure_name are required"}, status=status.HTTP_400_BAD_REQUEST)
-
         serializer = cereal.AdventureStartSerializer(data=request.data)
         
         if serializer.is_valid():
             user = serializer.user
-            adventure = Adventure.objects.get(name=adventure_name)
-
-            best_gear = BestGearSerializer(data=request.data)
-            if best_gear.is_valid():
-                best_gear_time = best_gear.validated_data.get('best_gear_time', None)
-                if best_gear_time:
-                    time_gear = ShopListSerializer(best_gear_time)
-                    time_bonus = time_gear.data.get('time_bonus', 0)
-                else:
-                    time_bonus = 0
-
-                time_left = adventure.time_to_complete - (adventure.time_to_complete * time_bonus / 100)
-            else:
-                time_left = adventure.time_to_complete  
+            adventure = serializer.validated_data['adventure']
+
+            time_left = adventure.time_to_complete - (adventure.time_to_complete * user.best_time_bonus / 100)
+            ends_at = timezone.now() + timedelta(seconds=int(time_left))
 
-            current_adventure = CurrentAdventure.objects.create(user=user, adventure=adventure, time_left=time_left)
+            current_adventure = CurrentAdventure.objects.create(user=user, adventure=adventure, ends_at=ends_at)
             current_adventure_serializer = cereal.CurrentAdventureSerializer(current_adventure)
 
             return Response(current_adventure_serializer.data, status=status.HTTP_201_CREATED)
         else:
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
+class ActiveAdventuresView(APIView):
+    '''
+    View to list every active adventure with its deadline.
+    The bot uses this on startup to schedule completion notifications.
+    '''
+
+    def get(self, request):
+        current_adventures = CurrentAdventure.objects.select_related('user', 'adventure').only(
+            'ends_at', 'user__discord_id', 'adventure__name'
+        ).order_by('ends_at')
+        serializer = cereal.ActiveAdventureSerializer(current_adventures, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
 class AdventureStatusView(APIView):
     '''
     View to check the status of an adventure.
     This view requires a discord_id in the request data.
-    It updates the time left for the adventure and returns its details.
+    It only reads the adventure, the time left is computed from the stored deadline.
     If the adventure is complete, it returns a message indicating completion.
     If the adventure is not complete, it returns the current status of the adventure.
     '''
@@ -107,18 +110,9 @@ class AdventureStatusView(APIView):
         seralizer = cereal.AdventureStatusSerializer(data=request.data)
 
         if seralizer.is_valid():
-            user = seralizer.user
+            current_adventure = seralizer.current_adventure
 
-
-            current_adventure = CurrentAdventure.objects.filter(user=user).first()
-            time_started = current_adventure.time_started
-            current_time = timezone.now()
-            time_left = current_adventure.time_left - int((current_time - time_started).total_seconds())
-            current_adventure.time_left = time_left
-            current_adventure.save()
-            
-
-            if current_adventure.time_left <= 0:
+            if seralizer.has_result or current_adventure.is_complete:
                 return Response({'complete': True}, status=status.HTTP_200_OK)
             else:
                 current_adventure_serializer = cereal.CurrentAdventureSerializer(current_adventure)
@@ -131,8 +125,12 @@ class CompleteAdventureView(APIView):
     '''
     View to complete an adventure.
     This view requires a discord_id in the request data.
+    The adventure can only be completed once its deadline has passed.
     It calculates the rewards for completing the adventure and updates the user's stats.
     It deletes the current adventure and returns the rewards.
+    With AUTO_LEVEL_UP the xp is spent on levels straight away.
+    Adventures already settled in the background are collected here instead, marked with settled in the response,
+    in which case the user's current adventure (if any) is left running.
     '''
 
     def post(self, request):
@@ -145,53 +143,46 @@ class CompleteAdventureView(APIView):
 
         if serializer.is_valid():
             user = serializer.user
-            current_adventure = CurrentAdventure.objects.filter(user=user).first()
+            result = serializer.result
+
+            if result:
+                deleted, _ = AdventureResult.objects.filter(pk=result.pk).delete()
+                if not deleted:
+                    return Response({"non_field_errors": ["User is not on an adventure."]}, status=status.HTTP_400_BAD_REQUEST)
+
+                return Response({
+                    "message": result.message,
+                    "adventure_name": result.adventure.name,
+                    "xp_reward": result.xp_reward,
+                    "money_reward": result.money_reward,
+                    "level": user.level,
+                    "settled": True,
+                }, status=status.HTTP_200_OK)
+
+            current_adventure = serializer.current_adventure
+            adventure = current_adventure.adventure
+            xp_reward, money_reward, message = roll_rewards(adventure, user.best_xp_bonus, user.best_money_bonus)
 
-            if not current_adventure:
-                return Response({"error": "User is not on an adventure."}, status=status.HTTP_400_BAD_REQUEST)
+            with transaction.atomic():
+                deleted, _ = CurrentAdventure.objects.filter(pk=current_adventure.pk).delete()
+                if not deleted:
+                    return Response({"non_field_errors": ["User is not on an adventure."]}, status=status.HTTP_400_BAD_REQUEST)
 
-            adventure = current_adventure.adventure
+                balance = wallet.apply(user.pk, money=money_reward, xp=xp_reward, reason='adventure')
 
-            xp_reward = random.randint(adventure.xp_min, adventure.xp_max)
-            money_reward = random.randint(adventure.reward_min, adventure.reward_max)
-
-            critical_success = random.randint(0, 100)
-            if critical_success < 5:
-                xp_reward *= 2
-                money_reward *= 2
-                message = "Critical success! Double rewards!"
-            elif critical_success < 10:
-                xp_reward *= 1.5
-                money_reward *= 1.5
-                message = "Success! Rewards increased by 50%!"
-            else:
-                message = "Adventure completed successfully!"
-
-            best_gear = BestGearSerializer(data=request.data)
-            if best_gear.is_valid():
-                best_gear_xp = best_gear.validated_data.get('best_gear_xp', None)
-                if best_gear_xp:
-                    xp_gear = ShopListSerializer(best_gear_xp)
-                    xp_bonus = xp_gear.data.get('xp_bonus', 0)
-                    xp_reward += int(xp_reward * xp_bonus / 100)
-                
-                best_gear_money = best_gear.validated_data.get('best_gear_money', None)
-                if best_gear_money:
-                    money_gear = ShopListSerializer(best_gear_money)
-                    money_bonus = money_gear.data.get('money_bonus', 0)
-                    money_reward += int(money_reward * money_bonus / 100)
-
-            user.xp += int(xp_reward)
-            user.money += int(money_reward)
-            user.save()
-
-            current_adventure.delete()
+            levels_gained = 0
+            if settings.AUTO_LEVEL_UP and balance is not None:
+                user.xp = balance.xp
+                levels_gained = leveling.level_up(user)
 
             return Response({
                 "message": message,
                 "adventure_name": adventure.name,
                 "xp_reward": xp_reward,
                 "money_reward": money_reward,
+                "levels_gained": levels_gained,
+                "level": user.level,
+                "settled": False,
             }, status=status.HTTP_200_OK)
         else:
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
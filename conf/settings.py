@@ -8,6 +8,7 @@ This file contains the settings for the Django project, including database confi
 
 
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -40,6 +41,7 @@ INSTALLED_APPS = [
     'allauth.account',
     'allauth.socialaccount',
     'allauth.socialaccount.providers.discord',
+    'core',
     'adventures',
     'users',
     'gear',
@@ -149,3 +151,24 @@ SOCIALACCOUNT_PROVIDERS = {
         ],
     }
 }
+
+# Economy ledger, entries are buffered in memory and written with one bulk insert
+# once LEDGER_BATCH_SIZE entries are pending or LEDGER_FLUSH_INTERVAL seconds have passed.
+# Entries still unwritten after LEDGER_MAX_RETRIES failed flushes, or past LEDGER_MAX_BUFFER pending, are logged and dropped.
+LEDGER_BATCH_SIZE = 100
+LEDGER_FLUSH_INTERVAL = 5
+LEDGER_MAX_BUFFER = 10000
+LEDGER_MAX_RETRIES = 5
+
+# Spend xp on levels as soon as adventure rewards are applied, instead of waiting for /user level_up.
+AUTO_LEVEL_UP = False
+
+# In-process cache of the top of each leaderboard. Every process holds its own copy, so it is only
+# used with a single web process; other writers (e.g. settle_adventures) show up within LEADERBOARD_CACHE_TTL seconds.
+LEADERBOARD_CACHE_ENABLED = int(os.environ.get('WEB_CONCURRENCY', '1')) <= 1
+LEADERBOARD_CACHE_SIZE = 50
+LEADERBOARD_CACHE_TTL = 30
+
+# Adventures and gear are served from an in-memory catalog. Each process checks the stored catalog version
+# at most once every CATALOG_CHECK_INTERVAL seconds and reloads when an admin edit has bumped it.
+CATALOG_CHECK_INTERVAL = 2
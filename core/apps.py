@@ -0,0 +1,15 @@
+"""
+File: apps.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Django app configuration for the Core app.
+"""
+
+
+
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'core'
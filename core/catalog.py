@@ -0,0 +1,137 @@
+"""
+File: catalog.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: In-memory catalogs for rows that only change through the admin, such as adventures and gear.
+A Catalog loads every row of a model once, indexes it by id and by name (see core.search) and keeps the serialized rows,
+so lookups, searches and list endpoints are answered from memory.
+Each catalog has a version stored in CatalogVersion that is bumped whenever one of its rows is saved or deleted.
+Every process compares its copy against that version at most once every CATALOG_CHECK_INTERVAL seconds.
+"""
+
+import threading
+import time
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils.module_loading import import_string
+from rest_framework import serializers
+from .models import CatalogVersion
+from .conditional import make_etag
+from .search import NameIndex
+
+
+class Snapshot:
+    '''
+    One loaded version of a catalog, with an ETag over its serialized rows.
+    The rows of a snapshot never change after it is built, the instances it holds are shared between requests
+    and must be treated as read-only.
+    '''
+
+    def __init__(self, version, items, serializer_class):
+        self.version = version
+        self.items = items
+        self.by_id = {item.pk: item for item in items}
+        self.index = NameIndex(items)
+        self.rows = {item.pk: row for item, row in zip(items, serializer_class(items, many=True).data)}
+        self.etag = make_etag(version, [self.rows[item.pk] for item in items])
+        self.checked_at = time.monotonic()
+
+    def find(self, name):
+        return self.index.find(name)
+
+    def serialized(self, items=None):
+        '''
+        Returns copies of the serialized rows for items, or for the whole catalog.
+        '''
+
+        if items is None:
+            items = self.items
+        return [dict(self.rows[item.pk]) for item in items]
+
+
+class Catalog:
+    '''
+    In-memory copy of every row of a model, ordered by ordering.
+    serializer is the dotted path of the serializer used for the rows, it is imported on first load
+    so that the serializers module can itself use the catalog.
+    '''
+
+    def __init__(self, name, model, serializer, ordering=('id',)):
+        self.name = name
+        self.model = model
+        self.serializer = serializer
+        self.ordering = ordering
+        self.lock = threading.Lock()
+        self.snapshot = None
+
+    def stored_version(self):
+        return CatalogVersion.objects.filter(name=self.name).values_list('version', flat=True).first() or 0
+
+    def current(self):
+        '''
+        Returns the current Snapshot, reloading it if the stored version has moved on.
+        '''
+
+        snapshot = self.snapshot
+        if snapshot is not None and time.monotonic() - snapshot.checked_at < settings.CATALOG_CHECK_INTERVAL:
+            return snapshot
+
+        with self.lock:
+            # The version is read before the rows, so a change made in between is picked up by the next check.
+            version = self.stored_version()
+            if self.snapshot is not None and self.snapshot.version == version:
+                self.snapshot.checked_at = time.monotonic()
+            else:
+                items = list(self.model.objects.order_by(*self.ordering))
+                self.snapshot = Snapshot(version, items, import_string(self.serializer))
+            return self.snapshot
+
+    def all(self):
+        return list(self.current().items)
+
+    def get(self, pk):
+        return self.current().by_id.get(pk)
+
+    def find(self, name):
+        '''
+        Returns the row whose normalized name is name, or None.
+        '''
+
+        return self.current().find(name)
+
+    def serialized(self, items=None):
+        return self.current().serialized(items)
+
+    def bump(self):
+        '''
+        Bumps the stored version as part of the current transaction and drops this process's copy.
+        '''
+
+        updated = CatalogVersion.objects.filter(name=self.name).update(version=F('version') + 1)
+        if not updated:
+            CatalogVersion.objects.get_or_create(name=self.name, defaults={'version': 1})
+        self.clear()
+        transaction.on_commit(self.clear)
+
+    def clear(self):
+        with self.lock:
+            self.snapshot = None
+
+
+def resolve_name(snapshot, name, label, fuzzy=False):
+    '''
+    Returns the item of a catalog snapshot a user meant by name (see NameIndex.resolve).
+    Only an exact name resolves unless fuzzy is set, which read-only endpoints such as details do.
+    Raises a ValidationError naming the closest matches if there is no single one.
+    '''
+
+    item = snapshot.index.resolve(name, fuzzy=fuzzy)
+    if item is not None:
+        return item
+
+    suggestions = snapshot.index.suggest(name)
+    if suggestions:
+        raise serializers.ValidationError(f"{label} does not exist. Did you mean {', '.join(item.name for item in suggestions)}?")
+    raise serializers.ValidationError(f"{label} does not exist.")
+
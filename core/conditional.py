@@ -0,0 +1,54 @@
+"""
+File: conditional.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Conditional GET helpers shared by the API views.
+A view works out a strong ETag from what its response depends on (a catalog version, a user's owned gear,
+a leaderboard's version) and passes the body as a callable, so a request whose If-None-Match
+already holds that ETag gets an empty 304 without the body ever being serialized.
+"""
+
+import hashlib
+import json
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def make_etag(*parts):
+    '''
+    Returns a quoted strong ETag built from a hash of parts, which must be JSON serializable.
+    '''
+
+    payload = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str)
+    return quote_etag(hashlib.sha1(payload.encode()).hexdigest()[:20])
+
+
+def matches(request, etag):
+    '''
+    Returns True if the request's If-None-Match header holds etag.
+    As with any GET, a weak validator in the header also matches.
+    '''
+
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    tags = parse_etags(header)
+    return '*' in tags or etag in [tag.removeprefix('W/') for tag in tags]
+
+
+def conditional_response(request, etag, body, **cache_control):
+    '''
+    Returns a 304 if the client already holds etag, otherwise a 200 with the data returned by body().
+    Both carry the ETag and a Cache-Control header built from cache_control (e.g. private=True, no_cache=True).
+    '''
+
+    if matches(request, etag):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(body(), status=status.HTTP_200_OK)
+
+    response['ETag'] = etag
+    patch_cache_control(response, **cache_control)
+    return response
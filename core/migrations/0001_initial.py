@@ -0,0 +1,32 @@
+# Generated by Django 6.1.2 on 2026-10-17 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        # The table already exists, it was created by the Users app.
+        ('users', '0016_catalogversion'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='CatalogVersion',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('name', models.CharField(max_length=32, unique=True)),
+                        ('version', models.BigIntegerField(default=0)),
+                    ],
+                    options={
+                        'db_table': 'users_catalogversion',
+                    },
+                ),
+            ],
+            database_operations=[],
+        ),
+    ]
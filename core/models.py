@@ -0,0 +1,26 @@
+"""
+File: models.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Models for the Core app.
+This file contains the models shared by the other apps, which must not depend on any of them.
+"""
+
+from django.db import models
+
+
+class CatalogVersion(models.Model):
+    '''
+    Model holding the version of a cached catalog (see core.catalog).
+    The version is bumped whenever a row of the catalog changes, so every process knows to reload it.
+    '''
+
+    name = models.CharField(max_length=32, unique=True)
+    version = models.BigIntegerField(default=0)
+
+    class Meta:
+        # The table was created by the Users app, which held this model first.
+        db_table = 'users_catalogversion'
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
@@ -0,0 +1,189 @@
+"""
+File: search.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Name normalization and search for the catalogs.
+normalize turns a name into the key stored in the name_key column of adventures and gear.
+NameIndex is built once per catalog snapshot and answers searches from memory:
+a prefix trie finds names that start with the query (or have a word that does),
+and a trigram index finds names that are close to it, so typos still match.
+"""
+
+import re
+import unicodedata
+from collections import defaultdict
+
+APOSTROPHES = re.compile(r"['’`]")
+SEPARATORS = re.compile(r'[\W_]+')
+
+# Tiers of a match, best first.
+EXACT, PREFIX, WORD_PREFIX, FUZZY = range(4)
+
+# Minimum trigram similarity for a fuzzy match to be returned, and for it to be used by resolve.
+MIN_SIMILARITY = 0.3
+RESOLVE_SIMILARITY = 0.5
+
+
+def normalize(name):
+    '''
+    Returns the key a name is stored and looked up by: lowercase, without accents or apostrophes,
+    with other punctuation treated as spaces and runs of whitespace collapsed.
+    '''
+
+    name = unicodedata.normalize('NFKD', str(name)).casefold()
+    name = ''.join(char for char in name if not unicodedata.combining(char))
+    name = APOSTROPHES.sub('', name)
+    return ' '.join(SEPARATORS.sub(' ', name).split())
+
+
+def trigrams(key):
+    '''
+    Returns the set of trigrams of a normalized key, each word padded like PostgreSQL's pg_trgm.
+    '''
+
+    grams = set()
+    for word in key.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def similarity(left, right):
+    if not left or not right:
+        return 0.0
+    return len(left & right) / len(left | right)
+
+
+class Trie:
+    '''
+    Prefix tree mapping strings to the set of values inserted under them.
+    '''
+
+    def __init__(self):
+        self.root = {}
+
+    def insert(self, word, value):
+        node = self.root
+        for char in word:
+            node = node.setdefault(char, {})
+        node.setdefault(None, set()).add(value)
+
+    def prefixed(self, prefix):
+        '''
+        Returns every value inserted under a string starting with prefix.
+        '''
+
+        node = self.root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return set()
+
+        values = set()
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            for char, child in node.items():
+                if char is None:
+                    values |= child
+                else:
+                    stack.append(child)
+        return values
+
+
+class NameIndex:
+    '''
+    Search index over the names of a list of items, each with a name_key.
+    '''
+
+    def __init__(self, items):
+        self.items = items
+        self.keys = [item.name_key for item in items]
+        self.grams = [trigrams(key) for key in self.keys]
+        self.by_key = {}
+        self.trie = Trie()
+        self.words = Trie()
+        self.trigrams = defaultdict(set)
+
+        for position, key in enumerate(self.keys):
+            self.by_key.setdefault(key, position)
+            self.trie.insert(key, position)
+            for word in key.split():
+                self.words.insert(word, position)
+            for gram in self.grams[position]:
+                self.trigrams[gram].add(position)
+
+    def find(self, name):
+        position = self.by_key.get(normalize(name))
+        return None if position is None else self.items[position]
+
+    def matches(self, query):
+        '''
+        Returns (tier, similarity, position) for every item matching query, best first.
+        '''
+
+        key = normalize(query)
+        if not key:
+            return []
+
+        grams = trigrams(key)
+        tiers = {}
+        # Every word of the query has to start a word of the name.
+        worded = None
+        for word in key.split():
+            found = self.words.prefixed(word)
+            worded = found if worded is None else worded & found
+        for position in worded:
+            tiers[position] = WORD_PREFIX
+        for position in self.trie.prefixed(key):
+            tiers[position] = EXACT if self.keys[position] == key else PREFIX
+
+        candidates = set().union(*(self.trigrams.get(gram, ()) for gram in grams)) if grams else set()
+        results = []
+        for position in candidates | set(tiers):
+            score = similarity(grams, self.grams[position])
+            if position in tiers:
+                results.append((tiers[position], score, position))
+            elif score >= MIN_SIMILARITY:
+                results.append((FUZZY, score, position))
+
+        results.sort(key=lambda match: (match[0], -match[1], self.keys[match[2]]))
+        return results
+
+    def search(self, query, limit=10):
+        '''
+        Returns up to limit (item, tier, similarity) matches for query, best first.
+        '''
+
+        return [(self.items[position], tier, score) for tier, score, position in self.matches(query)[:limit]]
+
+    def resolve(self, name, fuzzy=False):
+        '''
+        Returns the item a user meant by name, or None.
+        Without fuzzy only an exact name resolves, for endpoints that act on the item (a purchase, a start).
+        With fuzzy a prefix of only one name also resolves, and so does the single closest name
+        if it is similar enough and clearly closer than the next one.
+        '''
+
+        position = self.by_key.get(normalize(name))
+        if position is not None:
+            return self.items[position]
+        if not fuzzy:
+            return None
+
+        matches = self.matches(name)
+        if not matches:
+            return None
+
+        prefixed = [match for match in matches if match[0] in (PREFIX, WORD_PREFIX)]
+        if len(prefixed) == 1:
+            return self.items[prefixed[0][2]]
+
+        tier, score, position = matches[0]
+        if not prefixed and score >= RESOLVE_SIMILARITY:
+            if len(matches) == 1 or matches[1][1] < score:
+                return self.items[position]
+        return None
+
+    def suggest(self, name, limit=3):
+        return [item for item, _, _ in self.search(name, limit)]
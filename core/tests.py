@@ -0,0 +1,52 @@
+"""
+File: tests.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Unit tests for the Core app.
+This file contains tests for name normalization and the name index used by the catalogs.
+"""
+
+
+
+from types import SimpleNamespace
+from django.test import TestCase
+from . import search
+
+class NameIndexTestCase(TestCase):
+    def setUp(self):
+        names = ["The Dark Forest", "Dark Caves", "Sunken Temple", "King's Road"]
+        self.items = [SimpleNamespace(name=name, name_key=search.normalize(name)) for name in names]
+        self.index = search.NameIndex(self.items)
+
+    def test_normalize(self):
+        '''
+        Test that names are normalized regardless of case, accents, apostrophes and punctuation.
+        '''
+        self.assertEqual(search.normalize("  King's   ROAD "), "kings road")
+        self.assertEqual(search.normalize("Café-Noir"), "cafe noir")
+
+    def test_search_ranks_matches(self):
+        '''
+        Test that exact and prefix matches rank ahead of word prefix and fuzzy matches.
+        '''
+        results = self.index.search("dark")
+        self.assertEqual([(item.name, tier) for item, tier, _ in results], [
+            ("Dark Caves", search.PREFIX),
+            ("The Dark Forest", search.WORD_PREFIX),
+        ])
+        self.assertEqual(self.index.search("dark for")[0][0].name, "The Dark Forest")
+        self.assertEqual(self.index.search("sunkn tempel")[0][:2], (self.items[2], search.FUZZY))
+
+    def test_resolve(self):
+        '''
+        Test that only exact names resolve by default, and unique prefixes and typos only when fuzzy.
+        '''
+        self.assertEqual(self.index.resolve("kings road"), self.items[3])
+        self.assertEqual(self.index.resolve("King's Road!"), self.items[3])
+        self.assertIsNone(self.index.resolve("sunk"))
+        self.assertEqual(self.index.resolve("sunk", fuzzy=True), self.items[2])
+        self.assertIsNone(self.index.resolve("dark", fuzzy=True))
+        self.assertIsNone(self.index.resolve("sunkn temple"))
+        self.assertEqual(self.index.resolve("sunkn temple", fuzzy=True), self.items[2])
+        self.assertIsNone(self.index.resolve("volcano", fuzzy=True))
+
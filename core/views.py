@@ -0,0 +1,59 @@
+"""
+File: views.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Views shared by the apps.
+This file contains the base view for searching a catalog by name, used by the adventure and gear search endpoints.
+"""
+
+from django.conf import settings
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from .conditional import conditional_response, make_etag
+from .search import EXACT, PREFIX, WORD_PREFIX, FUZZY
+
+MAX_RESULTS = 25
+
+MATCHES = {
+    EXACT: 'exact',
+    PREFIX: 'prefix',
+    WORD_PREFIX: 'word_prefix',
+    FUZZY: 'fuzzy',
+}
+
+
+class CatalogSearchView(APIView):
+    '''
+    Base view for searching a catalog by name.
+    Takes a query q and an optional limit (default 10) in the request data or query string,
+    and returns the best matching rows, each with how it matched and its trigram similarity to the query.
+    '''
+
+    catalog = None
+
+    def get(self, request):
+        query = request.data.get('q') or request.query_params.get('q')
+        limit = request.data.get('limit') or request.query_params.get('limit') or 10
+
+        if not query:
+            return Response({"error": "q is required"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = int(limit)
+        except (TypeError, ValueError):
+            return Response({"error": "limit must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+        if not 1 <= limit <= MAX_RESULTS:
+            return Response({"error": f"limit must be between 1 and {MAX_RESULTS}."}, status=status.HTTP_400_BAD_REQUEST)
+
+        snapshot = self.catalog.current()
+
+        def body():
+            results = []
+            for item, tier, score in snapshot.index.search(query, limit):
+                row = snapshot.serialized([item])[0]
+                row['match'] = MATCHES[tier]
+                row['score'] = round(score, 3)
+                results.append(row)
+            return {"query": query, "results": results}
+
+        return conditional_response(request, make_etag(snapshot.etag, query, limit), body, max_age=settings.CATALOG_CHECK_INTERVAL)
@@ -0,0 +1,340 @@
+"""
+File: api_client.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Shared API client for the bot.
+This file contains the client every cog uses to talk to the Nebulark API.
+Requests go through a transport: either HTTP over a single pooled aiohttp session,
+or in-process calls into the Django views when the bot runs next to the game logic.
+GET responses that carry an ETag are kept in a small local cache and revalidated with If-None-Match,
+so an unchanged catalog or leaderboard costs the API a header comparison instead of a body.
+"""
+
+import copy
+import io
+import json
+import os
+import pathlib
+import sys
+import time
+import traceback
+from collections import OrderedDict
+import aiohttp
+
+
+class APIResponse:
+    '''
+    Response returned by the API client.
+    Holds the status code, the decoded JSON body, the raw text of the body and the headers (with lowercase names).
+    If the body is not valid JSON, data is None.
+    '''
+
+    def __init__(self, status, data, text="", headers=None):
+        self.status = status
+        self.data = data
+        self.text = text
+        self.headers = headers or {}
+
+    def __repr__(self):
+        return f"APIResponse({self.status}, {self.data!r})"
+
+
+class HTTPTransport:
+    '''
+    Transport that sends requests to the API over HTTP.
+    Requests share one pooled session, so connections are reused instead of being opened per command.
+    '''
+
+    def __init__(self, base_url, limit=100, limit_per_host=0, keepalive_timeout=30, timeout=10):
+        self.base_url = base_url.rstrip("/")
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+        self.session = None
+
+    async def start(self):
+        '''
+        Creates the pooled session.
+        Must be called from inside the running event loop.
+        '''
+
+        if self.session is not None:
+            return
+
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=300,
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+
+    async def close(self):
+        '''
+        Closes the session and every pooled connection.
+        '''
+
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def request(self, method, path, payload=None, headers=None):
+        if self.session is None:
+            raise aiohttp.ClientConnectionError("API client is not started.")
+
+        async with self.session.request(method, self.base_url + path, json=payload, headers=headers) as response:
+            text = await response.text()
+            try:
+                data = json.loads(text) if text else None
+            except ValueError:
+                data = None
+            return APIResponse(response.status, data, text, {name.lower(): value for name, value in response.headers.items()})
+
+
+class InProcessTransport:
+    '''
+    Transport that calls the Django API views directly inside the bot process.
+    The request is resolved with the project's URLconf and handed to the same view the HTTP server would use,
+    skipping the network hop and the middleware stack.
+    The response is rendered the same way, so its status, headers and JSON body match what HTTP would return.
+    Views run in Django's shared sync thread, so ORM access is never done from the event loop.
+    '''
+
+    def __init__(self, settings_module="conf.settings"):
+        self.settings_module = settings_module
+        self.call_view = None
+
+    async def start(self):
+        '''
+        Configures Django so the views and models can be imported.
+        '''
+
+        if self.call_view is not None:
+            return
+
+        project_root = str(pathlib.Path(__file__).resolve().parent.parent)
+        if project_root not in sys.path:
+            sys.path.insert(0, project_root)
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", self.settings_module)
+
+        import django
+        from asgiref.sync import sync_to_async
+
+        django.setup()
+        self.call_view = sync_to_async(self._call_view, thread_sensitive=True)
+
+    async def close(self):
+        if self.call_view is not None:
+            from asgiref.sync import sync_to_async
+            from django.db import connections
+
+            await sync_to_async(connections.close_all, thread_sensitive=True)()
+            self.call_view = None
+
+    async def request(self, method, path, payload=None, headers=None):
+        if self.call_view is None:
+            raise aiohttp.ClientConnectionError("API client is not started.")
+        return await self.call_view(method, path, payload, headers)
+
+    def _build_request(self, method, path, payload, headers=None):
+        '''
+        Builds the HttpRequest the HTTP server would have built for a JSON request.
+        '''
+
+        from django.http import HttpRequest, QueryDict
+
+        path, _, query_string = path.partition("?")
+        body = json.dumps(payload).encode() if payload is not None else b""
+
+        request = HttpRequest()
+        request.method = method
+        request.path = request.path_info = path
+        request.GET = QueryDict(query_string)
+        request.META.update({
+            "REQUEST_METHOD": method,
+            "PATH_INFO": path,
+            "QUERY_STRING": query_string,
+            "CONTENT_TYPE": "application/json",
+            "CONTENT_LENGTH": str(len(body)),
+            "SERVER_NAME": "localhost",
+            "SERVER_PORT": "80",
+            "REMOTE_ADDR": "127.0.0.1",
+        })
+        for name, value in (headers or {}).items():
+            request.META["HTTP_" + name.upper().replace("-", "_")] = value
+        request._stream = io.BytesIO(body)
+        request._read_started = False
+        return request
+
+    def _call_view(self, method, path, payload, headers=None):
+        from django.core.handlers.exception import response_for_exception
+        from django.db import close_old_connections
+        from django.urls import Resolver404, resolve
+
+        close_old_connections()
+        try:
+            request = self._build_request(method, path, payload, headers)
+            try:
+                match = resolve(request.path_info)
+            except Resolver404 as e:
+                # The same Not Found page the HTTP server would send.
+                response = response_for_exception(request, e)
+            else:
+                try:
+                    response = match.func(request, *match.args, **match.kwargs)
+                except Exception:
+                    traceback.print_exc()
+                    return APIResponse(500, None, "Internal Server Error")
+
+            if hasattr(response, "render"):
+                # Rendering turns DRF's ErrorDetail strings and other non-JSON values into plain JSON.
+                response.render()
+
+            response_headers = {name.lower(): value for name, value in response.items()}
+            text = response.content.decode(response.charset or "utf-8")
+            try:
+                data = json.loads(text) if text else None
+            except ValueError:
+                data = None
+            return APIResponse(response.status_code, data, text, response_headers)
+        finally:
+            close_old_connections()
+
+
+class ResponseCache:
+    '''
+    Least recently used cache of GET responses, keyed by path and payload.
+    Only successful responses with an ETag are kept. A response stays fresh for the max-age of its
+    Cache-Control header, after that (or straight away with no-cache) it is revalidated with If-None-Match.
+    '''
+
+    def __init__(self, size=256):
+        self.size = size
+        self.entries = OrderedDict()
+
+    @staticmethod
+    def key(path, payload):
+        return path, json.dumps(payload, sort_keys=True)
+
+    @staticmethod
+    def max_age(response):
+        '''
+        Returns how many seconds a response may be reused without asking the API, or None if it must not be stored.
+        '''
+
+        directives = {}
+        for directive in response.headers.get("cache-control", "").split(","):
+            name, _, value = directive.strip().lower().partition("=")
+            directives[name] = value
+
+        if "no-store" in directives:
+            return None
+        if "no-cache" in directives:
+            return 0
+        try:
+            return max(int(directives.get("max-age", 0)), 0)
+        except ValueError:
+            return 0
+
+    def get(self, key):
+        '''
+        Returns the cached (response, etag, expires_at) for key, or None.
+        '''
+
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def store(self, key, response):
+        etag = response.headers.get("etag")
+        max_age = self.max_age(response)
+        if response.status != 200 or not etag or max_age is None:
+            self.entries.pop(key, None)
+            return
+
+        self.entries[key] = (copy.deepcopy(response), etag, time.monotonic() + max_age)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def revalidated(self, key, response):
+        '''
+        Extends a cached entry after a 304 and returns a copy of the cached response.
+        '''
+
+        cached, etag, _ = self.entries[key]
+        max_age = self.max_age(response)
+        self.entries[key] = (cached, etag, time.monotonic() + (max_age or 0))
+        return copy.deepcopy(cached)
+
+    def clear(self):
+        self.entries.clear()
+
+
+class APIClient:
+    '''
+    Bot-wide client for the Nebulark API.
+    Paths are relative to the API root, e.g. "/users/profile/".
+    The transport decides whether requests go over HTTP or straight into the Django views.
+    GET responses are cached in a ResponseCache of cache_size entries, 0 turns the cache off.
+    '''
+
+    def __init__(self, transport, cache_size=256):
+        self.transport = transport
+        self.cache = ResponseCache(cache_size) if cache_size else None
+
+    async def start(self):
+        await self.transport.start()
+
+    async def close(self):
+        await self.transport.close()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def request(self, method, path, payload=None, headers=None):
+        '''
+        Sends a request to the API and returns an APIResponse.
+        Raises aiohttp.ClientError on network errors.
+        '''
+
+        return await self.transport.request(method, path, payload, headers)
+
+    async def get(self, path, payload=None):
+        '''
+        Sends a GET request, answering it from the response cache while the cached copy is fresh
+        and revalidating the cached copy with If-None-Match once it is not.
+        '''
+
+        if self.cache is None:
+            return await self.request("GET", path, payload)
+
+        key = self.cache.key(path, payload)
+        entry = self.cache.get(key)
+        if entry is not None:
+            cached, etag, expires_at = entry
+            if time.monotonic() < expires_at:
+                return copy.deepcopy(cached)
+            response = await self.request("GET", path, payload, {"If-None-Match": etag})
+            if response.status == 304:
+                return self.cache.revalidated(key, response)
+        else:
+            response = await self.request("GET", path, payload)
+
+        self.cache.store(key, response)
+        return response
+
+    async def post(self, path, payload=None):
+        return await self.request("POST", path, payload)
+
+    async def delete(self, path, payload=None):
+        return await self.request("DELETE", path, payload)
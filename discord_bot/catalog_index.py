@@ -0,0 +1,151 @@
+"""
+File: catalog_index.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Local indexes for slash command autocomplete.
+Discord only waits 3 seconds for autocomplete choices, so they are answered from memory:
+CatalogIndex holds a copy of the adventure or gear list, and UserCache holds the per-user facts
+(level, owned gear) used to filter it. Both refresh in the background and never make an interaction wait.
+"""
+
+import asyncio
+import logging
+import re
+import time
+import unicodedata
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+APOSTROPHES = re.compile(r"['’`]")
+SEPARATORS = re.compile(r'[\W_]+')
+
+# Discord accepts at most 25 autocomplete choices.
+MAX_CHOICES = 25
+
+
+def normalize(name):
+    '''
+    Copy of core.search.normalize, which the bot can't import since it runs without Django.
+    The API resolves names by this key, so the two must stay identical (users/tests.py checks that they do).
+    '''
+
+    name = unicodedata.normalize('NFKD', str(name)).casefold()
+    name = ''.join(char for char in name if not unicodedata.combining(char))
+    name = APOSTROPHES.sub('', name)
+    return ' '.join(SEPARATORS.sub(' ', name).split())
+
+
+class CatalogIndex:
+    '''
+    In-memory copy of a catalog list endpoint (e.g. /adventures/list/), searched by name.
+    The list goes through the API client's response cache, so refreshing an unchanged catalog costs a 304,
+    and the index is only rebuilt when the ETag, which follows the catalog version, changes.
+    '''
+
+    def __init__(self, api, path, refresh_interval=60):
+        self.api = api
+        self.path = path
+        self.refresh_interval = refresh_interval
+        self.etag = None
+        self.rows = []
+        self.keys = []
+        self.refreshed_at = float('-inf')
+        self.task = None
+
+    async def refresh(self):
+        response = await self.api.get(self.path)
+        if response.status != 200 or not isinstance(response.data, list):
+            logger.warning("Could not load %s (status %s).", self.path, response.status)
+            return
+
+        etag = response.headers.get("etag")
+        if etag is None or etag != self.etag:
+            self.rows = response.data
+            self.keys = [normalize(row["name"]) for row in self.rows]
+            self.etag = etag
+        self.refreshed_at = time.monotonic()
+
+    def refresh_soon(self):
+        '''
+        Starts a background refresh if the index is older than refresh_interval and none is running.
+        '''
+
+        if time.monotonic() - self.refreshed_at < self.refresh_interval:
+            return
+        if self.task is not None and not self.task.done():
+            return
+        self.task = asyncio.create_task(self._refresh_quietly())
+
+    async def _refresh_quietly(self):
+        try:
+            await self.refresh()
+        except aiohttp.ClientError as e:
+            logger.warning("Could not refresh %s: %s", self.path, e)
+        except Exception:
+            logger.exception("Could not refresh %s.", self.path)
+
+    def search(self, query, allowed=None, limit=MAX_CHOICES):
+        '''
+        Returns up to limit rows whose name matches query, best first: names starting with it,
+        then names with a word starting with it, then names containing it.
+        allowed is an optional predicate that rows must pass.
+        '''
+
+        self.refresh_soon()
+        key = normalize(query)
+
+        matches = []
+        for row, name_key in zip(self.rows, self.keys):
+            if allowed is not None and not allowed(row):
+                continue
+            if name_key.startswith(key):
+                tier = 0
+            elif f" {key}" in f" {name_key}":
+                tier = 1
+            elif key in name_key:
+                tier = 2
+            else:
+                continue
+            matches.append((tier, name_key, row))
+
+        matches.sort(key=lambda match: match[:2])
+        return [row for _, _, row in matches[:limit]]
+
+
+class UserCache:
+    '''
+    Per-user values fetched with fetch(user) and kept for ttl seconds.
+    get never waits: it returns the cached value (or None) and fetches a missing or expired one in the background.
+    '''
+
+    def __init__(self, fetch, ttl=60, size=1000):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.size = size
+        self.values = {}
+        self.pending = set()
+
+    def get(self, user):
+        value, fetched_at = self.values.get(user.id, (None, float('-inf')))
+        if time.monotonic() - fetched_at >= self.ttl and user.id not in self.pending:
+            self.pending.add(user.id)
+            asyncio.create_task(self._load(user))
+        return value
+
+    def forget(self, user):
+        self.values.pop(user.id, None)
+
+    async def _load(self, user):
+        try:
+            value = await self.fetch(user)
+            if value is not None:
+                if len(self.values) >= self.size:
+                    self.values.pop(next(iter(self.values)))
+                self.values[user.id] = (value, time.monotonic())
+        except aiohttp.ClientError as e:
+            logger.warning("Could not load autocomplete data for %s: %s", user.id, e)
+        except Exception:
+            logger.exception("Could not load autocomplete data for %s.", user.id)
+        finally:
+            self.pending.discard(user.id)
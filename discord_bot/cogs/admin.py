@@ -67,34 +67,31 @@ class Admin(commands.Cog):
             return
 
         discord_id = str(user.id)
-        api_url = "http://127.0.0.1:8000/users/give_money/"
+        api_path = "/users/give_money/"
         payload = {
             "discord_id": discord_id,
             "amount": amount
         }
 
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.post(api_url, json=payload) as response:
-                    if response.status == 200:
-                        try:
-                            data = await response.json()
-                            message = data.get("message", "Something went wrong.")
-                            await ctx.send(message)
-                        except aiohttp.ContentTypeError:
-                            text = await response.text()
-                            await ctx.send(f"Unexpected response from the API: {text}")
-                    elif response.status == 400:
-                        try:
-                            error = await response.json()
-                            await ctx.send(f"Error: {error.get('error', 'Invalid request.')}")
-                        except aiohttp.ContentTypeError:
-                            text = await response.text()
-                            await ctx.send(f"Error: {text}")
-                    else:
-                        await ctx.send("An unexpected error occurred. Please try again later.")
-            except aiohttp.ClientError as e:
-                await ctx.send(f"Network error: {str(e)}", ephemeral=True)
+        try:
+            response = await self.bot.api.post(api_path, payload)
+            if response.status == 200:
+                data = response.data
+                if data is not None:
+                    message = data.get("message", "Something went wrong.")
+                    await ctx.send(message)
+                else:
+                    await ctx.send(f"Unexpected response from the API: {response.text}")
+            elif response.status == 400:
+                error = response.data
+                if error is not None:
+                    await ctx.send(f"Error: {error.get('error', 'Invalid request.')}")
+                else:
+                    await ctx.send(f"Error: {response.text}")
+            else:
+                await ctx.send("An unexpected error occurred. Please try again later.")
+        except aiohttp.ClientError as e:
+            await ctx.send(f"Network error: {str(e)}", ephemeral=True)
 
     @commands.command(name="give_xp", description="Give XP to a user")
     @commands.is_owner()
@@ -108,35 +105,32 @@ class Admin(commands.Cog):
             return
 
         discord_id = str(user.id)
-        api_url = "http://127.0.0.1:8000/users/give_xp/"
+        api_path = "/users/give_xp/"
         payload = {
             "discord_id": discord_id,
             "amount": amount
         }
 
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.post(api_url, json=payload) as response:
-                    if response.status == 200:
-                        try:
-                            data = await response.json()
-                            message = data.get("message", "Something went wrong.")
-                            await ctx.send(message)
-                        except aiohttp.ContentTypeError:
-                            text = await response.text()
-                            await ctx.send(f"Unexpected response from the API: {text}")
-                    elif response.status == 400:
-                        try:
-                            error = await response.json()
-                            await ctx.send(f"Error: {error.get('error', 'Invalid request.')}")
-                        except aiohttp.ContentTypeError:
-                            text = await response.text()
-                            await ctx.send(f"Error: {text}")
-                    else:
-                        await ctx.send("An unexpected error occurred. Please try again later.")
-            except aiohttp.ClientError as e:
-                await ctx.send(f"Network error: {str(e)}", ephemeral=True)
-    
+        try:
+            response = await self.bot.api.post(api_path, payload)
+            if response.status == 200:
+                data = response.data
+                if data is not None:
+                    message = data.get("message", "Something went wrong.")
+                    await ctx.send(message)
+                else:
+                    await ctx.send(f"Unexpected response from the API: {response.text}")
+            elif response.status == 400:
+                error = response.data
+                if error is not None:
+                    await ctx.send(f"Error: {error.get('error', 'Invalid request.')}")
+                else:
+                    await ctx.send(f"Error: {response.text}")
+            else:
+                await ctx.send("An unexpected error occurred. Please try again later.")
+        except aiohttp.ClientError as e:
+            await ctx.send(f"Network error: {str(e)}", ephemeral=True)
+
     @commands.command(name="delete_user", description="Delete a user via the API")
     @commands.is_owner()
     async def delete_user(self, ctx):
@@ -145,29 +139,28 @@ class Admin(commands.Cog):
         """
 
         discord_id = str(ctx.author.id)
-        api_url = "http://127.0.0.1:8000/users/delete_user/"
+        api_path = "/users/delete_user/"
         payload = {
             "discord_id": discord_id
         }
         await ctx.send("Deleting user...")
 
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.delete(api_url, json=payload) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        message = data.get("message", "User successfully deleted.")
-                        await ctx.send(message)
-                    elif response.status == 404:
-                        error = await response.json()
-                        await ctx.send(f"Error: {error.get('error', 'User not found.')}")
-                    elif response.status == 400:
-                        error = await response.json()
-                        await ctx.send(f"Error: {error.get('error', 'Invalid request.')}")
-                    else:
-                        await ctx.send("An unexpected error occurred. Please try again later.")
-            except aiohttp.ClientError as e:
-                await ctx.send(f"Network error: {str(e)}", ephemeral=True)
+        try:
+            response = await self.bot.api.delete(api_path, payload)
+            if response.status == 200:
+                data = response.data
+                message = data.get("message", "User successfully deleted.")
+                await ctx.send(message)
+            elif response.status == 404:
+                error = response.data
+                await ctx.send(f"Error: {error.get('error', 'User not found.')}")
+            elif response.status == 400:
+                error = response.data
+                await ctx.send(f"Error: {error.get('error', 'Invalid request.')}")
+            else:
+                await ctx.send("An unexpected error occurred. Please try again later.")
+        except aiohttp.ClientError as e:
+            await ctx.send(f"Network error: {str(e)}", ephemeral=True)
 
 
     @commands.command(name="faq", description="faq")
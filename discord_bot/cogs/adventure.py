@@ -4,15 +4,81 @@ Author: Reagan Zierke
 Date: 2025-05-03
 Description: Adventure commands for the bot.
 This file contains commands related to adventures, including listing, starting, and checking the status of adventures.
+Users are sent a direct message when their adventure finishes, set ADVENTURE_AUTO_COMPLETE to also collect the rewards for them.
+Adventure names are autocompleted from a local copy of the adventure list.
 """
 
+import os
 import discord
 from discord.ext import commands
 import aiohttp  
+from scheduler import DeadlineScheduler, parse_deadline
+from catalog_index import CatalogIndex, UserCache
 
 class Adventure(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.auto_complete = os.getenv("ADVENTURE_AUTO_COMPLETE", "false").lower() in ("1", "true", "yes")
+        self.scheduler = DeadlineScheduler(self.on_deadline)
+        self.catalog = CatalogIndex(bot.api, "/adventures/list/")
+        self.levels = UserCache(self.fetch_level)
+
+    async def cog_load(self):
+        '''
+        Starts the deadline scheduler and seeds it with every active adventure.
+        Loads the adventure list used for autocomplete.
+        '''
+
+        self.scheduler.start()
+
+        try:
+            await self.catalog.refresh()
+        except aiohttp.ClientError as e:
+            print(f"Could not load adventures for autocomplete: {str(e)}")
+
+        try:
+            response = await self.bot.api.get("/adventures/active/")
+            if response.status in range(200, 300):
+                for adventure in response.data:
+                    self.scheduler.schedule(adventure["discord_id"], parse_deadline(adventure["ends_at"]), adventure["name"])
+                print(f"Scheduled {len(self.scheduler)} adventure notifications.")
+            else:
+                print(f"Could not load active adventures (status {response.status}).")
+        except aiohttp.ClientError as e:
+            print(f"Could not load active adventures: {str(e)}")
+
+    async def cog_unload(self):
+        await self.scheduler.stop()
+
+    async def on_deadline(self, discord_id, adventure_name):
+        '''
+        Called by the scheduler when a user's adventure reaches its deadline.
+        Sends the user a direct message, completing the adventure first if auto complete is enabled.
+        '''
+
+        await self.bot.wait_until_ready()
+        user = self.bot.get_user(int(discord_id)) or await self.bot.fetch_user(int(discord_id))
+
+        embed = None
+        if self.auto_complete:
+            try:
+                response = await self.bot.api.post("/adventures/complete/", {"discord_id": discord_id})
+                if response.status in range(200, 300):
+                    embed = self.format_complete_adventure(response.data)
+            except aiohttp.ClientError as e:
+                print(f"Network error: {str(e)}")
+
+        if embed is None:
+            embed = discord.Embed(
+                title=f"{adventure_name} Complete!",
+                description="Use /adventure status to collect your rewards.",
+                color=discord.Color.green()
+            )
+
+        try:
+            await user.send(embed=embed)
+        except discord.HTTPException as e:
+            print(f"Could not notify {discord_id}: {str(e)}")
 
     adventure_group = discord.app_commands.Group(name="adventure", description="Adventure commands")
 
@@ -37,6 +103,27 @@ class Adventure(commands.Cog):
         )
         return embed
 
+    def format_complete_adventure(self, adventure):
+        '''
+        Helper function to format the adventure completion response.
+        '''
+
+        adventure_name = adventure.get("adventure_name", "Unknown Adventure")
+        rewarded_xp = adventure.get("xp_reward", 0)
+        rewarded_money = adventure.get("money_reward", 0)
+
+        embed = discord.Embed(
+            title=f"{adventure_name} Completed!",
+            color=discord.Color.green()
+        )
+        embed.add_field(name="XP Gained", value=rewarded_xp, inline=True)
+        embed.add_field(name="Money Gained", value=rewarded_money, inline=True)
+        if adventure.get("levels_gained"):
+            embed.add_field(name="Level Up!", value=f"You reached level {adventure.get('level')}", inline=False)
+        embed.set_footer(text="Congratulations on completing your adventure!")
+
+        return embed
+
 
 
     @adventure_group.command(name="help", description="Shows the help menu")
@@ -67,7 +154,7 @@ class Adventure(commands.Cog):
         This command fetches the list of adventures from the API and displays them to the user.
         """
 
-        api_url = "http://127.0.0.1:8000/adventures/list/"
+        api_path = "/adventures/list/"
 
         def format_adventure_list(adventures):
             '''
@@ -90,31 +177,30 @@ class Adventure(commands.Cog):
             return embed
             
 
-        async with aiohttp.ClientSession() as session: 
-            try:
-                async with session.get(api_url) as response: 
-                    if response.status in range(200, 300):
-                        data = await response.json()
-                        if data and isinstance(data, list) and len(data) > 0:
-                            embed = format_adventure_list(data)
-                            await interaction.response.send_message(embed=embed)
-                        else:
-                            error = "No adventures available at the moment."
-                            await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
-                    elif response.status in range(400, 500):
-                        error = await response.json()
-                        error = error['non_field_errors']
-                        await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
-                        return
-                    else:
-                        error = "An unexpected error occurred. Please try again later."
-                        await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
-                        return
-            except aiohttp.ClientError as e:
-                error = f"Network error: {str(e)}"
+        try:
+            response = await self.bot.api.get(api_path)
+            if response.status in range(200, 300):
+                data = response.data
+                if data and isinstance(data, list) and len(data) > 0:
+                    embed = format_adventure_list(data)
+                    await interaction.response.send_message(embed=embed)
+                else:
+                    error = "No adventures available at the moment."
+                    await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
+            elif response.status in range(400, 500):
+                error = response.data
+                error = error['non_field_errors']
                 await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
                 return
-            
+            else:
+                error = "An unexpected error occurred. Please try again later."
+                await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
+                return
+        except aiohttp.ClientError as e:
+            error = f"Network error: {str(e)}"
+            await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
+            return
+
     @adventure_group.command(name="info", description="Get information about a specific adventure")
     @discord.app_commands.describe(adventure_name="The name of the adventure")
     async def adventure_info(self, interaction: discord.Interaction, adventure_name: str):
@@ -123,7 +209,7 @@ class Adventure(commands.Cog):
         This command fetches the adventure details from the API and displays them to the user.
         """
 
-        api_url = "http://127.0.0.1:8000/adventures/detail/"
+        api_path = "/adventures/detail/"
         payload = {
             "adventure_name": adventure_name
         }
@@ -157,26 +243,25 @@ class Adventure(commands.Cog):
             return embed
             
 
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(api_url, json=payload) as response:
-                    if response.status in range(200, 300):
-                        data = await response.json()
-                        embed = format_adventure_info(data)
-                        await interaction.response.send_message(embed=embed)
-                    elif response.status in range(400, 500):
-                        error = await response.json()
-                        error = error['non_field_errors'][0]
-                        await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
-                        return
-                    else:
-                        error = "An unexpected error occurred. Please try again later."
-                        await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
-                        return
-            except aiohttp.ClientError as e:
-                error = f"Network error: {str(e)}"
+        try:
+            response = await self.bot.api.get(api_path, payload)
+            if response.status in range(200, 300):
+                data = response.data
+                embed = format_adventure_info(data)
+                await interaction.response.send_message(embed=embed)
+            elif response.status in range(400, 500):
+                error = response.data
+                error = error['non_field_errors'][0]
+                await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
+                return
+            else:
+                error = "An unexpected error occurred. Please try again later."
                 await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
                 return
+        except aiohttp.ClientError as e:
+            error = f"Network error: {str(e)}"
+            await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
+            return
 
 
     @adventure_group.command(name="start", description="Start an adventure")
@@ -188,7 +273,7 @@ class Adventure(commands.Cog):
         The user must provide the name of the adventure they want to start.
         """
 
-        api_url = "http://127.0.0.1:8000/adventures/start/"
+        api_path = "/adventures/start/"
 
         payload = {
             "discord_id": str(interaction.user.id),
@@ -215,26 +300,83 @@ class Adventure(commands.Cog):
             return embed
 
 
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.post(api_url, json=payload) as response:
-                    if response.status in range(200, 300):
-                        data = await response.json()
-                        embed = format_start_adventure(data)
-                        await interaction.response.send_message(embed=embed)
-                    elif response.status in range(400, 500):
-                        error = await response.json()
-                        error = error['non_field_errors'][0]
-                        await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
-                        return
-                    else:
-                        error = "An unexpected error occurred. Please try again later."
-                        await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
-                        return
-            except aiohttp.ClientError as e:
-                error = f"Network error: {str(e)}"
+        try:
+            response = await self.bot.api.post(api_path, payload)
+            if response.status in range(200, 300):
+                data = response.data
+                self.scheduler.schedule(payload["discord_id"], parse_deadline(data["ends_at"]), data.get("name", adventure_name))
+                embed = format_start_adventure(data)
+                await interaction.response.send_message(embed=embed)
+            elif response.status in range(400, 500):
+                error = response.data
+                error = error['non_field_errors'][0]
+                await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
+                return
+            else:
+                error = "An unexpected error occurred. Please try again later."
                 await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
                 return
+        except aiohttp.ClientError as e:
+            error = f"Network error: {str(e)}"
+            await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
+            return
+
+    async def fetch_level(self, user):
+        '''
+        Returns the level of a user, used to only suggest adventures they can start.
+        '''
+
+        response = await self.bot.api.post("/users/profile/", {"discord_id": str(user.id), "username": user.name})
+        if response.status in range(200, 300):
+            return response.data.get("level")
+        return None
+
+    def adventure_choices(self, current, allowed=None):
+        return [
+            discord.app_commands.Choice(name=adventure["name"][:100], value=adventure["name"][:100])
+            for adventure in self.catalog.search(current, allowed)
+        ]
+
+    @adventure_info.autocomplete("adventure_name")
+    async def adventure_info_autocomplete(self, interaction: discord.Interaction, current: str):
+        '''
+        Suggests every adventure matching what the user has typed so far.
+        '''
+
+        return self.adventure_choices(current)
+
+    @start_adventure.autocomplete("adventure_name")
+    async def start_adventure_autocomplete(self, interaction: discord.Interaction, current: str):
+        '''
+        Suggests the adventures matching what the user has typed so far that their level allows them to start.
+        The level is cached, until it is known every adventure is suggested.
+        '''
+
+        level = self.levels.get(interaction.user)
+        if level is None:
+            return self.adventure_choices(current)
+        return self.adventure_choices(current, lambda adventure: adventure.get("required_level", 1) <= level)
+
+    async def reseed_deadline(self, user):
+        '''
+        Schedules the deadline of the user's current adventure from their snapshot, or cancels it if they have none.
+        A finished adventure is left alone, its deadline has either fired or is about to.
+        '''
+
+        discord_id = str(user.id)
+        try:
+            response = await self.bot.api.post("/users/snapshot/", {"discord_id": discord_id, "username": user.name})
+        except aiohttp.ClientError as e:
+            print(f"Could not reload the adventure of {discord_id}: {str(e)}")
+            return
+        if response.status not in range(200, 300):
+            return
+
+        adventure = response.data.get("current_adventure")
+        if adventure is None:
+            self.scheduler.cancel(discord_id)
+        elif not adventure.get("complete"):
+            self.scheduler.schedule(discord_id, parse_deadline(adventure["ends_at"]), adventure.get("name"))
 
     async def complete_adventure(self, interaction: discord.Interaction):
         """
@@ -243,53 +385,39 @@ class Adventure(commands.Cog):
         It is called when the user checks their adventure status and it is complete.
         """
 
-        api_url = "http://127.0.0.1:8000/adventures/complete/"
+        api_path = "/adventures/complete/"
         payload = {
             "discord_id": str(interaction.user.id)
         }
 
-        def format_complete_adventure(adventure):
-            '''
-            Helper function to format the adventure completion response.
-            '''
-
-            adventure_name = adventure.get("adventure_name", "Unknown Adventure")
-            rewarded_xp = adventure.get("xp_reward", 0)
-            rewarded_money = adventure.get("money_reward", 0)
-
-            embed = discord.Embed(
-                title=f"{adventure_name} Completed!",
-                color=discord.Color.green()
-            )
-            embed.add_field(name="XP Gained", value=rewarded_xp, inline=True)
-            embed.add_field(name="Money Gained", value=rewarded_money, inline=True)
-            embed.set_footer(text="Congratulations on completing your adventure!")
-
-            return embed
-
-
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.post(api_url, json=payload) as response:
-                    if response.status in range(200, 300):
-                        data = await response.json()
-                        embed = format_complete_adventure(data)
-                        await interaction.response.send_message(embed=embed)
-                    elif response.status in range(400, 500):
-                        error = await response.json()
-                        error = error['non_field_errors'][0]
-                        await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
-                        return
-                    else:
-                        error = "An unexpected error occurred. Please try again later."
-                        await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
-                        return
-            except aiohttp.ClientError as e:
-                error = f"Network error: {str(e)}"
+        try:
+            response = await self.bot.api.post(api_path, payload)
+            if response.status in range(200, 300):
+                data = response.data
+                if data.get("settled"):
+                    # An older settled result was collected, the user may already be on their next adventure.
+                    await self.reseed_deadline(interaction.user)
+                else:
+                    self.scheduler.cancel(payload["discord_id"])
+                if data.get("levels_gained"):
+                    self.levels.forget(interaction.user)
+                embed = self.format_complete_adventure(data)
+                await interaction.response.send_message(embed=embed)
+            elif response.status in range(400, 500):
+                error = response.data
+                error = error['non_field_errors'][0]
                 await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
                 return
-            
-        
+            else:
+                error = "An unexpected error occurred. Please try again later."
+                await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
+                return
+        except aiohttp.ClientError as e:
+            error = f"Network error: {str(e)}"
+            await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
+            return
+
+
     @adventure_group.command(name="status", description="Check the status of your adventure")
     async def adventure_status(self, interaction: discord.Interaction):
         """
@@ -299,9 +427,10 @@ class Adventure(commands.Cog):
         If the adventure is still in progress, it formats the response and sends it to the user.
         """
 
-        api_url = "http://127.0.0.1:8000/adventures/status/"
+        api_path = "/users/snapshot/"
         payload = {
-            "discord_id": str(interaction.user.id)
+            "discord_id": str(interaction.user.id),
+            "username": interaction.user.name
         }
 
         def format_adventure_status(adventure):
@@ -322,31 +451,36 @@ class Adventure(commands.Cog):
 
             return embed        
         
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.post(api_url, json=payload) as response:
-                    if response.status in range(200, 300):
-                        data = await response.json()
-                        if data.get("complete"):
-                            await self.complete_adventure(interaction)
-                            return
-                        else:
-                            embed = format_adventure_status(data)
-                            await interaction.response.send_message(embed=embed)
-                            return
-                    elif response.status in range(400, 500):
-                        error = await response.json()
-                        error = error['non_field_errors'][0]
-                        await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
-                        return
-                    else:
-                        error = "An unexpected error occurred. Please try again later."
-                        await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
-                        return
-            except aiohttp.ClientError as e:
-                error = f"Network error: {str(e)}"
+        try:
+            response = await self.bot.api.post(api_path, payload)
+            if response.status in range(200, 300):
+                data = response.data
+                adventure = data.get("current_adventure")
+                if data.get("adventure_ready"):
+                    await self.complete_adventure(interaction)
+                    return
+                elif adventure is None:
+                    error = "User is not on an adventure."
+                    await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
+                    return
+                else:
+                    self.scheduler.schedule(payload["discord_id"], parse_deadline(adventure["ends_at"]), adventure.get("name"))
+                    embed = format_adventure_status(adventure)
+                    await interaction.response.send_message(embed=embed)
+                    return
+            elif response.status in range(400, 500):
+                error = response.data
+                error = error.get('error') or error['non_field_errors'][0]
+                await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
+                return
+            else:
+                error = "An unexpected error occurred. Please try again later."
                 await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
                 return
+        except aiohttp.ClientError as e:
+            error = f"Network error: {str(e)}"
+            await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
+            return
 
 
 
@@ -52,9 +52,37 @@ class Gamble(commands.Cog):
 
 
 
+    def format_batch(self, title, data, describe):
+        '''
+        Helper function to format the result of a batch of games.
+        describe is called with each game and returns the line shown for it.
+        '''
+
+        summary = data['summary']
+        lines = [describe(game) for game in data['games']]
+        if len(lines) > 20:
+            lines = lines[:20] + [f"...and {len(lines) - 20} more"]
+
+        embed = discord.Embed(
+            title=title,
+            description="\n".join(lines),
+            color=discord.Color.green() if summary['net'] > 0 else discord.Color.red()
+        )
+        embed.add_field(name="Games Played", value=f"**{summary['played']}** ({summary['wins']} won)", inline=True)
+        embed.add_field(name="Net", value=f"**{summary['net']:+}**", inline=True)
+        embed.add_field(name="Your New Balance", value=f"**{data['balance']}**", inline=False)
+        if summary['stopped_early']:
+            embed.set_footer(text="Stopped early, you hit your loss limit or ran out of money.")
+        return embed
+
     @gamble_group.command(name="coinflip", description="Flip a coin and place a bet")
-    @discord.app_commands.describe(bet="The amount of money to bet", side="Heads or Tails")
-    async def coinflip(self, interaction: discord.Interaction, bet: int, side: str):
+    @discord.app_commands.describe(
+        bet="The amount of money to bet",
+        side="Heads or Tails",
+        count="How many times to flip (default 1, max 100)",
+        stop_loss="Stop flipping once you have lost this much"
+    )
+    async def coinflip(self, interaction: discord.Interaction, bet: int, side: str, count: int = 1, stop_loss: int = None):
         """
         Flip a coin, place a bet, and check if you win or lose.
         """
@@ -67,17 +95,24 @@ class Gamble(commands.Cog):
             await interaction.response.send_message("Your bet must be a positive integer.", ephemeral=True)
             return
 
+        if not 1 <= count <= 100:
+            await interaction.response.send_message("You can play between 1 and 100 games at a time.", ephemeral=True)
+            return
+
         discord_id = str(interaction.user.id)
         username = interaction.user.name
 
-        api_url = "http://127.0.0.1:8000/users/coinflip/"  
+        api_path = "/users/coinflip/"  
 
         payload = {
             "discord_id": discord_id,
             "username": username,
             "bet": bet,
-            "side": side
+            "side": side,
+            "count": count
         }
+        if stop_loss is not None:
+            payload["stop_loss"] = stop_loss
 
         def format_response(result):
             '''
@@ -99,28 +134,34 @@ class Gamble(commands.Cog):
             return embed
 
 
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.post(api_url, json=payload) as response:
-                    if response.status in range(200, 300):
-                        data = await response.json()
-                        embed = format_response(data)
-                        await interaction.response.send_message(embed=embed)
-                    elif response.status in range (400, 500):
-                        error = await response.json()
-                        error = error['error']['non_field_errors'][0]
-                        await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
-                        return
-                    else:
-                        error = "An unexpected error occurred. Please try again later."
-                        await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
-            except aiohttp.ClientError as e:
-                error = f"Network error: {str(e)}"
+        try:
+            response = await self.bot.api.post(api_path, payload)
+            if response.status in range(200, 300):
+                data = response.data
+                if count > 1:
+                    embed = self.format_batch("🪙 Coin Flips 🪙", data, lambda game: f"{"✅" if game['win'] else "❌"} {game['result']} ({game['change']:+})")
+                else:
+                    embed = format_response(data)
+                await interaction.response.send_message(embed=embed)
+            elif response.status in range (400, 500):
+                error = response.data
+                error = error['error']['non_field_errors'][0]
                 await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
-    
+                return
+            else:
+                error = "An unexpected error occurred. Please try again later."
+                await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
+        except aiohttp.ClientError as e:
+            error = f"Network error: {str(e)}"
+            await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
+
     @gamble_group.command(name="slots", description="Play a slot machine game")
-    @discord.app_commands.describe(bet="The amount of money to bet")
-    async def slots(self, interaction: discord.Interaction, bet: int):
+    @discord.app_commands.describe(
+        bet="The amount of money to bet",
+        count="How many times to spin (default 1, max 100)",
+        stop_loss="Stop spinning once you have lost this much"
+    )
+    async def slots(self, interaction: discord.Interaction, bet: int, count: int = 1, stop_loss: int = None):
         """
         Play a slot machine game.
         The user can place a bet and the result will be displayed.
@@ -132,13 +173,20 @@ class Gamble(commands.Cog):
             await interaction.response.send_message("Your bet must be a positive integer.", ephemeral=True)
             return
 
+        if not 1 <= count <= 100:
+            await interaction.response.send_message("You can play between 1 and 100 games at a time.", ephemeral=True)
+            return
+
         discord_id = str(interaction.user.id)
         
-        api_url = "http://127.0.0.1:8000/users/slots/"
+        api_path = "/users/slots/"
         payload = {
             "discord_id": discord_id,
-            "bet": bet
+            "bet": bet,
+            "count": count
         }
+        if stop_loss is not None:
+            payload["stop_loss"] = stop_loss
 
             
 
@@ -202,25 +250,28 @@ class Gamble(commands.Cog):
             embed.set_footer(text=f"{"Congrats!" if data['win'] else "Better Luck Next Time!"}")
             await message.edit(embed=embed)
 
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.post(api_url, json=payload) as response:
-                    if response.status in range(200, 300):
-                        data = await response.json()
-                        emojis = data['emojis']
-                        await spin_slots(interaction, emojis, data)
-
-                    elif response.status in range(400, 500):
-                        error = await response.json()
-                        error = error['error']['non_field_errors'][0]
-                        await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
-                        return
-                    else:
-                        error = "An unexpected error occurred. Please try again later."
-                        await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
-            except aiohttp.ClientError as e:
-                error = f"Network error: {str(e)}"
+        try:
+            response = await self.bot.api.post(api_path, payload)
+            if response.status in range(200, 300):
+                data = response.data
+                if count > 1:
+                    embed = self.format_batch("🎰 Slot Machine 🎰", data, lambda game: f"{" | ".join(game['slots'])} ({game['change']:+})")
+                    await interaction.response.send_message(embed=embed)
+                else:
+                    emojis = data['emojis']
+                    await spin_slots(interaction, emojis, data)
+
+            elif response.status in range(400, 500):
+                error = response.data
+                error = error['error']['non_field_errors'][0]
+                await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
+                return
+            else:
+                error = "An unexpected error occurred. Please try again later."
                 await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
+        except aiohttp.ClientError as e:
+            error = f"Network error: {str(e)}"
+            await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
 
 
 
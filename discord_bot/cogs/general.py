@@ -8,15 +8,27 @@ This file contains general commands for the bot, including user profile display.
 
 
 
+import logging
 import discord
 from discord.ext import commands
 import aiohttp
+from member_sync import MemberSync
+
+logger = logging.getLogger(__name__)
 
 
 class General(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        
+        self.member_sync = MemberSync(bot.api)
+        self.synced_guilds = set()
+
+    async def cog_load(self):
+        self.member_sync.start()
+
+    async def cog_unload(self):
+        await self.member_sync.stop()
+
     user_group = discord.app_commands.Group(name="user", description="User commands")
 
     def format_error(self, error):
@@ -31,35 +43,48 @@ class General(commands.Cog):
         )
         return embed
 
+    @commands.Cog.listener()
+    async def on_ready(self):
+        '''
+        Listener to register the members of every guild in bulk, once per guild.
+        on_ready fires again after a reconnect, so guilds that were already synced are skipped
+        and guilds whose sync failed are tried again.
+        '''
+
+        for guild in self.bot.guilds:
+            if guild.id not in self.synced_guilds:
+                await self.sync_guild(guild)
+        logger.info("Synced members of %d of %d guilds.", len(self.synced_guilds), len(self.bot.guilds))
+
+    async def sync_guild(self, guild):
+        if await self.member_sync.sync_guild(guild):
+            self.synced_guilds.add(guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild: discord.Guild):
+        '''
+        Listener to register the members of a guild the bot was just added to.
+        '''
+
+        await self.sync_guild(guild)
+
     @commands.Cog.listener()
     async def on_member_join(self, member: discord.Member):
         '''
         Listener to create a new user in the database when they join the server.
+        Members are queued and registered in bulk with the next sync.
         '''
 
-        if not member.bot:
-            discord_id = str(member.id)
-            username = member.name
-            api_url = "http://127.0.0.1:8000/users/profile/"
-            payload = {
-                "discord_id": discord_id,
-                "username": username
-            }
+        self.member_sync.add(member)
 
-            async with aiohttp.ClientSession() as session:
-                try:
-                    async with session.post(api_url, json=payload) as response:
-                        if response.status in range(200, 300):
-                            pass
-                        elif response.status in range(400, 500):
-                            error = await response.json()
-                            error = error['non_field_errors']
-                            print(f"Error: {error[0]}")
-                        else:
-                            print("An unexpected error occurred. Please try again later.")
-                except aiohttp.ClientError as e:
-                    print(f"Network error: {str(e)}")
+    @commands.Cog.listener()
+    async def on_user_update(self, before: discord.User, after: discord.User):
+        '''
+        Listener to keep usernames up to date when a user renames themselves.
+        '''
 
+        if before.name != after.name:
+            self.member_sync.add(after)
 
 
 
@@ -94,48 +119,17 @@ class General(commands.Cog):
 
         discord_id = str(interaction.user.id)
         username = interaction.user.name  
-        api_url = "http://127.0.0.1:8000/users/profile/"  
+        api_path = "/users/snapshot/"  
 
         payload = {
             "discord_id": discord_id,
             "username": username
         }
 
-        async def _get_best_gear(self, interaction):
-            """
-            Helper function to get the best gear for the user.
-            This function sends a request to the API to retrieve the user's best gear.
-            The API is expected to return a list of gear items owned by the user.
-            """
-
-            discord_id = str(interaction.user.id)
-            api_url = "http://127.0.0.1:8000/gear/best_items/"
-            payload = {
-                "discord_id": discord_id
-            }
-            async with aiohttp.ClientSession() as session:
-                try:
-                    async with session.get(api_url, json=payload) as response:
-                        if response.status in range(200, 300):
-                            data = await response.json()
-                            return data
-                        elif response.status in range(400, 500):
-                            error = await response.json()
-                            error = error.get('error', {}).get('non_field_errors', ["An unknown error occurred."])[0]
-                            await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
-                            return
-                        else:
-                            error = "An unexpected error occurred. Please try again later."
-                            await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
-                            return
-                except aiohttp.ClientError as e:
-                    error = f"Network error: {str(e)}"
-                    await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
-                    return
-
         async def display_profile(interaction, data):
             """
             Helper function to display the user's profile.
+            The snapshot already holds the best gear, so no second request is needed.
             """
 
             username = data.get("username", "Unknown")
@@ -151,10 +145,10 @@ class General(commands.Cog):
             embed.add_field(name="XP", value=xp, inline=True)
             embed.add_field(name="Money", value=money, inline=True)
 
-            best_gear_data = await _get_best_gear(self, interaction)
-            xp_percent = best_gear_data['best_gear_xp']['xp_bonus'] if best_gear_data['best_gear_xp']['xp_bonus'] is not None else 0
-            money_percent = best_gear_data['best_gear_money']['money_bonus'] if best_gear_data['best_gear_money']['money_bonus'] is not None else 0
-            time_percent = best_gear_data['best_gear_time']['time_bonus'] if best_gear_data['best_gear_time']['time_bonus'] is not None else 0
+            best_gear = data.get("best_gear", {})
+            xp_percent = best_gear['xp']['xp_bonus'] if best_gear.get('xp') else 0
+            money_percent = best_gear['money']['money_bonus'] if best_gear.get('money') else 0
+            time_percent = best_gear['time']['time_bonus'] if best_gear.get('time') else 0
 
             if xp_percent != 0:
                 xp_percent = int(xp_percent) if xp_percent % 1 == 0 else xp_percent
@@ -172,26 +166,25 @@ class General(commands.Cog):
 
             await interaction.response.send_message(embed=embed)
 
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.post(api_url, json=payload) as response: 
-                    if response.status in range(200, 300):
-                        data = await response.json()
-                        await display_profile(interaction, data)
-                    elif response.status in range(400, 500):
-                        error = await response.json()
-                        error = error['non_field_errors'][0]
-                        await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
-                        return
-                    else:
-                        error = "An unexpected error occurred. Please try again later."
-                        await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
-                        return
-            except aiohttp.ClientError as e:
-                error = f"Network error: {str(e)}"
+        try:
+            response = await self.bot.api.post(api_path, payload)
+            if response.status in range(200, 300):
+                data = response.data
+                await display_profile(interaction, data)
+            elif response.status in range(400, 500):
+                error = response.data
+                error = error.get('error') or error['non_field_errors'][0]
                 await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
                 return
-            
+            else:
+                error = "An unexpected error occurred. Please try again later."
+                await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
+                return
+        except aiohttp.ClientError as e:
+            error = f"Network error: {str(e)}"
+            await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
+            return
+
     @user_group.command(name="level_up", description="Level up your user")
     async def level_up(self, interaction: discord.Interaction):
         """
@@ -202,7 +195,7 @@ class General(commands.Cog):
         """
 
         discord_id = str(interaction.user.id)
-        api_url = "http://127.0.0.1:8000/users/level_up/"
+        api_path = "/users/level_up/"
 
         payload = {
             "discord_id": discord_id
@@ -217,9 +210,11 @@ class General(commands.Cog):
             new_level = data.get("level", 1)
             xp_needed = data.get("xp_needed", 0)
             xp = data.get("xp", 0)
+            levels_gained = data.get("levels_gained", 1)
 
             embed = discord.Embed(
                 title=f"You leveled up to level {new_level}!",
+                description=f"You gained {levels_gained} levels at once." if levels_gained > 1 else None,
                 color=discord.Color.green()
             )
             embed.add_field(name="Current XP", value=xp, inline=True)
@@ -228,26 +223,25 @@ class General(commands.Cog):
             return embed
 
 
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.post(api_url, json=payload) as response:
-                    if response.status in range(200, 300):
-                        data = await response.json()
-                        embed = await format_level_up(data)
-                        await interaction.response.send_message(embed=embed)
-                    elif response.status in range(400, 500):
-                        error = await response.json()
-                        error = error['error']['non_field_errors'][0]
-                        await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
-                        return
-                    else:
-                        error = "An unexpected error occurred. Please try again later."
-                        await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
-                        return
-            except aiohttp.ClientError as e:
-                error = f"Network error: {str(e)}"
+        try:
+            response = await self.bot.api.post(api_path, payload)
+            if response.status in range(200, 300):
+                data = response.data
+                embed = await format_level_up(data)
+                await interaction.response.send_message(embed=embed)
+            elif response.status in range(400, 500):
+                error = response.data
+                error = error['error']['non_field_errors'][0]
                 await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
                 return
+            else:
+                error = "An unexpected error occurred. Please try again later."
+                await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
+                return
+        except aiohttp.ClientError as e:
+            error = f"Network error: {str(e)}"
+            await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
+            return
 
     @user_group.command(name="view_gear", description="View your owned gear")
     async def view_gear(self, interaction: discord.Interaction):
@@ -258,9 +252,10 @@ class General(commands.Cog):
         """
 
         discord_id = str(interaction.user.id)
-        api_url = "http://127.0.0.1:8000/gear/owned_items/"
+        api_path = "/users/snapshot/"
         payload = {
-            "discord_id": discord_id
+            "discord_id": discord_id,
+            "username": interaction.user.name
         }
 
         def format_gear(data):
@@ -287,26 +282,25 @@ class General(commands.Cog):
             embed.set_footer(text="Use /shop item_detail <item_name> to get more info on an item.")
             return embed
 
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(api_url, json=payload) as response:
-                    if response.status in range(200, 300):
-                        data = await response.json()
-                        embed = format_gear(data)
-                        await interaction.response.send_message(embed=embed)
-                    elif response.status in range(400, 500):
-                        error = await response.json()
-                        error = error['non_field_errors'][0]
-                        await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
-                        return
-                    else:
-                        error = "An unexpected error occurred. Please try again later."
-                        await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
-                        return
-            except aiohttp.ClientError as e:
-                error = f"Network error: {str(e)}"
+        try:
+            response = await self.bot.api.post(api_path, payload)
+            if response.status in range(200, 300):
+                data = response.data
+                embed = format_gear(data.get("owned_items", []))
+                await interaction.response.send_message(embed=embed)
+            elif response.status in range(400, 500):
+                error = response.data
+                error = error.get('error') or error['non_field_errors'][0]
+                await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
+                return
+            else:
+                error = "An unexpected error occurred. Please try again later."
                 await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
                 return
+        except aiohttp.ClientError as e:
+            error = f"Network error: {str(e)}"
+            await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
+            return
 
 
 
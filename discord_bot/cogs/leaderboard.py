@@ -38,50 +38,86 @@ class Leaderboard(commands.Cog):
 
         await interaction.response.send_message(embed=embed) 
 
-    def format_leaderboard(self, users, type):
+    def format_leaderboard(self, users, type, position=None):
         embed = discord.Embed(
             title=f"{type.title()} Leaderboard",
             description=f"Top users by {type.title()}",
             color=discord.Color.blue()
         )
-        i = 1
         for user in users:
             embed.add_field(
-                name=f"{i}. {user['username']}",
+                name=f"{user['rank']}. {user['username']}",
                 value=f"{type.title()}: {user[type]}",
                 inline=False
             )
-            i += 1
+
+        if position is not None:
+            user = position['user']
+            embed.set_footer(text=f"Your position: #{position['rank']} with {type.title()} {user[type]}")
         return embed
 
+    async def get_position(self, type, discord_id):
+        '''
+        Helper function to fetch the caller's position on a leaderboard.
+        Returns None if the caller is not on the leaderboard or the request fails.
+        '''
+
+        try:
+            response = await self.bot.api.get(f"/users/leaderboard/{type}/rank", {"discord_id": discord_id})
+        except aiohttp.ClientError:
+            return None
+        if response.status in range(200, 300):
+            return response.data
+        return None
+
 
         
 
+    async def get_page(self, type, cursor=None):
+        '''
+        Helper function to fetch a page of a leaderboard.
+        Returns None if the request fails.
+        '''
+
+        payload = {"cursor": cursor} if cursor else None
+        try:
+            response = await self.bot.api.get(f"/users/leaderboard/{type}", payload)
+        except aiohttp.ClientError:
+            return None
+        if response.status in range(200, 300):
+            return response.data
+        return None
+
+    async def send_leaderboard(self, interaction, type):
+        '''
+        Sends the first page of a leaderboard with buttons to page through the rest.
+        '''
+
+        try:
+            response = await self.bot.api.get(f"/users/leaderboard/{type}")
+            if response.status in range(200,300):
+                page = response.data
+                position = await self.get_position(type, str(interaction.user.id))
+                embed = self.format_leaderboard(page['results'], type, position)
+                await interaction.response.send_message(embed=embed, view=LeaderboardPages(self, type, page, position))
+            elif response.status in range(400,500):
+                await interaction.response.send_message("Client error occurred.", ephemeral=True)
+                return
+            else:
+                await interaction.response.send_message("Server error occurred.", ephemeral=True)
+                return
+        except aiohttp.ClientError as e:
+            await interaction.response.send_message(f"Network error: {str(e)}", ephemeral=True)
+            return
+
     @leaderboard_group.command(name="level", description="Display the leaderboard for levels")
     async def level(self, interaction: discord.Interaction):
         """
         Command to display the leaderboard for levels.
         This command fetches the leaderboard data from the API and formats it into an embed.
         """
-        
-        api_url = "http://127.0.0.1:8000/users/leaderboard/level"
-
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(api_url) as response:
-                    if response.status in range(200,300):
-                        data = await response.json()
-                        embed = self.format_leaderboard(data, "level")
-                        await interaction.response.send_message(embed=embed)
-                    elif response.status in range(400,500):
-                        await interaction.response.send_message("Client error occurred.", ephemeral=True)
-                        return
-                    else:
-                        await interaction.response.send_message("Server error occurred.", ephemeral=True)
-                        return
-            except aiohttp.ClientError as e:
-                await interaction.response.send_message(f"Network error: {str(e)}", ephemeral=True)
-                return
+
+        await self.send_leaderboard(interaction, "level")
 
     @leaderboard_group.command(name="money", description="Display the leaderboard for money")
     async def money(self, interaction: discord.Interaction):
@@ -89,25 +125,46 @@ class Leaderboard(commands.Cog):
         Command to display the leaderboard for money.
         This command fetches the leaderboard data from the API and formats it into an embed.
         """
-        
-        api_url = "http://127.0.0.1:8000/users/leaderboard/money"
-
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(api_url) as response:
-                    if response.status in range(200,300):
-                        data = await response.json()
-                        embed = self.format_leaderboard(data, "money")
-                        await interaction.response.send_message(embed=embed)
-                    elif response.status in range(400,500):
-                        await interaction.response.send_message("Client error occurred.", ephemeral=True)
-                        return
-                    else:
-                        await interaction.response.send_message("Server error occurred.", ephemeral=True)
-                        return
-            except aiohttp.ClientError as e:
-                await interaction.response.send_message(f"Network error: {str(e)}", ephemeral=True)
-                return
+
+        await self.send_leaderboard(interaction, "money")
+
+
+class LeaderboardPages(discord.ui.View):
+    '''
+    Previous and next buttons for a leaderboard message.
+    Pages are fetched from the API with the cursor tokens of the page on display when a button is pressed.
+    '''
+
+    def __init__(self, cog, type, page, position):
+        super().__init__(timeout=300)
+        self.cog = cog
+        self.type = type
+        self.page = page
+        self.position = position
+        self.update_buttons()
+
+    def update_buttons(self):
+        self.previous_page.disabled = not self.page.get('previous')
+        self.next_page.disabled = not self.page.get('next')
+
+    async def show(self, interaction, cursor):
+        page = await self.cog.get_page(self.type, cursor)
+        if page is None:
+            await interaction.response.send_message("Could not load that page, please try again.", ephemeral=True)
+            return
+
+        self.page = page
+        self.update_buttons()
+        embed = self.cog.format_leaderboard(page['results'], self.type, self.position)
+        await interaction.response.edit_message(embed=embed, view=self)
+
+    @discord.ui.button(label="Previous", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show(interaction, self.page.get('previous'))
+
+    @discord.ui.button(label="Next", style=discord.ButtonStyle.primary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show(interaction, self.page.get('next'))
 
 async def setup(bot):
     """
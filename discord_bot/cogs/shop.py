@@ -4,6 +4,7 @@ Author: Reagan Zierke
 Date: 2025-05-03
 Description: Shop commands for the bot.
 This file contains commands related to the shop, such as buying and listing items.
+Item names are autocompleted from a local copy of the gear list.
 """
 
 
@@ -11,10 +12,23 @@ This file contains commands related to the shop, such as buying and listing item
 import discord
 from discord.ext import commands
 import aiohttp  
+from catalog_index import CatalogIndex, UserCache
 
 class Shop(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.catalog = CatalogIndex(bot.api, "/gear/list/")
+        self.unowned = UserCache(self.fetch_unowned)
+
+    async def cog_load(self):
+        '''
+        Loads the gear list used for autocomplete.
+        '''
+
+        try:
+            await self.catalog.refresh()
+        except aiohttp.ClientError as e:
+            print(f"Could not load gear for autocomplete: {str(e)}")
     
     shop_group = discord.app_commands.Group(name="shop", description="Shop commands")
 
@@ -66,7 +80,7 @@ class Shop(commands.Cog):
         Command to list all items in the shop.
         """
 
-        api_url = "http://127.0.0.1:8000/gear/shop/"
+        api_path = "/gear/shop/"
         payload = {
             "discord_id": str(interaction.user.id)}
 
@@ -87,30 +101,29 @@ class Shop(commands.Cog):
             embed.set_footer(text="Use /shop item_detail <item_name> to get more info on an item.")
             return embed
 
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(api_url, json=payload) as response:
-                    if response.status in range(200,300):
-                        data = await response.json()
-                        if data and isinstance(data, list) and len(data) > 0:
-                            embed = format_embed(data)
-                            await interaction.response.send_message(embed=embed)
-                        else:
-                            await interaction.response.send_message("No items for sale at the moment.")
-                    elif response.status in range(400,500):
-                        error = await response.json()
-                        error = error['non_field_errors'][0]
-                        await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
-                        return 
-                    else:
-                        error = "Server error occurred."
-                        await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
-                        return
-            except aiohttp.ClientError as e:
-                error = f"Network error: {str(e)}"
+        try:
+            response = await self.bot.api.get(api_path, payload)
+            if response.status in range(200,300):
+                data = response.data
+                if data and isinstance(data, list) and len(data) > 0:
+                    embed = format_embed(data)
+                    await interaction.response.send_message(embed=embed)
+                else:
+                    await interaction.response.send_message("No items for sale at the moment.")
+            elif response.status in range(400,500):
+                error = response.data
+                error = error['non_field_errors'][0]
+                await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
+                return 
+            else:
+                error = "Server error occurred."
                 await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
                 return
-        
+        except aiohttp.ClientError as e:
+            error = f"Network error: {str(e)}"
+            await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
+            return
+
     @shop_group.command(name="item_detail", description="Get details about a specific item")
     @discord.app_commands.describe(item_name="Name of the item")
     async def item_detail(self, interaction: discord.Interaction, item_name: str):
@@ -118,7 +131,7 @@ class Shop(commands.Cog):
         Command to get details about a specific item.
         """
 
-        api_url = "http://127.0.0.1:8000/gear/gear_detail/"
+        api_path = "/gear/gear_detail/"
 
         payload = {
             "gear_name": item_name
@@ -164,27 +177,26 @@ class Shop(commands.Cog):
             embed.set_footer(text="Use /shop purchase <item_name> to purchase this item.")
             return embed
 
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(api_url, json=payload) as response:
-                    if response.status in range(200,300):
-                        data = await response.json()
-                        embed = format_embed(data)
-                        await interaction.response.send_message(embed=embed)
-                    elif response.status in range(400,500):
-                        error = await response.json()
-                        error = error['non_field_errors'][0]
-                        await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
-                        return
-                    else:
-                        error = "Server error occurred."
-                        await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
-                        return
-            except aiohttp.ClientError as e:
-                error = f"Network error: {str(e)}"
+        try:
+            response = await self.bot.api.get(api_path, payload)
+            if response.status in range(200,300):
+                data = response.data
+                embed = format_embed(data)
+                await interaction.response.send_message(embed=embed)
+            elif response.status in range(400,500):
+                error = response.data
+                error = error['non_field_errors'][0]
                 await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
                 return
-                
+            else:
+                error = "Server error occurred."
+                await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
+                return
+        except aiohttp.ClientError as e:
+            error = f"Network error: {str(e)}"
+            await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
+            return
+
     @shop_group.command(name="purchase", description="Purchase an item from the shop")
     @discord.app_commands.describe(item_name="Name of the item")
     async def purchase(self, interaction: discord.Interaction, item_name: str):
@@ -192,7 +204,7 @@ class Shop(commands.Cog):
         Command to purchase an item from the shop.
         """
 
-        api_url = "http://127.0.0.1:8000/gear/purchase/"
+        api_path = "/gear/purchase/"
         payload = {
             "discord_id": str(interaction.user.id),
             "gear_name": item_name
@@ -206,26 +218,62 @@ class Shop(commands.Cog):
             )
             return embed
 
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.post(api_url, json=payload) as response:
-                    if response.status in range(200,300):
-                        data = await response.json()
-                        embed = format_embed(data)
-                        await interaction.response.send_message(embed=embed)
-                    elif response.status in range(400,500):
-                        error = await response.json()
-                        error = error['non_field_errors'][0]
-                        await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
-                        return
-                    else:
-                        error = "Server error occurred."
-                        await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
-                        return
-            except aiohttp.ClientError as e:
-                error = f"Network error: {str(e)}"
+        try:
+            response = await self.bot.api.post(api_path, payload)
+            if response.status in range(200,300):
+                data = response.data
+                self.unowned.forget(interaction.user)
+                embed = format_embed(data)
+                await interaction.response.send_message(embed=embed)
+            elif response.status in range(400,500):
+                error = response.data
+                error = error['non_field_errors'][0]
                 await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
                 return
+            else:
+                error = "Server error occurred."
+                await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
+                return
+        except aiohttp.ClientError as e:
+            error = f"Network error: {str(e)}"
+            await interaction.response.send_message(embed=self.format_error(error), ephemeral=True)
+            return
+
+    async def fetch_unowned(self, user):
+        '''
+        Returns the ids of the gear a user does not own yet, used to only suggest gear they can buy.
+        '''
+
+        response = await self.bot.api.get("/gear/shop/", {"discord_id": str(user.id)})
+        if response.status in range(200, 300):
+            return {item["id"] for item in response.data}
+        return None
+
+    def item_choices(self, current, allowed=None):
+        return [
+            discord.app_commands.Choice(name=item["name"][:100], value=item["name"][:100])
+            for item in self.catalog.search(current, allowed)
+        ]
+
+    @item_detail.autocomplete("item_name")
+    async def item_detail_autocomplete(self, interaction: discord.Interaction, current: str):
+        '''
+        Suggests every item matching what the user has typed so far.
+        '''
+
+        return self.item_choices(current)
+
+    @purchase.autocomplete("item_name")
+    async def purchase_autocomplete(self, interaction: discord.Interaction, current: str):
+        '''
+        Suggests the items matching what the user has typed so far that they do not own yet.
+        Owned items are cached, until they are known every item is suggested.
+        '''
+
+        unowned = self.unowned.get(interaction.user)
+        if unowned is None:
+            return self.item_choices(current)
+        return self.item_choices(current, lambda item: item["id"] in unowned)
 
 
 async def setup(bot):
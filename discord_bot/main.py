@@ -13,6 +13,7 @@ from discord.ext import commands
 import os
 from dotenv import load_dotenv
 import asyncio
+from api_client import APIClient, HTTPTransport, InProcessTransport
 
 intents = discord.Intents.default()
 intents.message_content = True
@@ -61,12 +62,38 @@ token = os.getenv("DISCORD_TOKEN")
 if not token:
     raise ValueError("Discord token not found in .env file!")
 
+api_transport = os.getenv("API_TRANSPORT", "http").lower()
+api_base_url = os.getenv("API_BASE_URL", "http://127.0.0.1:8000")
+api_pool_limit = int(os.getenv("API_POOL_LIMIT", "100"))
+api_pool_limit_per_host = int(os.getenv("API_POOL_LIMIT_PER_HOST", "0"))
+api_keepalive_timeout = float(os.getenv("API_KEEPALIVE_TIMEOUT", "30"))
+api_timeout = float(os.getenv("API_TIMEOUT", "10"))
+
 async def main():
     '''
     Runs the main function to start the bot.
     '''
 
-    async with bot:
+    if api_transport == "inprocess":
+        transport = InProcessTransport()
+    elif api_transport == "http":
+        transport = HTTPTransport(
+            api_base_url,
+            limit=api_pool_limit,
+            limit_per_host=api_pool_limit_per_host,
+            keepalive_timeout=api_keepalive_timeout,
+            timeout=api_timeout,
+        )
+    else:
+        raise ValueError(f"Unknown API_TRANSPORT {api_transport!r}, expected 'http' or 'inprocess'.")
+
+    api = APIClient(transport)
+
+    # bot.start does not set up logging the way bot.run does.
+    discord.utils.setup_logging(root=True)
+
+    async with api, bot:
+        bot.api = api
         await load_cogs()
         await bot.start(token)
 
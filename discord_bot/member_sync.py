@@ -0,0 +1,124 @@
+"""
+File: member_sync.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Guild member sync for the bot.
+This file contains the queue that registers guild members with the API in bulk.
+Members are keyed by id, so a burst of joins or a member seen in several guilds becomes one entry,
+and the queue is sent to /users/members/sync every few seconds or as soon as a full batch is waiting.
+"""
+
+import asyncio
+import logging
+import aiohttp
+import discord
+
+logger = logging.getLogger(__name__)
+
+
+class MemberSync:
+    '''
+    Coalescing queue of members to upsert through /users/members/sync.
+    '''
+
+    def __init__(self, api, batch_size=1000, flush_interval=5):
+        self.api = api
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.pending = {}
+        self.lock = asyncio.Lock()
+        self.full = asyncio.Event()
+        self.task = None
+
+    def __len__(self):
+        return len(self.pending)
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        '''
+        Stops the flush task and sends whatever is still queued.
+        '''
+
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        await self.flush()
+
+    def add(self, member):
+        '''
+        Queues a member (or user) to be registered, bots are skipped.
+        '''
+
+        if member.bot:
+            return
+        self.pending[str(member.id)] = member.name
+        if len(self.pending) >= self.batch_size:
+            self.full.set()
+
+    async def run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self.full.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self.full.clear()
+
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Member sync failed.")
+
+    async def flush(self):
+        '''
+        Sends the queued members in batches of batch_size.
+        A batch that fails is put back in the queue, unless a newer username was queued meanwhile, and tried again later.
+        Returns True if every batch was sent.
+        '''
+
+        async with self.lock:
+            while self.pending:
+                batch = dict(list(self.pending.items())[:self.batch_size])
+                for discord_id in batch:
+                    del self.pending[discord_id]
+
+                members = [{"discord_id": discord_id, "username": username} for discord_id, username in batch.items()]
+                try:
+                    response = await self.api.post("/users/members/sync", {"members": members})
+                    if response.status not in range(200, 300):
+                        logger.warning("Member sync failed (status %s): %s", response.status, response.text[:200])
+                        if response.status >= 500:
+                            self.requeue(batch)
+                        return False
+                except aiohttp.ClientError as e:
+                    logger.warning("Member sync failed: %s", e)
+                    self.requeue(batch)
+                    return False
+            return True
+
+    def requeue(self, batch):
+        for discord_id, username in batch.items():
+            self.pending.setdefault(discord_id, username)
+
+    async def sync_guild(self, guild):
+        '''
+        Streams a guild's member list from Discord and queues every member, flushing each full batch as it goes.
+        Returns True if the whole list was fetched and sent.
+        '''
+
+        try:
+            async for member in guild.fetch_members(limit=None):
+                self.add(member)
+                if len(self.pending) >= self.batch_size and not await self.flush():
+                    return False
+        except discord.HTTPException as e:
+            logger.warning("Could not fetch the members of %s: %s", guild.name, e)
+            await self.flush()
+            return False
+        return await self.flush()
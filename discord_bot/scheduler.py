@@ -0,0 +1,95 @@
+"""
+File: scheduler.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Deadline scheduler for the bot.
+This file contains a min-heap scheduler that runs a callback when a deadline is reached.
+A single task sleeps until the earliest deadline, so any number of deadlines costs one timer.
+"""
+
+import asyncio
+import heapq
+import traceback
+from datetime import datetime, timezone
+
+
+def parse_deadline(value):
+    '''
+    Converts an ISO 8601 timestamp from the API to a POSIX timestamp.
+    '''
+
+    deadline = datetime.fromisoformat(value)
+    if deadline.tzinfo is None:
+        deadline = deadline.replace(tzinfo=timezone.utc)
+    return deadline.timestamp()
+
+
+class DeadlineScheduler:
+    '''
+    Min-heap of deadlines keyed by an id (e.g. a discord_id).
+    Each key has at most one live deadline, scheduling it again replaces the previous one.
+    Replaced and cancelled entries stay in the heap and are skipped when they come up.
+    '''
+
+    def __init__(self, callback):
+        self.callback = callback
+        self.heap = []
+        self.deadlines = {}
+        self.wakeup = asyncio.Event()
+        self.task = None
+
+    def __len__(self):
+        return len(self.deadlines)
+
+    def schedule(self, key, deadline, payload=None):
+        '''
+        Schedules callback(key, payload) to run at the POSIX timestamp deadline.
+        '''
+
+        self.deadlines[key] = (deadline, payload)
+        heapq.heappush(self.heap, (deadline, key))
+        if self.heap[0][1] == key:
+            self.wakeup.set()
+
+    def cancel(self, key):
+        self.deadlines.pop(key, None)
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            self.wakeup.clear()
+            now = datetime.now(timezone.utc).timestamp()
+
+            while self.heap and self.heap[0][0] <= now:
+                deadline, key = heapq.heappop(self.heap)
+                entry = self.deadlines.get(key)
+                if entry is None or entry[0] != deadline:
+                    continue
+                del self.deadlines[key]
+                loop.create_task(self.fire(key, entry[1]))
+
+            timeout = self.heap[0][0] - now if self.heap else None
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def fire(self, key, payload):
+        try:
+            await self.callback(key, payload)
+        except Exception:
+            traceback.print_exc()
@@ -1,7 +1,29 @@
 from django.contrib import admin
+from users.models import CustomUser
 from .models import Gear
+from .loadout import refresh_bonuses
 
 class GearAdmin(admin.ModelAdmin):
     list_display = ('name', 'cost', 'gear_type', 'xp_bonus', 'money_bonus', 'time_bonus')
 
+    def save_model(self, request, obj, form, change):
+        '''
+        Saves the gear and refreshes the stored bonuses of every user who owns it,
+        since changing the cost or type changes the gear's bonuses.
+        '''
+
+        super().save_model(request, obj, form, change)
+        if change:
+            refresh_bonuses(CustomUser.objects.filter(owned_items__item=obj))
+
+    def delete_model(self, request, obj):
+        user_ids = list(CustomUser.objects.filter(owned_items__item=obj).values_list('pk', flat=True))
+        super().delete_model(request, obj)
+        refresh_bonuses(CustomUser.objects.filter(pk__in=user_ids))
+
+    def delete_queryset(self, request, queryset):
+        user_ids = list(CustomUser.objects.filter(owned_items__item__in=queryset).values_list('pk', flat=True))
+        super().delete_queryset(request, queryset)
+        refresh_bonuses(CustomUser.objects.filter(pk__in=user_ids))
+
 admin.site.register(Gear, GearAdmin)
\ No newline at end of file
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class GearConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'gear'
+
+    def ready(self):
+        # Connects the signals that bump the gear catalog version.
+        from . import catalog  # noqa: F401
@@ -0,0 +1,21 @@
+"""
+File: catalog.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: In-memory catalog of gear.
+Gear is looked up by name on every detail and purchase request and listed by the shop, so it is served
+from core.catalog, cheapest first, and the catalog version is bumped whenever gear is saved or deleted.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from core.catalog import Catalog
+from .models import Gear
+
+gear = Catalog('gear', Gear, 'gear.serializers.ShopListSerializer', ordering=('cost', 'id'))
+
+
+@receiver(post_save, sender=Gear)
+@receiver(post_delete, sender=Gear)
+def gear_changed(sender, **kwargs):
+    gear.bump()
@@ -0,0 +1,117 @@
+"""
+File: loadout.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Loadout resolution for the Gear app.
+This file contains helpers that work out which owned gear gives a user their best bonuses,
+and keep the best bonus columns stored on CustomUser in sync when gear is granted or removed.
+"""
+
+from django.db import transaction
+from django.db.models import Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from users.models import CustomUser, OwnedItem
+from .models import Gear
+
+
+class Loadout:
+    '''
+    The best gear a user owns for each bonus.
+    Any slot is None when the user owns no gear.
+    '''
+
+    def __init__(self, best_gear_xp=None, best_gear_money=None, best_gear_time=None):
+        self.best_gear_xp = best_gear_xp
+        self.best_gear_money = best_gear_money
+        self.best_gear_time = best_gear_time
+
+    @property
+    def xp_bonus(self):
+        return self.best_gear_xp.xp_bonus if self.best_gear_xp else 0
+
+    @property
+    def money_bonus(self):
+        return self.best_gear_money.money_bonus if self.best_gear_money else 0
+
+    @property
+    def time_bonus(self):
+        return self.best_gear_time.time_bonus if self.best_gear_time else 0
+
+
+def resolve_loadout(user):
+    '''
+    Returns the Loadout for a user.
+    Fetches the user's owned gear in one query and picks the best item per bonus.
+    '''
+
+    return loadout_from(list(Gear.objects.filter(owneditem__user=user)))
+
+
+def loadout_from(owned_gear):
+    '''
+    Returns the Loadout for a list of already fetched gear.
+    '''
+
+    if not owned_gear:
+        return Loadout()
+
+    return Loadout(
+        best_gear_xp=max(owned_gear, key=lambda gear: gear.xp_bonus),
+        best_gear_money=max(owned_gear, key=lambda gear: gear.money_bonus),
+        best_gear_time=max(owned_gear, key=lambda gear: gear.time_bonus),
+    )
+
+
+def refresh_bonuses(users=None):
+    '''
+    Recomputes the stored best bonuses for a queryset of users (all users by default).
+    Runs as a single UPDATE with correlated MAX subqueries, users without gear are reset to 0.
+    Returns the number of users updated.
+    '''
+
+    if users is None:
+        users = CustomUser.objects.all()
+
+    owned = OwnedItem.objects.filter(user=OuterRef('pk')).values('user')
+
+    def best(field):
+        return Coalesce(Subquery(owned.annotate(best=Max(f'item__{field}')).values('best')), Value(0.0))
+
+    return users.update(
+        best_xp_bonus=best('xp_bonus'),
+        best_money_bonus=best('money_bonus'),
+        best_time_bonus=best('time_bonus'),
+    )
+
+
+def grant_gear(user, gear):
+    '''
+    Gives a piece of gear to a user.
+    The stored best bonuses are raised in the same transaction, without reading the user's other gear.
+    '''
+
+    with transaction.atomic():
+        owned_item = OwnedItem.objects.create(user=user, item=gear)
+        CustomUser.objects.filter(pk=user.pk).update(
+            best_xp_bonus=Greatest('best_xp_bonus', Value(gear.xp_bonus)),
+            best_money_bonus=Greatest('best_money_bonus', Value(gear.money_bonus)),
+            best_time_bonus=Greatest('best_time_bonus', Value(gear.time_bonus)),
+        )
+
+    user.best_xp_bonus = max(user.best_xp_bonus, gear.xp_bonus)
+    user.best_money_bonus = max(user.best_money_bonus, gear.money_bonus)
+    user.best_time_bonus = max(user.best_time_bonus, gear.time_bonus)
+    return owned_item
+
+
+def revoke_gear(user, gear):
+    '''
+    Removes a piece of gear from a user.
+    The stored best bonuses are recomputed in the same transaction.
+    '''
+
+    with transaction.atomic():
+        OwnedItem.objects.filter(user=user, item=gear).delete()
+        refresh_bonuses(CustomUser.objects.filter(pk=user.pk))
+
+    user.refresh_from_db(fields=['best_xp_bonus', 'best_money_bonus', 'best_time_bonus'])
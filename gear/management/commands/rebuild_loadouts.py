@@ -0,0 +1,18 @@
+"""
+File: rebuild_loadouts.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Management command to rebuild the stored gear bonuses of every user.
+Run it after editing gear in bulk or whenever the best bonus columns may have drifted from the owned gear.
+"""
+
+from django.core.management.base import BaseCommand
+from gear.loadout import refresh_bonuses
+
+
+class Command(BaseCommand):
+    help = "Recomputes best_xp_bonus, best_money_bonus and best_time_bonus for all users from their owned gear."
+
+    def handle(self, *args, **options):
+        updated = refresh_bonuses()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt gear bonuses for {updated} users."))
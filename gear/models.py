@@ -1,4 +1,6 @@
+from django.core.exceptions import ValidationError
 from django.db import models
+from core.search import normalize
 
 class Gear(models.Model):
     '''
@@ -7,6 +9,7 @@ class Gear(models.Model):
     '''
 
     name = models.CharField(max_length=255)
+    name_key = models.CharField(max_length=255, unique=True, editable=False)
     description = models.TextField()
     gear_type = models.CharField(
         max_length=50,
@@ -24,7 +27,27 @@ class Gear(models.Model):
 
     def save(self, *args, **kwargs):
         '''
-        Saves the gear item.
+        Saves the gear item and its normalized name.
+        '''
+
+        self.scale_to_cost()
+        self.name_key = normalize(self.name)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'name' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'name_key'}
+        super().save(*args, **kwargs)
+
+    def clean(self):
+        '''
+        Rejects a name that normalizes to the same key as another piece of gear's.
+        '''
+
+        if Gear.objects.filter(name_key=normalize(self.name)).exclude(pk=self.pk).exists():
+            raise ValidationError({'name': "Gear with this name already exists."})
+
+    def scale_to_cost(self):
+        '''
+        Sets the bonuses from the cost and gear type.
         '''
 
         gear_type_modifiers = {
@@ -41,7 +64,5 @@ class Gear(models.Model):
         self.money_bonus = round(points * multipliers['money_bonus'], 2)
         self.time_bonus = round(points * multipliers['time_bonus'], 2)
 
-        super().save(*args, **kwargs)
-
     def __str__(self):
         return self.name
\ No newline at end of file
@@ -1,6 +1,9 @@
 from rest_framework import serializers
 from users.models import CustomUser, OwnedItem
 from .models import Gear
+from .loadout import resolve_loadout
+from . import catalog
+from core.catalog import resolve_name
 
  
 class ShopListSerializer(serializers.ModelSerializer):
@@ -22,14 +25,9 @@ class GearDetailSerializer(serializers.Serializer):
     gear_name = serializers.CharField(source='name')
 
     def validate(self, data):
-        gear_name = data.get('name').title()
-        
-        try:
-            gear = Gear.objects.get(name=gear_name)
-        except Gear.DoesNotExist:
-            raise serializers.ValidationError("Gear does not exist.")
-        
-        data['gear'] = gear
+        snapshot = catalog.gear.current()
+        data['gear'] = resolve_name(snapshot, data.get('name'), "Gear", fuzzy=True)
+        data['catalog'] = snapshot
         return data
     
 class GearPurchaseSerializer(serializers.Serializer):
@@ -42,13 +40,9 @@ class GearPurchaseSerializer(serializers.Serializer):
     gear_name = serializers.CharField(source='name')
 
     def validate(self, data):
-        gear_name = data.get('name').title()
         discord_id = data.get('discord_id')
 
-        try:
-            gear = Gear.objects.get(name=gear_name)
-        except Gear.DoesNotExist:
-            raise serializers.ValidationError("Gear does not exist.")
+        gear = resolve_name(catalog.gear.current(), data.get('name'), "Gear")
         
         self.user, created = CustomUser.objects.get_or_create(
             discord_id=discord_id,
@@ -88,11 +82,13 @@ class UnownedGearSerializer(serializers.Serializer):
             }
         )
 
-        owned_gear_ids = OwnedItem.objects.filter(user=self.user).values_list('item_id', flat=True)
+        owned_gear_ids = set(OwnedItem.objects.filter(user=self.user).values_list('item_id', flat=True))
 
-        unowned_gear = Gear.objects.exclude(id__in=owned_gear_ids)
+        snapshot = catalog.gear.current()
+        unowned_gear = [gear for gear in snapshot.items if gear.id not in owned_gear_ids]
 
         data['gear'] = unowned_gear
+        data['catalog'] = snapshot
         return data
 
 
@@ -141,13 +137,9 @@ class BestGearSerializer(serializers.Serializer):
             }
         )
 
-        owned_gear_ids = OwnedItem.objects.filter(user=self.user).values_list('item_id', flat=True)
-
-        best_gear_xp = Gear.objects.filter(id__in=owned_gear_ids).order_by('-xp_bonus').first() or None
-        best_gear_money = Gear.objects.filter(id__in=owned_gear_ids).order_by('-money_bonus').first() or None
-        best_gear_time = Gear.objects.filter(id__in=owned_gear_ids).order_by('-time_bonus').first() or None
+        loadout = resolve_loadout(self.user)
 
-        data['best_gear_xp'] = best_gear_xp
-        data['best_gear_money'] = best_gear_money
-        data['best_gear_time'] = best_gear_time
+        data['best_gear_xp'] = loadout.best_gear_xp
+        data['best_gear_money'] = loadout.best_gear_money
+        data['best_gear_time'] = loadout.best_gear_time
         return data
\ No newline at end of file
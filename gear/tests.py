@@ -1,3 +1,194 @@
+"""
+File: tests.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Unit tests for the Gear app.
+This file contains tests for loadout resolution and the gear views.
+"""
+
+
+
+import json
+from io import StringIO
+from unittest.mock import patch
 from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework import status
+from users.models import CustomUser, OwnedItem
+from .models import Gear
+from django.core.management import call_command
+from .loadout import resolve_loadout, grant_gear, revoke_gear
+from . import catalog
+
+class LoadoutTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create(discord_id="12345", username="TestUser")
+        self.armor = Gear.objects.create(name="Test Armor", description="Armor", gear_type="armor", cost=750)
+        self.weapon = Gear.objects.create(name="Test Weapon", description="Weapon", gear_type="weapon", cost=750)
+        self.accessory = Gear.objects.create(name="Test Accessory", description="Accessory", gear_type="accessory", cost=750)
+
+    def test_resolve_loadout_no_gear(self):
+        '''
+        Test that a user without gear has an empty loadout and no bonuses.
+        '''
+        loadout = resolve_loadout(self.user)
+        self.assertIsNone(loadout.best_gear_xp)
+        self.assertEqual(loadout.time_bonus, 0)
+
+    def test_resolve_loadout_single_query(self):
+        '''
+        Test that the best gear for every bonus is resolved with one query.
+        '''
+        for gear in (self.armor, self.weapon, self.accessory):
+            OwnedItem.objects.create(user=self.user, item=gear)
+
+        with self.assertNumQueries(1):
+            loadout = resolve_loadout(self.user)
+        self.assertEqual(loadout.best_gear_xp, self.armor)
+        self.assertEqual(loadout.best_gear_money, self.weapon)
+        self.assertEqual(loadout.best_gear_time, self.accessory)
+
+    def test_grant_and_revoke_gear_update_stored_bonuses(self):
+        '''
+        Test that granting and revoking gear keeps the stored best bonuses in sync.
+        '''
+        grant_gear(self.user, self.armor)
+        grant_gear(self.user, self.accessory)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.best_xp_bonus, self.armor.xp_bonus)
+        self.assertEqual(self.user.best_money_bonus, self.accessory.money_bonus)
+        self.assertEqual(self.user.best_time_bonus, self.accessory.time_bonus)
+
+        revoke_gear(self.user, self.accessory)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.best_money_bonus, self.armor.money_bonus)
+        self.assertEqual(self.user.best_time_bonus, self.armor.time_bonus)
+
+    def test_rebuild_loadouts_command(self):
+        '''
+        Test that the rebuild_loadouts command recomputes stale bonuses for every user.
+        '''
+        OwnedItem.objects.create(user=self.user, item=self.weapon)
+        other_user = CustomUser.objects.create(discord_id="67890", best_xp_bonus=50.0)
+
+        call_command('rebuild_loadouts', stdout=StringIO())
+        self.user.refresh_from_db()
+        other_user.refresh_from_db()
+        self.assertEqual(self.user.best_money_bonus, self.weapon.money_bonus)
+        self.assertEqual(other_user.best_xp_bonus, 0)
+
+    def test_purchase_updates_stored_bonuses(self):
+        '''
+        Test that purchasing gear through the GearPurchaseView raises the stored bonuses.
+        '''
+        self.user.money = 1000
+        self.user.save()
+        response = self.client.post('/gear/purchase/', {"discord_id": self.user.discord_id, "gear_name": self.weapon.name}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.money, 250)
+        self.assertEqual(self.user.best_money_bonus, self.weapon.money_bonus)
+
+    def test_purchase_requires_exact_name(self):
+        '''
+        Test that a partial or ambiguous gear name is refused with suggestions and nothing is charged.
+        '''
+        self.user.money = 1000
+        self.user.save()
+        for name in ("Test Weap", "test"):
+            response = self.client.post('/gear/purchase/', {"discord_id": self.user.discord_id, "gear_name": name}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn("Did you mean", response.data['non_field_errors'][0])
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.money, 1000)
+        self.assertFalse(OwnedItem.objects.filter(user=self.user).exists())
+
+    def test_purchase_requires_gear_name(self):
+        '''
+        Test that a missing gear_name is reported by the serializer instead of failing the request.
+        '''
+        response = self.client.post('/gear/purchase/', {"discord_id": self.user.discord_id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('gear_name', response.data)
+
+    def test_concurrent_duplicate_purchase_is_rolled_back(self):
+        '''
+        Test that a purchase racing past the ownership check is refused by the unique constraint and not charged.
+        '''
+        self.user.money = 1000
+        self.user.save()
+        grant_gear(self.user, self.weapon)
+
+        with patch('gear.serializers.OwnedItem') as owned_item:
+            # The other purchase commits after this one's check ran.
+            owned_item.objects.filter.return_value.exists.return_value = False
+            response = self.client.post('/gear/purchase/', {"discord_id": self.user.discord_id, "gear_name": self.weapon.name}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['non_field_errors'], ["User already owns this gear."])
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.money, 1000)
+        self.assertEqual(OwnedItem.objects.filter(user=self.user, item=self.weapon).count(), 1)
+
+    def test_best_gear_view(self):
+        '''
+        Test that the BestGearView returns the best item for each bonus.
+        '''
+        OwnedItem.objects.create(user=self.user, item=self.armor)
+        OwnedItem.objects.create(user=self.user, item=self.weapon)
+        response = self.client.generic('GET', '/gear/best_items/', json.dumps({"discord_id": self.user.discord_id}), content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['best_gear_xp']['name'], self.armor.name)
+        self.assertEqual(response.data['best_gear_money']['name'], self.weapon.name)
+        self.assertEqual(response.data['best_gear_time']['name'], self.armor.name)
+
+    def test_shop_lists_unowned_gear_from_catalog(self):
+        '''
+        Test that the shop lists unowned gear cheapest first and reflects edits to gear.
+        '''
+        cheap = Gear.objects.create(name="Cheap Ring", description="Ring", gear_type="accessory", cost=75)
+        OwnedItem.objects.create(user=self.user, item=self.armor)
+
+        response = self.client.generic('GET', '/gear/shop/', json.dumps({"discord_id": self.user.discord_id}), content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['name'] for item in response.data], [cheap.name, self.weapon.name, self.accessory.name])
+
+        cheap.cost = 7500
+        cheap.save()
+        response = self.client.generic('GET', '/gear/shop/', json.dumps({"discord_id": self.user.discord_id}), content_type='application/json')
+        self.assertEqual(response.data[-1]['name'], cheap.name)
+        self.assertEqual(catalog.gear.find("cheap ring").cost, 7500)
+
+    def test_shop_etag_follows_owned_gear(self):
+        '''
+        Test that the shop answers with a 304 until the user's owned gear changes.
+        '''
+        payload = json.dumps({"discord_id": self.user.discord_id})
+        response = self.client.generic('GET', '/gear/shop/', payload, content_type='application/json')
+        etag = response['ETag']
+        self.assertIn('private', response['Cache-Control'])
+
+        response = self.client.generic('GET', '/gear/shop/', payload, content_type='application/json', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        grant_gear(self.user, self.weapon)
+        response = self.client.generic('GET', '/gear/shop/', payload, content_type='application/json', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn(self.weapon.name, [item['name'] for item in response.data])
+
+    def test_gear_list_includes_owned_gear(self):
+        '''
+        Test that the gear list has every item cheapest first and is revalidated by ETag.
+        '''
+        OwnedItem.objects.create(user=self.user, item=self.armor)
+        cheap = Gear.objects.create(name="Cheap Ring", description="Ring", gear_type="accessory", cost=75)
+
+        response = self.client.get('/gear/list/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['name'] for item in response.data], [cheap.name, self.armor.name, self.weapon.name, self.accessory.name])
+
+        response = self.client.get('/gear/list/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
 
-# Create your tests here.
@@ -1,8 +1,14 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from django.conf import settings
+from django.db import IntegrityError, transaction
 from . import serializers as cereal
-from users.models import OwnedItem
+from .loadout import grant_gear
+from core.conditional import conditional_response, make_etag
+from core.views import CatalogSearchView
+from . import catalog
+from users import wallet
 
 class ShopListView(APIView):
     """
@@ -22,14 +28,31 @@ class ShopListView(APIView):
         serializer = cereal.UnownedGearSerializer(data=request.data)
         if serializer.is_valid():
             gear = serializer.validated_data['gear']
-            gear = sorted(gear, key=lambda item: item.cost)
-            serialized_gear = cereal.ShopListSerializer(gear, many=True)
-            return Response(serialized_gear.data, status=status.HTTP_200_OK)
+            snapshot = serializer.validated_data['catalog']
+            etag = make_etag(snapshot.etag, [item.pk for item in gear])
+            return conditional_response(request, etag, lambda: snapshot.serialized(gear), private=True, no_cache=True)
         else:
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
         
     
+class GearListView(APIView):
+    '''
+    View to list every gear item, cheapest first, whether the user owns it or not.
+    The bot keeps this list for autocompleting item names.
+    '''
+
+    def get(self, request):
+        snapshot = catalog.gear.current()
+        return conditional_response(request, snapshot.etag, snapshot.serialized, max_age=settings.CATALOG_CHECK_INTERVAL)
+
+class GearSearchView(CatalogSearchView):
+    '''
+    View to search gear by name, see CatalogSearchView.
+    '''
+
+    catalog = catalog.gear
+
 class GearDetailView(APIView):
     '''
     View to get details of a specific gear item.
@@ -37,16 +60,13 @@ class GearDetailView(APIView):
     '''
 
     def get(self, request):
-        gear_name = request.data.get('gear_name').title()
-        if not gear_name:
-            return Response({"error": "gear_name is required"}, status=status.HTTP_400_BAD_REQUEST)
         serializer = cereal.GearDetailSerializer(data=request.data)
         
         if serializer.is_valid():
-            json_serializer = cereal.ShopListSerializer
             gear = serializer.validated_data['gear']
-            serialized_gear = json_serializer(gear)
-            return Response(serialized_gear.data, status=status.HTTP_200_OK)
+            snapshot = serializer.validated_data['catalog']
+            etag = make_etag(snapshot.etag, gear.pk)
+            return conditional_response(request, etag, lambda: snapshot.serialized([gear])[0], no_cache=True)
         else:
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
@@ -57,22 +77,22 @@ class GearPurchaseView(APIView):
     '''
 
     def post(self, request):
-        gear_name = request.data.get('gear_name').title()
-        discord_id = request.data.get('discord_id')
-
-        if not gear_name or not discord_id:
-            return Response({"error": "gear_name and discord_id are required"}, status=status.HTTP_400_BAD_REQUEST)
-    
         serializer = cereal.GearPurchaseSerializer(data=request.data)
 
         if serializer.is_valid():
             user = serializer.user
             gear = serializer.validated_data['gear']
 
-            user.money -= gear.cost
-            user.save()
-
-            OwnedItem.objects.create(user=user, item=gear)
+            # The serializer's ownership check can race with a concurrent purchase of the same item,
+            # so the unique (user, item) constraint decides and its error rolls the charge back.
+            try:
+                with transaction.atomic():
+                    balance = wallet.apply(user.pk, money=-gear.cost, reason='purchase')
+                    if balance is None:
+                        return Response({"non_field_errors": ["User does not have enough money to purchase this gear."]}, status=status.HTTP_400_BAD_REQUEST)
+                    grant_gear(user, gear)
+            except IntegrityError:
+                return Response({"non_field_errors": ["User already owns this gear."]}, status=status.HTTP_400_BAD_REQUEST)
 
             gear_serializer = cereal.ShopListSerializer(gear)
             return Response(gear_serializer.data, status=status.HTTP_201_CREATED)
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import CustomUser, CurrentAdventure, OwnedItem
+from .models import CustomUser, CurrentAdventure, OwnedItem, AdventureResult, LedgerEntry
+from gear.loadout import refresh_bonuses
 
 class CustomUserAdmin(admin.ModelAdmin):
     list_display = ('discord_id', 'username', 'level', 'xp', 'money')
@@ -14,23 +15,27 @@ class CustomUserAdmin(admin.ModelAdmin):
         ('Stats', {
             'fields': ('level', 'xp', 'money')
         }),
+        ('Gear Bonuses', {
+            'fields': ('best_xp_bonus', 'best_money_bonus', 'best_time_bonus')
+        }),
     )
-    readonly_fields = ('discord_id',)
+    readonly_fields = ('discord_id', 'best_xp_bonus', 'best_money_bonus', 'best_time_bonus')
 
 class CurrentAdventureAdmin(admin.ModelAdmin):
-    list_display = ('user', 'adventure', 'time_left', 'time_started')
+    list_display = ('user', 'adventure', 'time_left', 'time_started', 'ends_at')
     search_fields = ('user__username', 'adventure__name')
     list_filter = ('adventure',)
-    ordering = ('-time_left',)
+    ordering = ('ends_at',)
     list_per_page = 20
     fieldsets = (
         (None, {
             'fields': ('user', 'adventure')
         }),
         ('Time Left', {
-            'fields': ('time_left', 'time_started')
+            'fields': ('time_started', 'ends_at', 'time_left')
         }),
     )
+    readonly_fields = ('time_started', 'time_left')
 
 class OwnedItemAdmin(admin.ModelAdmin):
     list_display = ('user', 'item')
@@ -44,6 +49,43 @@ class OwnedItemAdmin(admin.ModelAdmin):
         }),
     )
 
+    def save_model(self, request, obj, form, change):
+        '''
+        Saves the owned item and refreshes the stored gear bonuses of the affected users.
+        '''
+
+        previous_user_id = OwnedItem.objects.filter(pk=obj.pk).values_list('user_id', flat=True).first() if change else None
+        super().save_model(request, obj, form, change)
+        refresh_bonuses(CustomUser.objects.filter(pk__in=[obj.user_id, previous_user_id]))
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        refresh_bonuses(CustomUser.objects.filter(pk=obj.user_id))
+
+    def delete_queryset(self, request, queryset):
+        user_ids = list(queryset.values_list('user_id', flat=True).distinct())
+        super().delete_queryset(request, queryset)
+        refresh_bonuses(CustomUser.objects.filter(pk__in=user_ids))
+
+class AdventureResultAdmin(admin.ModelAdmin):
+    list_display = ('user', 'adventure', 'xp_reward', 'money_reward', 'completed_at')
+    search_fields = ('user__username', 'adventure__name')
+    list_filter = ('adventure',)
+    ordering = ('-completed_at',)
+    list_per_page = 20
+
+class LedgerEntryAdmin(admin.ModelAdmin):
+    list_display = ('user', 'reason', 'delta_money', 'delta_xp', 'created_at')
+    search_fields = ('user__username', 'user__discord_id')
+    list_filter = ('reason',)
+    ordering = ('-created_at',)
+    list_per_page = 20
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
 admin.site.register(CustomUser, CustomUserAdmin)
 admin.site.register(CurrentAdventure, CurrentAdventureAdmin)
 admin.site.register(OwnedItem, OwnedItemAdmin)
+admin.site.register(AdventureResult, AdventureResultAdmin)
+admin.site.register(LedgerEntry, LedgerEntryAdmin)
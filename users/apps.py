@@ -13,3 +13,7 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
+
+    def ready(self):
+        # Connects the signals that keep the leaderboard cache in step with saved users.
+        from . import leaderboards  # noqa: F401
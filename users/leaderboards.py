@@ -0,0 +1,328 @@
+"""
+File: leaderboards.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Leaderboard queries for the Users app.
+This file contains the ranking column of every leaderboard and the queries that read it.
+Every leaderboard orders by (-column, id), which is exactly the order of its index, so the top of the board,
+a user's rank and their neighbours all come from short index range scans.
+The top of each board is also kept in memory by TopK and updated as the wallet and level ups change users.
+"""
+
+import base64
+import binascii
+import json
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import CustomUser
+from .serializers import CustomUserSerializer
+from . import progression
+
+LEADERBOARDS = {
+    'level': 'total_xp',
+    'money': 'money',
+}
+
+
+def ranking_field(kind):
+    return LEADERBOARDS[kind]
+
+
+def top(kind, limit=10):
+    '''
+    Returns the first limit users of a leaderboard.
+    '''
+
+    field = ranking_field(kind)
+    return CustomUser.objects.order_by(f'-{field}', 'id')[:limit]
+
+
+def ahead_of_key(kind, value, user_id):
+    '''
+    Returns a filter matching every user ranked ahead of the position (value, user_id).
+    '''
+
+    field = ranking_field(kind)
+    return Q(**{f'{field}__gt': value}) | Q(**{field: value, 'id__lt': user_id})
+
+
+def behind_key(kind, value, user_id):
+    '''
+    Returns a filter matching every user ranked behind the position (value, user_id).
+    '''
+
+    field = ranking_field(kind)
+    return Q(**{f'{field}__lt': value}) | Q(**{field: value, 'id__gt': user_id})
+
+
+def ahead_of(kind, user):
+    return ahead_of_key(kind, getattr(user, ranking_field(kind)), user.id)
+
+
+def behind(kind, user):
+    return behind_key(kind, getattr(user, ranking_field(kind)), user.id)
+
+
+def rank_at(kind, value, user_id):
+    '''
+    Returns the 1-based rank of the position (value, user_id), counted on the leaderboard's index.
+    '''
+
+    return CustomUser.objects.filter(ahead_of_key(kind, value, user_id)).count() + 1
+
+
+def rank(kind, user):
+    '''
+    Returns the 1-based position of user on a leaderboard.
+    '''
+
+    return rank_at(kind, getattr(user, ranking_field(kind)), user.id)
+
+
+def neighbours(kind, user, count=2):
+    '''
+    Returns the count users ranked just ahead of user and the count users ranked just behind, both best first.
+    '''
+
+    field = ranking_field(kind)
+    above = list(CustomUser.objects.filter(ahead_of(kind, user)).order_by(field, '-id')[:count])
+    below = list(CustomUser.objects.filter(behind(kind, user)).order_by(f'-{field}', 'id')[:count])
+    return above[::-1], below
+
+
+def serialize(users):
+    return [(user.pk, dict(data)) for user, data in zip(users, CustomUserSerializer(users, many=True).data)]
+
+
+class TopK:
+    '''
+    In-memory copy of the first size users of a leaderboard, as serialized rows sorted by (-value, id).
+    Users already in the cache are updated in place. A user that moves up into the cache from outside
+    clears it, since their row is not known, and it is loaded again on the next read.
+    Rows that fall to the end of the cache are dropped because an uncached user might be ahead of them.
+    Every update and invalidation bumps generation, so a load that raced with one is thrown away instead of
+    overwriting the newer rows with its older snapshot.
+    '''
+
+    MAX_LOAD_ATTEMPTS = 3
+
+    def __init__(self, kind, size, ttl):
+        self.kind = kind
+        self.field = ranking_field(kind)
+        self.size = size
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.generation = 0
+        self.clear()
+
+    def clear(self):
+        self.keys = None
+        self.rows = None
+        self.complete = False
+        self.loaded_at = 0
+
+    def invalidate(self):
+        with self.lock:
+            self.generation += 1
+            self.clear()
+
+    def is_fresh(self, limit):
+        if self.rows is None or time.monotonic() - self.loaded_at > self.ttl:
+            return False
+        return self.complete or len(self.rows) >= limit
+
+    def read(self, limit=10):
+        '''
+        Returns (id, serialized user) pairs for the first limit users, from memory when possible.
+        '''
+
+        for _ in range(self.MAX_LOAD_ATTEMPTS):
+            with self.lock:
+                if self.is_fresh(limit):
+                    return [(pk, dict(row)) for pk, row in self.rows[:limit]]
+                generation = self.generation
+
+            rows = serialize(list(top(self.kind, self.size)))
+            with self.lock:
+                # A change committed while the query ran may be missing from rows, so they are loaded again.
+                if self.generation == generation:
+                    self.rows = rows
+                    self.keys = [(-row[self.field], pk) for pk, row in rows]
+                    self.complete = len(rows) < self.size
+                    self.loaded_at = time.monotonic()
+                    break
+
+        # Under constant changes the last load is returned without being cached.
+        return [(pk, dict(row)) for pk, row in rows[:limit]]
+
+    def update(self, user_id, **values):
+        '''
+        Applies changed column values of a user to the cache.
+        '''
+
+        with self.lock:
+            self.generation += 1
+            if self.rows is None:
+                return
+
+            position = next((i for i, (pk, _) in enumerate(self.rows) if pk == user_id), None)
+            if position is None:
+                if self.field in values:
+                    key = (-values[self.field], user_id)
+                    if self.complete or (self.keys and key < self.keys[-1]):
+                        self.clear()
+                return
+
+            self.keys.pop(position)
+            pk, row = self.rows.pop(position)
+            row.update(values)
+            if 'level' in values:
+                row['xp_needed'] = progression.xp_needed(row['level'])
+
+            key = (-row[self.field], pk)
+            position = bisect_left(self.keys, key)
+            if position == len(self.keys) and not self.complete:
+                return
+            self.keys.insert(position, key)
+            self.rows.insert(position, (pk, row))
+
+
+caches = {kind: TopK(kind, settings.LEADERBOARD_CACHE_SIZE, settings.LEADERBOARD_CACHE_TTL) for kind in LEADERBOARDS}
+
+# Keeps versions of this process from matching those of an earlier run.
+PROCESS = uuid.uuid4().hex[:8]
+
+
+def version(kind):
+    '''
+    Returns a value that changes whenever the leaderboard may have changed, for building ETags without a query.
+    Changes committed by this process bump it through the cache's generation. Changes by other writers
+    show up once the TTL window rolls over, as they do in the cached rows. Only meaningful with the cache enabled.
+    '''
+
+    return PROCESS, caches[kind].generation, int(time.time() // settings.LEADERBOARD_CACHE_TTL)
+
+
+def cached_top(kind, limit=10):
+    '''
+    Returns (id, serialized user) pairs for the first limit users of a leaderboard,
+    from the in-process cache when it is enabled.
+    '''
+
+    if settings.LEADERBOARD_CACHE_ENABLED and limit <= caches[kind].size:
+        return caches[kind].read(limit)
+    return serialize(list(top(kind, limit)))
+
+
+def encode_cursor(direction, value, user_id):
+    payload = json.dumps([direction, value, user_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    '''
+    Returns the (direction, value, id) stored in a cursor token.
+    Raises ValueError if the token is not one made by encode_cursor.
+    '''
+
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        direction, value, user_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError, TypeError, ValueError):
+        raise ValueError("Invalid cursor.")
+
+    if direction not in ('next', 'previous') or not all(isinstance(item, int) for item in (value, user_id)):
+        raise ValueError("Invalid cursor.")
+    return direction, value, user_id
+
+
+def page(kind, limit=10, cursor=None):
+    '''
+    Returns a page of a leaderboard using keyset pagination on (value, id).
+    cursor is a token from a previous page's next or previous link, the first page is returned without one.
+    Ranks are counted on the index from the page's first row rather than carried in the cursor,
+    so they stay right when users are deleted or move between page fetches.
+    Returns a dict with the ranked results and the next and previous tokens (None at either end).
+    '''
+
+    field = ranking_field(kind)
+
+    if cursor is None:
+        rows = cached_top(kind, limit + 1)
+        has_next = len(rows) > limit
+        rows = rows[:limit]
+        first_rank = 1
+    else:
+        direction, value, user_id = decode_cursor(cursor)
+        if direction == 'next':
+            after = behind_key(kind, value, user_id)
+            rows = serialize(list(CustomUser.objects.filter(after).order_by(f'-{field}', 'id')[:limit + 1]))
+            has_next = len(rows) > limit
+            rows = rows[:limit]
+        else:
+            # The extra row is the seek for a row before the page.
+            before = ahead_of_key(kind, value, user_id)
+            rows = serialize(list(CustomUser.objects.filter(before).order_by(field, '-id')[:limit + 1]))
+            if len(rows) <= limit:
+                # Nothing is left before this page, which makes it the first one.
+                return page(kind, limit)
+            rows = rows[:limit][::-1]
+            pk, row = rows[-1]
+            has_next = CustomUser.objects.filter(behind_key(kind, row[field], pk)).exists()
+
+        first_rank = rank_at(kind, rows[0][1][field], rows[0][0]) if rows else 1
+
+    for position, (_, row) in enumerate(rows, start=first_rank):
+        row['rank'] = position
+
+    next_token = previous_token = None
+    if rows and has_next:
+        pk, row = rows[-1]
+        next_token = encode_cursor('next', row[field], pk)
+    if rows and first_rank > 1:
+        pk, row = rows[0]
+        previous_token = encode_cursor('previous', row[field], pk)
+
+    return {
+        "results": [row for _, row in rows],
+        "next": next_token,
+        "previous": previous_token,
+    }
+
+
+def changed(user_id, **values):
+    '''
+    Records new column values of a user once the surrounding transaction commits.
+    '''
+
+    if settings.LEADERBOARD_CACHE_ENABLED:
+        transaction.on_commit(lambda: [cache.update(user_id, **values) for cache in caches.values()])
+
+
+def reset_caches():
+    for cache in caches.values():
+        cache.invalidate()
+
+
+@receiver(post_save, sender=CustomUser)
+def user_saved(sender, instance, **kwargs):
+    changed(
+        instance.pk,
+        username=instance.username,
+        level=instance.level,
+        xp=instance.xp,
+        money=instance.money,
+        total_xp=instance.total_xp,
+    )
+
+
+@receiver(post_delete, sender=CustomUser)
+def user_deleted(sender, instance, **kwargs):
+    reset_caches()
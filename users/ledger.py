@@ -0,0 +1,212 @@
+"""
+File: ledger.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Economy ledger for the Users app.
+This file contains the buffered writer for LedgerEntry rows and the queries that read them back.
+Entries are queued once their transaction commits and written with a single bulk insert per batch,
+so a bet costs an append to a list instead of a row write.
+"""
+
+import atexit
+import logging
+import threading
+import time
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+from .models import CustomUser, LedgerEntry
+
+logger = logging.getLogger(__name__)
+
+
+class LedgerBuffer:
+    '''
+    Thread-safe buffer of unsaved LedgerEntry objects.
+    The buffer is flushed when it holds batch_size entries, and a timer flushes it flush_interval seconds
+    after the first entry arrives, so the tail of the buffer is written even when no more changes come in.
+    A failed flush backs off exponentially, entries still unwritten after max_retries attempts are dropped and
+    the buffer never holds more than max_buffer entries, so a write error that does not go away cannot grow it forever.
+    '''
+
+    def __init__(self, batch_size, flush_interval, max_buffer, max_retries):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.max_retries = max_retries
+        self.entries = []
+        self.lock = threading.Lock()
+        self.last_flush = time.monotonic()
+        self.failures = 0
+        self.retry_at = 0
+        self.timer = None
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, entries):
+        with self.lock:
+            self.entries.extend(entries)
+            self._trim()
+            now = time.monotonic()
+            due = len(self.entries) >= self.batch_size or now - self.last_flush >= self.flush_interval
+            due = due and now >= self.retry_at
+            if not due:
+                self._schedule()
+
+        if due:
+            self.flush()
+
+    def _schedule(self):
+        '''
+        Starts the flush timer if it is not running. Must be called with the lock held.
+        '''
+
+        if self.timer is None:
+            delay = max(self.flush_interval, self.retry_at - time.monotonic())
+            self.timer = threading.Timer(delay, self._flush_on_timer)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def _trim(self):
+        '''
+        Drops the oldest entries past max_buffer. Must be called with the lock held.
+        '''
+
+        overflow = len(self.entries) - self.max_buffer
+        if overflow > 0:
+            dead_letter(self.entries[:overflow], "the ledger buffer is full")
+            del self.entries[:overflow]
+
+    def _flush_on_timer(self):
+        with self.lock:
+            self.timer = None
+        try:
+            self.flush()
+        finally:
+            close_old_connections()
+
+    def flush(self):
+        '''
+        Writes every pending entry with one bulk insert.
+        Entries of users deleted since they were queued are dropped. If the insert fails the entries are queued again
+        (or dropped after max_retries failed flushes in a row), the error is logged and never raised,
+        since flushes run from other requests' on_commit callbacks.
+        Returns the number of entries written.
+        '''
+
+        with self.lock:
+            entries, self.entries = self.entries, []
+            self.last_flush = time.monotonic()
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+
+        if not entries:
+            return 0
+
+        try:
+            user_ids = {entry.user_id for entry in entries}
+            existing = set(CustomUser.objects.filter(pk__in=user_ids).values_list('pk', flat=True))
+            if len(existing) < len(user_ids):
+                kept = [entry for entry in entries if entry.user_id in existing]
+                logger.warning("Dropped %d ledger entries of deleted users.", len(entries) - len(kept))
+                entries = kept
+
+            with transaction.atomic():
+                LedgerEntry.objects.bulk_create(entries, batch_size=self.batch_size)
+        except Exception:
+            with self.lock:
+                self.failures += 1
+                if self.failures >= self.max_retries:
+                    logger.exception("Could not write %d ledger entries after %d attempts.", len(entries), self.failures)
+                    dead_letter(entries, "they could not be written")
+                    self.failures = 0
+                else:
+                    logger.exception("Could not write %d ledger entries, they will be retried.", len(entries))
+                    self.entries[:0] = entries
+                    self._trim()
+                self.retry_at = time.monotonic() + self.flush_interval * 2 ** self.failures
+                self._schedule()
+            return 0
+
+        with self.lock:
+            self.failures = 0
+            self.retry_at = 0
+        return len(entries)
+
+
+def dead_letter(entries, cause):
+    '''
+    Logs entries that are dropped without being written, one line each, so they can be replayed by hand.
+    '''
+
+    logger.error("Dropped %d ledger entries, %s.", len(entries), cause)
+    for entry in entries:
+        logger.error(
+            "Dropped ledger entry: user=%s money=%s xp=%s reason=%s created_at=%s",
+            entry.user_id, entry.delta_money, entry.delta_xp, entry.reason, entry.created_at.isoformat(),
+        )
+
+
+buffer = LedgerBuffer(
+    settings.LEDGER_BATCH_SIZE, settings.LEDGER_FLUSH_INTERVAL, settings.LEDGER_MAX_BUFFER, settings.LEDGER_MAX_RETRIES,
+)
+atexit.register(buffer.flush)
+
+
+def record(user_id, reason, money=0, xp=0):
+    '''
+    Records a balance change for a user.
+    The entry is only queued once the surrounding transaction commits, so rolled back changes are never recorded.
+    '''
+
+    record_many([(user_id, money, xp)], reason)
+
+
+def record_many(changes, reason):
+    '''
+    Records a list of (user_id, money, xp) balance changes that share a reason.
+    '''
+
+    created_at = timezone.now()
+    entries = [
+        LedgerEntry(user_id=user_id, delta_money=money, delta_xp=xp, reason=reason, created_at=created_at)
+        for user_id, money, xp in changes
+        if money or xp
+    ]
+    if entries:
+        transaction.on_commit(lambda: buffer.add(entries))
+
+
+def flush():
+    return buffer.flush()
+
+
+def history(user, limit=20):
+    '''
+    Returns the user's most recent ledger entries, newest first.
+    '''
+
+    buffer.flush()
+    return LedgerEntry.objects.filter(user=user).order_by('-created_at', '-id')[:limit]
+
+
+def totals(start, end=None, user=None):
+    '''
+    Returns the money and xp moved per reason between start and end (default now).
+    Each row is a dict with reason, money, xp and count.
+    '''
+
+    buffer.flush()
+    entries = LedgerEntry.objects.filter(created_at__gte=start, created_at__lt=end or timezone.now())
+    if user is not None:
+        entries = entries.filter(user=user)
+
+    return list(
+        entries
+        .values('reason')
+        .annotate(money=Sum('delta_money'), xp=Sum('delta_xp'), count=Count('id'))
+        .order_by('reason')
+    )
@@ -0,0 +1,51 @@
+"""
+File: leveling.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Level up service for the Users app.
+This file contains the functions that spend a user's xp on as many levels as it covers in one update.
+The update only applies if the level and xp are still the ones the new level was worked out from.
+"""
+
+from .models import CustomUser
+from . import leaderboards, progression
+
+
+def level_up(user, attempts=3):
+    '''
+    Spends the user's xp on as many levels as it covers and updates the user in place.
+    If the user changed concurrently, the level is worked out again from the stored values, up to attempts times.
+    Returns the number of levels gained.
+    '''
+
+    for attempt in range(attempts):
+        if attempt:
+            user.refresh_from_db(fields=['level', 'xp'])
+
+        new_level, new_xp = progression.level_for(user.level, user.xp)
+        if new_level == user.level:
+            return 0
+
+        updated = CustomUser.objects.filter(pk=user.pk, level=user.level, xp=user.xp).update(level=new_level, xp=new_xp)
+        if updated:
+            leaderboards.changed(user.pk, level=new_level, xp=new_xp)
+            gained = new_level - user.level
+            user.level = new_level
+            user.xp = new_xp
+            return gained
+
+    return 0
+
+
+def level_up_users(user_ids):
+    '''
+    Levels up every user in user_ids that has enough xp.
+    Returns a dict of user id to levels gained for the users that gained any.
+    '''
+
+    gained = {}
+    for user in CustomUser.objects.filter(pk__in=user_ids).only('pk', 'level', 'xp'):
+        levels = level_up(user)
+        if levels:
+            gained[user.pk] = levels
+    return gained
@@ -0,0 +1,100 @@
+"""
+File: simulate_gambling.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Management command to simulate the gambling games offline.
+Spins are sampled with NumPy (see users/simulation.py) from the same alias tables and payout table the slots view uses,
+so the reported return to player, hit frequency and ruin curves match the live games.
+"""
+
+import time
+from functools import partial
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from users.slots import machines
+from users.simulation import coinflip_changes, slot_changes
+
+
+GAMES = ['slots', 'coinflip']
+
+
+class Command(BaseCommand):
+    help = "Simulates the gambling games and reports return to player, hit frequency, variance and bankroll ruin curves."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--game', choices=[*GAMES, 'all'], default='all', help="Game to simulate.")
+        parser.add_argument('--machine', choices=list(machines), default='classic', help="Slot machine to simulate.")
+        parser.add_argument('--spins', type=int, default=10_000_000, help="Number of games used for the return to player statistics.")
+        parser.add_argument('--bet', type=int, default=10, help="Bet placed on every game.")
+        parser.add_argument('--players', type=int, default=10_000, help="Number of players in the ruin simulation.")
+        parser.add_argument('--bankroll', type=int, default=100, help="Starting balance of each player in the ruin simulation.")
+        parser.add_argument('--rounds', type=int, default=1000, help="Games each player plays in the ruin simulation.")
+        parser.add_argument('--chunk-size', type=int, default=1_000_000, help="Games sampled at once, bounds memory use.")
+        parser.add_argument('--seed', type=int, default=None, help="Seed for reproducible runs.")
+
+    def handle(self, *args, **options):
+        if options['bet'] < 1 or options['spins'] < 1 or options['chunk_size'] < 1:
+            raise CommandError("--bet, --spins and --chunk-size must be positive.")
+
+        rng = np.random.default_rng(options['seed'])
+        machine = machines[options['machine']]
+        samplers = {
+            'slots': partial(slot_changes, rng, machine),
+            'coinflip': partial(coinflip_changes, rng),
+        }
+        games = GAMES if options['game'] == 'all' else [options['game']]
+
+        for game in games:
+            started = time.perf_counter()
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{game} ({machine.name})" if game == 'slots' else game))
+            self.report_returns(samplers[game], options)
+            self.report_ruin(samplers[game], options)
+            self.stdout.write(f"  finished in {time.perf_counter() - started:.2f}s")
+
+    def report_returns(self, sample, options):
+        bet = options['bet']
+        remaining = options['spins']
+        total = 0
+        total_squares = 0
+        hits = 0
+
+        while remaining:
+            size = min(remaining, options['chunk_size'])
+            changes = sample(bet, size)
+            total += int(changes.sum())
+            total_squares += float(np.square(changes, dtype=np.float64).sum())
+            hits += int(np.count_nonzero(changes > 0))
+            remaining -= size
+
+        spins = options['spins']
+        mean = total / spins
+        variance = total_squares / spins - mean ** 2
+
+        self.stdout.write(f"  spins:              {spins:,}")
+        self.stdout.write(f"  return to player:   {1 + mean / bet:.4%}")
+        self.stdout.write(f"  house edge:         {-mean / bet:.4%}")
+        self.stdout.write(f"  hit frequency:      {hits / spins:.4%}")
+        self.stdout.write(f"  variance per bet:   {variance / bet ** 2:.4f}")
+        self.stdout.write(f"  std dev per bet:    {np.sqrt(variance) / bet:.4f}")
+
+    def report_ruin(self, sample, options):
+        '''
+        Plays options['rounds'] games for every player, a player is ruined once they can't cover the bet.
+        sample(bet, size) returns the balance change of size games.
+        '''
+
+        bet = options['bet']
+        players = options['players']
+        rounds = options['rounds']
+        balance = np.full(players, options['bankroll'], dtype=np.int64)
+        checkpoints = sorted({min(rounds, checkpoint) for checkpoint in (10, 50, 100, 250, 500, 1000, 5000, 10000)} | {rounds})
+
+        self.stdout.write(f"  ruin curve ({players:,} players, bankroll {options['bankroll']}, bet {bet}):")
+        for played in range(1, rounds + 1):
+            active = balance >= bet
+            balance += np.where(active, sample(bet, players), 0)
+
+            if played in checkpoints:
+                ruined = np.count_nonzero(balance < bet) / players
+                median, p90 = np.percentile(balance, [50, 90])
+                self.stdout.write(f"    after {played:>6} games: {ruined:8.2%} ruined, median balance {median:,.0f}, 90th percentile {p90:,.0f}")
@@ -0,0 +1,44 @@
+# Generated by Django 6.1.2 on 2026-10-17 03:47
+
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def populate_best_bonuses(apps, schema_editor):
+    CustomUser = apps.get_model('users', 'CustomUser')
+    OwnedItem = apps.get_model('users', 'OwnedItem')
+
+    owned = OwnedItem.objects.filter(user=OuterRef('pk')).values('user')
+    CustomUser.objects.update(
+        best_xp_bonus=Coalesce(Subquery(owned.annotate(best=Max('item__xp_bonus')).values('best')), Value(0.0)),
+        best_money_bonus=Coalesce(Subquery(owned.annotate(best=Max('item__money_bonus')).values('best')), Value(0.0)),
+        best_time_bonus=Coalesce(Subquery(owned.annotate(best=Max('item__time_bonus')).values('best')), Value(0.0)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gear', '0003_alter_gear_money_bonus_alter_gear_time_bonus_and_more'),
+        ('users', '0009_alter_owneditem_item'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='best_money_bonus',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='best_time_bonus',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='best_xp_bonus',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.RunPython(populate_best_bonuses, migrations.RunPython.noop),
+    ]
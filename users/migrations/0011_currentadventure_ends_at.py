@@ -0,0 +1,40 @@
+# Generated by Django 6.1.2 on 2026-10-17 04:10
+
+import datetime
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def populate_ends_at(apps, schema_editor):
+    CurrentAdventure = apps.get_model('users', 'CurrentAdventure')
+
+    current_adventures = list(CurrentAdventure.objects.all())
+    for current_adventure in current_adventures:
+        started = current_adventure.time_started or timezone.now()
+        current_adventure.ends_at = started + datetime.timedelta(seconds=max(current_adventure.time_left, 0))
+    CurrentAdventure.objects.bulk_update(current_adventures, ['ends_at'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0010_customuser_best_bonuses'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='currentadventure',
+            name='ends_at',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.RunPython(populate_ends_at, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='currentadventure',
+            name='ends_at',
+            field=models.DateTimeField(db_index=True),
+        ),
+        migrations.RemoveField(
+            model_name='currentadventure',
+            name='time_left',
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 6.1.2 on 2026-10-17 03:49
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adventures', '0002_alter_adventure_reward_max_and_more'),
+        ('users', '0011_currentadventure_ends_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AdventureResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('xp_reward', models.BigIntegerField(default=0)),
+                ('money_reward', models.BigIntegerField(default=0)),
+                ('message', models.CharField(max_length=255)),
+                ('completed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('adventure', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='adventures.adventure')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='adventure_results', to='users.customuser')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'completed_at'], name='users_adven_user_id_e9dcd4_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 6.1.2 on 2026-10-17 03:52
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0012_adventureresult'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('delta_money', models.BigIntegerField(default=0)),
+                ('delta_xp', models.BigIntegerField(default=0)),
+                ('reason', models.CharField(choices=[('coinflip', 'Coin Flip'), ('slots', 'Slots'), ('adventure', 'Adventure'), ('purchase', 'Purchase'), ('admin', 'Admin Grant')], max_length=16)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ledger_entries', to='users.customuser')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', '-created_at'], name='users_ledge_user_id_d03114_idx'), models.Index(fields=['created_at'], name='users_ledge_created_5c8b7e_idx')],
+            },
+        ),
+    ]
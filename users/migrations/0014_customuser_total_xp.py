@@ -0,0 +1,55 @@
+# Generated by Django 6.1.2 on 2026-10-17 04:01
+
+from django.db import migrations, models
+
+# Frozen copy of the level curve in users.progression as of this migration,
+# so later changes to it do not alter what the migration does.
+BASE_XP = 30
+GROWTH = 1.2
+MAX_TOTAL_XP = 2 ** 63 - 1
+
+
+def cumulative_xp():
+    cumulative = [0, 0]
+    level = 1
+    while True:
+        needed = int(BASE_XP * (GROWTH ** (level - 1)))
+        if cumulative[level] + needed > MAX_TOTAL_XP:
+            return cumulative
+        cumulative.append(cumulative[level] + needed)
+        level += 1
+
+
+def populate_total_xp(apps, schema_editor):
+    CustomUser = apps.get_model('users', 'CustomUser')
+    cumulative = cumulative_xp()
+    max_level = len(cumulative) - 1
+
+    users = []
+    for user in CustomUser.objects.only('pk', 'level', 'xp').iterator(chunk_size=2000):
+        user.total_xp = cumulative[min(max(user.level, 1), max_level)] + user.xp
+        users.append(user)
+        if len(users) >= 2000:
+            CustomUser.objects.bulk_update(users, ['total_xp'])
+            users = []
+    CustomUser.objects.bulk_update(users, ['total_xp'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0013_ledgerentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='total_xp',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunPython(populate_total_xp, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['-total_xp', 'id'], name='users_total_xp_rank_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.1.2 on 2026-10-17 04:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0014_customuser_total_xp'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['-money', 'id'], name='users_money_rank_idx'),
+        ),
+    ]
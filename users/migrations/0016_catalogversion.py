@@ -0,0 +1,21 @@
+# Generated by Django 6.1.2 on 2026-10-17 04:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0015_customuser_money_rank_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=32, unique=True)),
+                ('version', models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 6.1.2 on 2026-10-17 09:12
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def remove_duplicates(apps, schema_editor):
+    '''
+    Keeps the first row of every (user, item) pair owned more than once.
+    '''
+
+    OwnedItem = apps.get_model('users', 'OwnedItem')
+    duplicates = (
+        OwnedItem.objects.values('user_id', 'item_id')
+        .annotate(count=Count('id'), first_id=Min('id'))
+        .filter(count__gt=1)
+    )
+    for duplicate in duplicates:
+        OwnedItem.objects.filter(
+            user_id=duplicate['user_id'], item_id=duplicate['item_id'],
+        ).exclude(id=duplicate['first_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0016_catalogversion'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='owneditem',
+            constraint=models.UniqueConstraint(fields=('user', 'item'), name='users_owneditem_unique_item'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 6.1.2 on 2026-10-17 10:05
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0017_owneditem_unique_item'),
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        # CatalogVersion moved to the Core app, its table is kept.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.DeleteModel(name='CatalogVersion'),
+            ],
+            database_operations=[],
+        ),
+    ]
@@ -5,14 +5,19 @@ Date: 2025-04-27
 Description: Django models for the Users app.
 """
 
+import math
 from django.db import models
+from django.utils import timezone
 from adventures.models import Adventure
 from gear.models import Gear
+from . import progression
 
 class CustomUser(models.Model):
     '''
     Custom user model for the application.
     This model is used to store user information such as Discord ID, username, level, XP, and money.
+    The best_*_bonus fields hold the highest bonus among the user's owned gear and are kept in sync by gear.loadout.
+    total_xp is all the xp earned since level 1 (see users.progression), it is what the level leaderboard ranks by.
     ''' 
 
     discord_id = models.CharField(max_length=255, unique=True)
@@ -20,11 +25,32 @@ class CustomUser(models.Model):
     level = models.IntegerField(default=1)
     xp = models.BigIntegerField(default=0)
     money = models.BigIntegerField(default=100)
+    best_xp_bonus = models.FloatField(default=0.0)
+    best_money_bonus = models.FloatField(default=0.0)
+    best_time_bonus = models.FloatField(default=0.0)
+    total_xp = models.BigIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-total_xp', 'id'], name='users_total_xp_rank_idx'),
+            models.Index(fields=['-money', 'id'], name='users_money_rank_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        '''
+        Saves the user, keeping total_xp in step with the level and xp.
+        '''
+
+        self.total_xp = progression.total_xp(self.level, self.xp)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and ({'level', 'xp'} & set(update_fields)):
+            kwargs['update_fields'] = {*update_fields, 'total_xp'}
+
+        super().save(*args, **kwargs)
 
     @property
     def xp_needed(self):
-        base_xp = 30
-        return int(base_xp * (1.2 ** (self.level - 1)))
+        return progression.xp_needed(self.level)
 
     def __str__(self):
         user_name = self.username if self.username else "Unknown User"
@@ -35,12 +61,26 @@ class CurrentAdventure(models.Model):
     '''
     Model representing the current adventure of a user.
     Each user can have one current adventure at a time.
+    ends_at is the absolute deadline, computed once when the adventure starts.
     '''
 
     user = models.OneToOneField(CustomUser, on_delete=models.CASCADE, related_name='current_adventure')
     adventure = models.ForeignKey(Adventure, on_delete=models.CASCADE)
-    time_left = models.IntegerField(default=0)  
     time_started = models.DateTimeField(auto_now_add=True, blank=True, null=True)
+    ends_at = models.DateTimeField(db_index=True)
+
+    @property
+    def time_left(self):
+        '''
+        Seconds remaining until the adventure ends, never negative.
+        '''
+
+        remaining = (self.ends_at - timezone.now()).total_seconds()
+        return max(0, math.ceil(remaining))
+
+    @property
+    def is_complete(self):
+        return self.ends_at <= timezone.now()
 
     def __str__(self):
         user_name = self.user.username if self.user.username else "Unknown User"
@@ -50,8 +90,67 @@ class CurrentAdventure(models.Model):
 class OwnedItem(models.Model):
     '''
     Model representing an item owned by a user.
-    Each user can own multiple items
+    Each user can own multiple items, but each item only once.
     '''
 
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='owned_items')
     item = models.ForeignKey(Gear, on_delete=models.CASCADE)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'item'], name='users_owneditem_unique_item'),
+        ]
+
+
+class AdventureResult(models.Model):
+    '''
+    Model representing the rewards of an adventure that was settled in the background.
+    The rewards are already applied to the user, the row is kept until the user collects it.
+    '''
+
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='adventure_results')
+    adventure = models.ForeignKey(Adventure, on_delete=models.CASCADE)
+    xp_reward = models.BigIntegerField(default=0)
+    money_reward = models.BigIntegerField(default=0)
+    message = models.CharField(max_length=255)
+    completed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'completed_at']),
+        ]
+
+    def __str__(self):
+        user_name = self.user.username if self.user.username else "Unknown User"
+        return f"{user_name} - {self.adventure.name} ({self.xp_reward} xp, {self.money_reward} money)"
+
+
+class LedgerEntry(models.Model):
+    '''
+    Model representing a single change to a user's money or xp.
+    Entries are append-only and are written in batches by users.ledger.
+    '''
+
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='ledger_entries')
+    delta_money = models.BigIntegerField(default=0)
+    delta_xp = models.BigIntegerField(default=0)
+    reason = models.CharField(
+        max_length=16,
+        choices=[
+            ('coinflip', 'Coin Flip'),
+            ('slots', 'Slots'),
+            ('adventure', 'Adventure'),
+            ('purchase', 'Purchase'),
+            ('admin', 'Admin Grant'),
+        ],
+    )
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created_at']),
+            models.Index(fields=['created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.reason}: {self.delta_money:+} money, {self.delta_xp:+} xp"
@@ -0,0 +1,116 @@
+"""
+File: profiles.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Batch profile lookups for the Users app.
+This file fetches, creates and renames many users at once for guild-wide work such as member sync.
+Lookups use one IN query per chunk of CHUNK_SIZE discord ids, which keeps every statement under the
+database's limit on query parameters, and missing users are created with bulk inserts that skip conflicts.
+"""
+
+from django.conf import settings
+from django.db import transaction
+from .models import CustomUser
+from . import leaderboards
+
+CHUNK_SIZE = 500
+
+
+def chunks(items, size=CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def unique(discord_ids):
+    '''
+    Returns the discord ids without duplicates, in their original order.
+    '''
+
+    return list(dict.fromkeys(str(discord_id) for discord_id in discord_ids))
+
+
+def fetch_profiles(discord_ids):
+    '''
+    Returns a dict of discord id to user for every given discord id that has a user.
+    '''
+
+    users = {}
+    for chunk in chunks(discord_ids):
+        for user in CustomUser.objects.filter(discord_id__in=chunk):
+            users[user.discord_id] = user
+    return users
+
+
+def create_missing(discord_ids, usernames=None):
+    '''
+    Creates a user for every discord id without one, with the username from usernames if given.
+    Ids created concurrently by another request are skipped by the insert.
+    Returns a dict of discord id to user for the given ids, read back after the insert.
+    '''
+
+    usernames = usernames or {}
+    new_users = [
+        CustomUser(discord_id=discord_id, username=usernames.get(discord_id), level=1, xp=0, money=100)
+        for discord_id in discord_ids
+    ]
+
+    with transaction.atomic():
+        CustomUser.objects.bulk_create(new_users, batch_size=CHUNK_SIZE, ignore_conflicts=True)
+        # ignore_conflicts leaves the primary keys unset, so the rows are read back.
+        created = fetch_profiles(discord_ids)
+
+    if created and settings.LEADERBOARD_CACHE_ENABLED:
+        # Bulk inserts do not send post_save, new users may belong on a leaderboard.
+        transaction.on_commit(leaderboards.reset_caches)
+    return created
+
+
+def get_profiles(discord_ids, create=False, usernames=None):
+    '''
+    Returns a dict of discord id to user for the given discord ids, and the list of ids that were missing and now exist.
+    Missing users are created if create is True.
+    '''
+
+    discord_ids = unique(discord_ids)
+    users = fetch_profiles(discord_ids)
+    created = []
+
+    if create:
+        missing = [discord_id for discord_id in discord_ids if discord_id not in users]
+        if missing:
+            new_users = create_missing(missing, usernames)
+            users.update(new_users)
+            created = [discord_id for discord_id in missing if discord_id in new_users]
+    return users, created
+
+
+def sync_members(members):
+    '''
+    Upserts guild members, given as a dict of discord id to username.
+    Missing users are bulk created and users whose username changed are bulk updated.
+    Returns the number of users created, updated and unchanged.
+    '''
+
+    users = fetch_profiles(list(members))
+
+    renamed = []
+    for discord_id, user in users.items():
+        if user.username != members[discord_id]:
+            user.username = members[discord_id]
+            renamed.append(user)
+
+    missing = [discord_id for discord_id in members if discord_id not in users]
+    with transaction.atomic():
+        CustomUser.objects.bulk_update(renamed, ['username'], batch_size=CHUNK_SIZE)
+        created = create_missing(missing, members) if missing else {}
+
+    if renamed and settings.LEADERBOARD_CACHE_ENABLED:
+        # Bulk updates do not send post_save either, cached rows would keep the old usernames.
+        transaction.on_commit(leaderboards.reset_caches)
+
+    return {
+        "created": len(created),
+        "updated": len(renamed),
+        "unchanged": len(users) - len(renamed),
+    }
+
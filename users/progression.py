@@ -0,0 +1,70 @@
+"""
+File: progression.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Level curve for the Users app.
+This file contains the xp needed for every level and the cumulative xp needed to reach it, computed once at import time.
+Working out how many levels a pile of xp buys is a bisect over the cumulative table instead of a loop of float powers.
+"""
+
+from bisect import bisect_right
+
+BASE_XP = 30
+GROWTH = 1.2
+
+# Levels stop once the total xp needed no longer fits in a BigIntegerField.
+MAX_TOTAL_XP = 2 ** 63 - 1
+
+
+def build_tables():
+    '''
+    Returns (thresholds, cumulative) where thresholds[level] is the xp needed to go from level to level + 1
+    and cumulative[level] is the xp needed to go from level 1 to level. Index 0 is unused.
+    '''
+
+    thresholds = [0]
+    cumulative = [0, 0]
+    level = 1
+    while True:
+        needed = int(BASE_XP * (GROWTH ** (level - 1)))
+        if cumulative[level] + needed > MAX_TOTAL_XP:
+            break
+        thresholds.append(needed)
+        cumulative.append(cumulative[level] + needed)
+        level += 1
+    return thresholds, cumulative
+
+
+THRESHOLDS, CUMULATIVE = build_tables()
+MAX_LEVEL = len(CUMULATIVE) - 1
+
+
+def xp_needed(level):
+    '''
+    Returns the xp needed to go from level to level + 1.
+    '''
+
+    if level < len(THRESHOLDS):
+        return THRESHOLDS[max(level, 1)]
+    return MAX_TOTAL_XP
+
+
+def total_xp(level, xp):
+    '''
+    Returns the xp earned since level 1 by a user at level with xp towards the next level.
+    '''
+
+    return CUMULATIVE[min(max(level, 1), MAX_LEVEL)] + xp
+
+
+def level_for(level, xp):
+    '''
+    Returns the (level, xp) a user at level with xp ends up at after spending as much xp on levels as possible.
+    '''
+
+    if level >= MAX_LEVEL:
+        return level, xp
+
+    total = total_xp(level, xp)
+    new_level = max(level, min(bisect_right(CUMULATIVE, total) - 1, MAX_LEVEL))
+    return new_level, total - CUMULATIVE[new_level]
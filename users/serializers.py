@@ -10,6 +10,10 @@ Serializers for user-related operations such as coin flip betting.
 
 from rest_framework import serializers
 from .models import CustomUser
+from .slots import MACHINES
+
+MAX_GAMES_PER_REQUEST = 100
+MAX_BATCH_SIZE = 5000
 
 class CustomUserSerializer(serializers.ModelSerializer):
     '''
@@ -21,7 +25,35 @@ class CustomUserSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = CustomUser
-        fields = ['discord_id', 'username', 'level', 'xp', 'money', 'xp_needed']
+        fields = ['discord_id', 'username', 'level', 'xp', 'money', 'xp_needed', 'total_xp']
+
+
+class ProfileBatchSerializer(serializers.Serializer):
+    '''
+    Serializer for looking up many users at once.
+    Takes up to MAX_BATCH_SIZE discord ids, and create_missing to create the users that do not exist yet.
+    '''
+
+    discord_ids = serializers.ListField(
+        child=serializers.CharField(max_length=255),
+        allow_empty=False,
+        max_length=MAX_BATCH_SIZE,
+    )
+    create_missing = serializers.BooleanField(default=False)
+
+
+class MemberSerializer(serializers.Serializer):
+    discord_id = serializers.CharField(max_length=255)
+    username = serializers.CharField(max_length=255)
+
+
+class MemberSyncSerializer(serializers.Serializer):
+    '''
+    Serializer for upserting guild members.
+    Takes up to MAX_BATCH_SIZE members, each with a discord_id and username.
+    '''
+
+    members = serializers.ListField(child=MemberSerializer(), allow_empty=False, max_length=MAX_BATCH_SIZE)
 
 
 class LevelUpSerializer(serializers.Serializer):
@@ -57,12 +89,15 @@ class CoinFlipBetSerializer(serializers.Serializer):
     This serializer is used to validate the data for a coin flip bet.
     It checks if the user has enough money to place the bet and creates a new user if they don't exist.
     It also validates the bet amount and the side of the coin flip.
+    Up to MAX_GAMES_PER_REQUEST flips can be played at once with count, optionally stopping once stop_loss is lost.
     '''
 
     discord_id = serializers.CharField(max_length=255)
     username = serializers.CharField(max_length=255)
     bet = serializers.IntegerField(min_value=1)
     side = serializers.ChoiceField(choices=['heads', 'tails'])
+    count = serializers.IntegerField(min_value=1, max_value=MAX_GAMES_PER_REQUEST, default=1)
+    stop_loss = serializers.IntegerField(min_value=1, required=False)
 
     def validate(self, data):
         discord_id = data.get('discord_id')
@@ -85,10 +120,14 @@ class SlotsSerializer(serializers.Serializer):
     Serializer for the Slots model.
     This serializer is used to validate the data for a slot machine game.
     It checks if the user has enough money to place the bet and creates a new user if they don't exist.
+    Up to MAX_GAMES_PER_REQUEST spins can be played at once with count, optionally stopping once stop_loss is lost.
     '''
 
     discord_id = serializers.CharField(max_length=255)
     bet = serializers.IntegerField(min_value=1)
+    count = serializers.IntegerField(min_value=1, max_value=MAX_GAMES_PER_REQUEST, default=1)
+    stop_loss = serializers.IntegerField(min_value=1, required=False)
+    machine = serializers.ChoiceField(choices=list(MACHINES), default='classic')
 
     def validate(self, data):
         discord_id = data.get('discord_id')
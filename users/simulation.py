@@ -0,0 +1,45 @@
+"""
+File: simulation.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: NumPy samplers for the offline simulators.
+This file contains vectorized versions of the gambling games, built from the same alias tables and payout tables
+as users/slots.py. It is only imported by the simulate_* management commands, so the API does not need NumPy.
+"""
+
+import numpy as np
+
+
+def sample_reel(rng, reel, size):
+    '''
+    Samples size indices from an AliasTable in one vectorized pass.
+    '''
+
+    probability = np.asarray(reel.probability)
+    alias = np.asarray(reel.alias)
+    columns = rng.integers(0, len(probability), size=size)
+    keep = rng.random(size) < probability[columns]
+    return np.where(keep, columns, alias[columns])
+
+
+def slot_changes(rng, machine, bet, size):
+    '''
+    Returns the balance change of size spins, using the same rounding as the slots view.
+    bet may be a single bet or an array of size bets.
+    '''
+
+    index = np.zeros(size, dtype=np.int64)
+    for reel in machine.reels:
+        index = index * len(machine.symbols) + sample_reel(rng, reel, size)
+
+    multiplier = np.asarray(machine.payouts, dtype=np.float64)[index]
+    return np.where(multiplier > 0, np.floor(bet * multiplier), -bet).astype(np.int64)
+
+
+def coinflip_changes(rng, bet, size):
+    '''
+    Returns the balance change of size coin flips.
+    bet may be a single bet or an array of size bets.
+    '''
+
+    return np.where(rng.random(size) < 0.5, bet, -bet).astype(np.int64)
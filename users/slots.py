@@ -0,0 +1,157 @@
+"""
+File: slots.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Slot machine engine for the Users app.
+This file contains the slot machines, defined as data in MACHINES and compiled once at import time.
+Each reel is sampled from a Walker alias table and every outcome's multiplier is read from a flat payout table,
+so a spin costs a few random numbers and a list index no matter how many symbols or rules a machine has.
+"""
+
+import random
+from collections import namedtuple
+
+Spin = namedtuple('Spin', ['symbols', 'multiplier'])
+
+
+MACHINES = {
+    'classic': {
+        'symbols': ['🍒', '🍋', '🍉', '🔔', '💎', '7️⃣'],
+        # The third reel is weighted to increase the chances of winning.
+        'reel_weights': [
+            [1, 1, 1, 1, 1, 1],
+            [1, 1, 1, 1, 1, 1],
+            [0.25, 0.25, 0.25, 0.18, 0.06, 0.01],
+        ],
+        # Checked in order: a full line, then a line starting with the prefix, then any pair on the first two reels.
+        'lines': {
+            ('7️⃣', '7️⃣', '7️⃣'): 10,
+            ('💎', '💎', '💎'): 5,
+            ('🔔', '🔔', '🔔'): 4,
+            ('🍉', '🍉', '🍉'): 3,
+            ('🍋', '🍋', '🍋'): 3,
+            ('🍒', '🍒', '🍒'): 3,
+        },
+        'prefixes': {
+            ('🍒', '🍒'): 2,
+        },
+        'pair': 1.5,
+    },
+}
+
+
+class AliasTable:
+    '''
+    Walker alias table for sampling an index from a discrete distribution in O(1).
+    Built with Vose's method from a list of non-negative weights.
+    '''
+
+    def __init__(self, weights):
+        total = sum(weights)
+        if total <= 0 or any(weight < 0 for weight in weights):
+            raise ValueError("Weights must be non-negative and sum to more than zero.")
+
+        size = len(weights)
+        scaled = [weight * size / total for weight in weights]
+        self.probability = [1.0] * size
+        self.alias = list(range(size))
+
+        small = [i for i, weight in enumerate(scaled) if weight < 1]
+        large = [i for i, weight in enumerate(scaled) if weight >= 1]
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            self.probability[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] = scaled[more] + scaled[less] - 1
+            (small if scaled[more] < 1 else large).append(more)
+
+        self.weights = [weight / total for weight in weights]
+
+    def __len__(self):
+        return len(self.probability)
+
+    def sample(self, rng=random):
+        column = int(rng.random() * len(self.probability))
+        if rng.random() < self.probability[column]:
+            return column
+        return self.alias[column]
+
+
+class SlotMachine:
+    '''
+    A compiled slot machine.
+    outcomes and payouts are flat lists indexed by the reel outcome (see index), holding the symbols
+    and the multiplier of the bet won, or 0 for a loss.
+    '''
+
+    def __init__(self, name, symbols, reel_weights, lines, prefixes=None, pair=None):
+        self.name = name
+        self.symbols = list(symbols)
+        self.positions = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.reels = [AliasTable(weights) for weights in reel_weights]
+
+        if any(len(reel) != len(self.symbols) for reel in self.reels):
+            raise ValueError(f"Every reel of {name} needs one weight per symbol.")
+
+        self.outcomes = [self.outcome(index) for index in range(len(self.symbols) ** len(self.reels))]
+        self.payouts = [self.rule(symbols, lines, prefixes or {}, pair) for symbols in self.outcomes]
+
+    @classmethod
+    def from_config(cls, name, config):
+        return cls(name, **config)
+
+    def index(self, symbols):
+        '''
+        Returns the flat index of a tuple of symbols.
+        '''
+
+        index = 0
+        for symbol in symbols:
+            index = index * len(self.symbols) + self.positions[symbol]
+        return index
+
+    def outcome(self, index):
+        '''
+        Returns the tuple of symbols for a flat index.
+        '''
+
+        symbols = []
+        for _ in self.reels:
+            index, position = divmod(index, len(self.symbols))
+            symbols.append(self.symbols[position])
+        return tuple(reversed(symbols))
+
+    def rule(self, symbols, lines, prefixes, pair):
+        if symbols in lines:
+            return lines[symbols]
+        for prefix, multiplier in prefixes.items():
+            if symbols[:len(prefix)] == prefix:
+                return multiplier
+        if pair is not None and symbols[0] == symbols[1]:
+            return pair
+        return 0
+
+    def result(self, symbols):
+        '''
+        Returns the Spin for a given tuple of symbols.
+        '''
+
+        symbols = tuple(symbols)
+        return Spin(symbols, self.payouts[self.index(symbols)])
+
+    def spin(self, rng=random):
+        index = 0
+        for reel in self.reels:
+            index = index * len(self.symbols) + reel.sample(rng)
+        return Spin(self.outcomes[index], self.payouts[index])
+
+    def spin_many(self, count, rng=random):
+        return [self.spin(rng) for _ in range(count)]
+
+
+machines = {name: SlotMachine.from_config(name, config) for name, config in MACHINES.items()}
+
+
+def get_machine(name='classic'):
+    return machines[name]
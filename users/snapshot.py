@@ -0,0 +1,87 @@
+"""
+File: snapshot.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Profile snapshot for the Users app.
+This file builds everything the bot shows about a user in one response: the profile, the best gear per bonus,
+the owned gear, and the current adventure. It uses two queries for an existing user:
+the user joined to their current adventure, with an EXISTS for a settled adventure result,
+and their owned items joined to the gear.
+"""
+
+from django.db.models import Exists, OuterRef, Prefetch
+from adventures.serializers import CurrentAdventureSerializer
+from gear.loadout import loadout_from
+from gear.serializers import ShopListSerializer
+from .models import AdventureResult, CustomUser, OwnedItem
+from .serializers import CustomUserSerializer
+
+
+def snapshot_queryset():
+    return (
+        CustomUser.objects
+        .select_related('current_adventure__adventure')
+        .annotate(has_result=Exists(AdventureResult.objects.filter(user=OuterRef('pk'))))
+        .prefetch_related(Prefetch(
+            'owned_items',
+            queryset=OwnedItem.objects.select_related('item').order_by('item__cost', 'item_id'),
+            to_attr='owned',
+        ))
+    )
+
+
+def get_snapshot_user(discord_id, username=None):
+    '''
+    Returns the user with everything the snapshot needs loaded, and whether the user was created.
+    The user is created if they do not exist, and their username is updated if a different one is given.
+    '''
+
+    user = snapshot_queryset().filter(discord_id=discord_id).first()
+    created = False
+    if user is None:
+        _, created = CustomUser.objects.get_or_create(
+            discord_id=discord_id,
+            defaults={
+                "username": username,
+                "level": 1,
+                "xp": 0,
+                "money": 100,
+            }
+        )
+        user = snapshot_queryset().get(discord_id=discord_id)
+
+    if username and user.username != username:
+        user.username = username
+        user.save(update_fields=['username'])
+    return user, created
+
+
+def serialize_snapshot(user):
+    '''
+    Returns the snapshot of a user loaded by get_snapshot_user.
+    '''
+
+    gear = [owned_item.item for owned_item in user.owned]
+    loadout = loadout_from(gear)
+
+    def best(item):
+        return ShopListSerializer(item).data if item is not None else None
+
+    current_adventure = getattr(user, 'current_adventure', None)
+    adventure = None
+    if current_adventure is not None:
+        adventure = dict(CurrentAdventureSerializer(current_adventure).data)
+        adventure['complete'] = current_adventure.is_complete
+
+    return {
+        **CustomUserSerializer(user).data,
+        "best_gear": {
+            "xp": best(loadout.best_gear_xp),
+            "money": best(loadout.best_gear_money),
+            "time": best(loadout.best_gear_time),
+        },
+        "owned_items": ShopListSerializer(gear, many=True).data,
+        "owned_item_count": len(gear),
+        "current_adventure": adventure,
+        "adventure_ready": user.has_result or (current_adventure is not None and current_adventure.is_complete),
+    }
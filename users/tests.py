@@ -4,14 +4,44 @@ Author: Reagan Zierke
 Date: 2025-05-06
 Description: Unit tests for the Users app.
 This file contains tests for the views_user.py file. These cover the user profile, and leveling up functionality.
+It also covers the wallet service and the gambling views that move money through it, and the ledger that records those changes.
+It also checks that the bot's in-process API transport answers exactly like the HTTP one.
 """
 
 
 
-from django.test import TestCase
+import asyncio
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+import aiohttp
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.conf import settings
+from asgiref.sync import async_to_sync
+from django.test import LiveServerTestCase, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
 from rest_framework.test import APIClient
 from rest_framework import status
-from .models import CustomUser
+from adventures.models import Adventure
+from core import search
+from gear.models import Gear
+from .models import AdventureResult, CurrentAdventure, CustomUser, LedgerEntry, OwnedItem
+from . import leaderboards, ledger, profiles, progression, slots, wallet
+from .serializers import MAX_BATCH_SIZE
+from discord_bot.api_client import HTTPTransport, InProcessTransport
+
+# The bot's modules import each other by their flat names, as they do when the bot runs from discord_bot/.
+sys.path.append(str(settings.BASE_DIR / 'discord_bot'))
+import catalog_index
+from member_sync import MemberSync
+from scheduler import DeadlineScheduler
+from cogs.adventure import Adventure as AdventureCog
 
 class UserViewsTestCase(TestCase):
     def setUp(self):
@@ -23,6 +53,7 @@ class UserViewsTestCase(TestCase):
         self.existing_user = CustomUser.objects.create(
             discord_id="67890", username="ExistingUser", level=1, xp=10, money=100
         )
+        leaderboards.reset_caches()
 
     def test_get_profile_create_user(self):
         '''
@@ -63,6 +94,52 @@ class UserViewsTestCase(TestCase):
         self.assertEqual(self.existing_user.level, 2)
         self.assertEqual(self.existing_user.xp, 0)
 
+    def test_level_up_multiple_levels(self):
+        '''
+        Test that a level up spends the xp on every level it covers in one request.
+        '''
+        self.existing_user.xp = 30 + 36 + 43 + 5
+        self.existing_user.save()
+        response = self.client.post('/users/level_up/', {"discord_id": self.existing_user.discord_id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['levels_gained'], 3)
+        self.existing_user.refresh_from_db()
+        self.assertEqual(self.existing_user.level, 4)
+        self.assertEqual(self.existing_user.xp, 5)
+        self.assertEqual(response.data['xp_needed'], self.existing_user.xp_needed)
+
+    def test_progression_table(self):
+        '''
+        Test that the precomputed level curve matches the xp formula and the cumulative table.
+        '''
+        for level in range(1, 60):
+            self.assertEqual(progression.xp_needed(level), int(30 * (1.2 ** (level - 1))))
+            self.assertEqual(progression.CUMULATIVE[level + 1] - progression.CUMULATIVE[level], progression.xp_needed(level))
+        self.assertEqual(progression.level_for(1, 29), (1, 29))
+        self.assertEqual(progression.level_for(2, 36), (3, 0))
+
+    def test_total_xp_is_maintained(self):
+        '''
+        Test that total_xp follows xp grants and does not change when xp is spent on levels.
+        '''
+        self.assertEqual(self.existing_user.total_xp, 10)
+        wallet.apply(self.existing_user.pk, xp=100)
+        self.client.post('/users/level_up/', {"discord_id": self.existing_user.discord_id})
+        self.existing_user.refresh_from_db()
+        self.assertEqual(self.existing_user.level, 4)
+        self.assertEqual(self.existing_user.total_xp, 110)
+        self.assertEqual(self.existing_user.total_xp, progression.total_xp(self.existing_user.level, self.existing_user.xp))
+
+    def test_level_leaderboard_orders_by_total_xp(self):
+        '''
+        Test that users on the same level are ranked by their xp towards the next level.
+        '''
+        CustomUser.objects.create(discord_id="1", username="Behind", level=1, xp=5)
+        CustomUser.objects.create(discord_id="2", username="Ahead", level=1, xp=20)
+        CustomUser.objects.create(discord_id="3", username="Leader", level=2, xp=0)
+        response = self.client.get('/users/leaderboard/level')
+        self.assertEqual([user['username'] for user in response.data['results']], ["Leader", "Ahead", "ExistingUser", "Behind"])
+
     def test_level_up_insufficient_xp(self):
         '''
         Test error response when user has insufficient XP in LevelUpView.
@@ -79,3 +156,768 @@ class UserViewsTestCase(TestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn("error", response.data)
 
+
+class APITransportTestCase(LiveServerTestCase):
+    '''
+    The bot's in-process transport must return exactly what the HTTP transport returns.
+    '''
+
+    HEADERS = ("etag", "cache-control", "content-type")
+
+    def setUp(self):
+        Adventure.objects.create(name="Cave", description="A dark cave.", required_level=1)
+        leaderboards.reset_caches()
+
+    def send(self, transport, etag):
+        requests = [
+            ("GET", "/adventures/list/", None, None),
+            ("GET", "/adventures/list/", None, {"If-None-Match": etag}),
+            ("POST", "/users/profiles/batch", {"discord_ids": []}, None),
+            ("GET", "/users/leaderboard/nope/rank", {"discord_id": "1"}, None),
+            ("GET", "/users/no_such_path/", None, None),
+        ]
+
+        async def run():
+            await transport.start()
+            try:
+                return [await transport.request(*request) for request in requests]
+            finally:
+                await transport.close()
+
+        return async_to_sync(run)()
+
+    def test_transports_return_the_same_responses(self):
+        etag = APIClient().get("/adventures/list/")["ETag"]
+        over_http = self.send(HTTPTransport(self.live_server_url), etag)
+        in_process = self.send(InProcessTransport(), etag)
+
+        self.assertEqual([response.status for response in over_http], [200, 304, 400, 404, 404])
+        for http_response, local_response in zip(over_http, in_process):
+            self.assertEqual(http_response.status, local_response.status)
+            self.assertEqual(http_response.data, local_response.data)
+            for header in self.HEADERS:
+                self.assertEqual(http_response.headers.get(header), local_response.headers.get(header), header)
+
+        self.assertIs(type(in_process[2].data["discord_ids"][0]), str)
+
+
+class FakeAPI:
+    '''
+    Stand-in for the bot's API client that answers each path with a fixed (status, data).
+    '''
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.calls = []
+
+    async def request(self, method, path, payload=None):
+        self.calls.append((method, path, payload))
+        status_code, data = self.responses[path]
+        return SimpleNamespace(status=status_code, data=data, text=json.dumps(data), headers={})
+
+    async def get(self, path, payload=None):
+        return await self.request("GET", path, payload)
+
+    async def post(self, path, payload=None):
+        return await self.request("POST", path, payload)
+
+
+class DeadlineSchedulerTestCase(SimpleTestCase):
+    def test_deadlines_fire_in_order(self):
+        '''
+        Test that deadlines fire earliest first, rescheduled keys fire once at their new deadline and cancelled keys never fire.
+        '''
+        fired = []
+
+        async def run():
+            async def callback(key, payload):
+                fired.append((key, payload))
+
+            scheduler = DeadlineScheduler(callback)
+            now = time.time()
+            scheduler.schedule("a", now + 0.02, "first a")
+            scheduler.schedule("b", now + 0.01, "b")
+            scheduler.schedule("c", now + 0.03, "c")
+            scheduler.schedule("a", now + 0.04, "second a")
+            scheduler.cancel("c")
+            self.assertEqual(len(scheduler), 2)
+
+            scheduler.start()
+            await asyncio.sleep(0.15)
+            await scheduler.stop()
+            self.assertEqual(len(scheduler), 0)
+
+        asyncio.run(run())
+        self.assertEqual(fired, [("b", "b"), ("a", "second a")])
+
+    def complete(self, settled, snapshot_adventure):
+        '''
+        Completes an adventure through the adventure cog with a fake API, and returns the cog's scheduler afterwards.
+        '''
+        next_deadline = datetime.now(dt_timezone.utc) + timedelta(hours=1)
+        api = FakeAPI({
+            "/adventures/complete/": (200, {"adventure_name": "Cave", "xp_reward": 5, "money_reward": 5, "settled": settled}),
+            "/users/snapshot/": (200, {"current_adventure": snapshot_adventure and {**snapshot_adventure, "ends_at": next_deadline.isoformat()}}),
+        })
+        interaction = SimpleNamespace(user=SimpleNamespace(id=1, name="Player"), response=SimpleNamespace(send_message=AsyncMock()))
+
+        async def run():
+            cog = AdventureCog(SimpleNamespace(api=api))
+            cog.scheduler.schedule("1", next_deadline.timestamp(), "Forest")
+            await cog.complete_adventure(interaction)
+            return cog.scheduler
+
+        return asyncio.run(run()), next_deadline
+
+    def test_collecting_settled_result_keeps_next_deadline(self):
+        '''
+        Test that collecting an older settled result keeps the deadline of the adventure the user is on now.
+        '''
+        scheduler, next_deadline = self.complete(True, {"name": "Forest", "complete": False})
+        self.assertEqual(scheduler.deadlines["1"], (next_deadline.timestamp(), "Forest"))
+
+        scheduler, _ = self.complete(True, None)
+        self.assertNotIn("1", scheduler.deadlines)
+
+    def test_completing_live_adventure_cancels_deadline(self):
+        '''
+        Test that completing the current adventure cancels its deadline.
+        '''
+        scheduler, _ = self.complete(False, None)
+        self.assertNotIn("1", scheduler.deadlines)
+
+
+class CatalogIndexTestCase(SimpleTestCase):
+    def test_normalize_matches_server(self):
+        '''
+        Test that the bot normalizes names exactly like core.search.normalize, which the API resolves names by.
+        '''
+        names = ["Dragon's Lair", "Dragon’s  LAIR", "Café-Crème", "sword_of__fire", "  Ünïcödé  ", "Ｆｕｌｌ width", "a.b,c!d", "straße"]
+        for name in names:
+            self.assertEqual(catalog_index.normalize(name), search.normalize(name), name)
+
+    def test_search_ranking(self):
+        '''
+        Test that names starting with the query come first, then names with a word starting with it, then names containing it.
+        '''
+        rows = [{"name": name} for name in ["Rust Cave", "Cave of Echoes", "Deep Cavern", "Dragon Cave", "Scavenger Hunt", "Forest"]]
+        api = FakeAPI({"/adventures/list/": (200, rows)})
+
+        async def run():
+            index = catalog_index.CatalogIndex(api, "/adventures/list/")
+            await index.refresh()
+            return (
+                [row["name"] for row in index.search("cav")],
+                [row["name"] for row in index.search("CAVE", allowed=lambda row: row["name"] != "Rust Cave")],
+                [row["name"] for row in index.search("", limit=2)],
+            )
+
+        matches, allowed, limited = asyncio.run(run())
+        self.assertEqual(matches, ["Cave of Echoes", "Deep Cavern", "Dragon Cave", "Rust Cave", "Scavenger Hunt"])
+        self.assertEqual(allowed, ["Cave of Echoes", "Deep Cavern", "Dragon Cave", "Scavenger Hunt"])
+        self.assertEqual(limited, ["Cave of Echoes", "Deep Cavern"])
+        self.assertEqual(len(api.calls), 1)
+
+
+class MemberSyncTestCase(SimpleTestCase):
+    def member(self, member_id, name, bot=False):
+        return SimpleNamespace(id=member_id, name=name, bot=bot)
+
+    def sent(self, api):
+        return [post.args[1]["members"] for post in api.post.await_args_list]
+
+    def test_members_are_coalesced_and_batched(self):
+        '''
+        Test that a member queued twice is sent once with their latest name, bots are skipped and batches are capped.
+        '''
+        api = SimpleNamespace(post=AsyncMock(return_value=SimpleNamespace(status=200, text="")))
+        sync = MemberSync(api, batch_size=2)
+        sync.add(self.member(1, "Old"))
+        sync.add(self.member(2, "Bot", bot=True))
+        sync.add(self.member(1, "New"))
+        sync.add(self.member(3, "Other"))
+        self.assertTrue(sync.full.is_set())
+        sync.add(self.member(4, "Last"))
+
+        self.assertTrue(asyncio.run(sync.flush()))
+        self.assertEqual(self.sent(api), [
+            [{"discord_id": "1", "username": "New"}, {"discord_id": "3", "username": "Other"}],
+            [{"discord_id": "4", "username": "Last"}],
+        ])
+        self.assertEqual(len(sync), 0)
+
+    def test_failed_batch_is_requeued(self):
+        '''
+        Test that a batch is queued again after a network error or 5xx, without overwriting a newer name, and dropped after a 4xx.
+        '''
+        api = SimpleNamespace(post=AsyncMock())
+        sync = MemberSync(api)
+
+        async def run():
+            api.post.side_effect = [aiohttp.ClientError("connection reset")]
+            sync.add(self.member(1, "First"))
+            with self.assertLogs('member_sync', 'WARNING'):
+                self.assertFalse(await sync.flush())
+            self.assertEqual(sync.pending, {"1": "First"})
+
+            async def rename_and_fail(path, payload):
+                sync.add(self.member(1, "Renamed"))
+                return SimpleNamespace(status=503, text="unavailable")
+            api.post.side_effect = rename_and_fail
+            with self.assertLogs('member_sync', 'WARNING'):
+                self.assertFalse(await sync.flush())
+            self.assertEqual(sync.pending, {"1": "Renamed"})
+
+            api.post.side_effect = None
+            api.post.return_value = SimpleNamespace(status=400, text="bad request")
+            with self.assertLogs('member_sync', 'WARNING'):
+                self.assertFalse(await sync.flush())
+            self.assertEqual(len(sync), 0)
+
+        asyncio.run(run())
+
+
+class UserSnapshotTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create(discord_id="12345", username="TestUser", xp=10)
+        self.armor = Gear.objects.create(name="Test Armor", description="Armor", gear_type="armor", cost=750)
+        self.weapon = Gear.objects.create(name="Test Weapon", description="Weapon", gear_type="weapon", cost=750)
+        self.adventure = Adventure.objects.create(name="Test Adventure", description="A test adventure.", required_level=1)
+        for gear in (self.armor, self.weapon):
+            OwnedItem.objects.create(user=self.user, item=gear)
+        CurrentAdventure.objects.create(user=self.user, adventure=self.adventure, ends_at=timezone.now() + timedelta(seconds=60))
+
+    def test_snapshot_query_count(self):
+        '''
+        Test that the snapshot of an existing user takes two queries, whatever gear and adventure they have.
+        '''
+        with self.assertNumQueries(2):
+            response = self.client.post('/users/snapshot/', {"discord_id": self.user.discord_id, "username": "TestUser"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        data = response.data
+        self.assertEqual((data['level'], data['xp'], data['xp_needed']), (1, 10, self.user.xp_needed))
+        self.assertEqual(data['best_gear']['xp']['name'], self.armor.name)
+        self.assertEqual(data['best_gear']['money']['name'], self.weapon.name)
+        self.assertEqual(data['owned_item_count'], 2)
+        self.assertEqual([item['name'] for item in data['owned_items']], [self.armor.name, self.weapon.name])
+        self.assertEqual(data['current_adventure']['name'], self.adventure.name)
+        self.assertGreater(data['current_adventure']['time_left'], 0)
+        self.assertFalse(data['adventure_ready'])
+
+    def test_snapshot_of_new_user(self):
+        '''
+        Test that the snapshot creates a missing user and reports no gear or adventure.
+        '''
+        response = self.client.post('/users/snapshot/', {"discord_id": "999", "username": "NewUser"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['username'], "NewUser")
+        self.assertEqual(response.data['best_gear'], {"xp": None, "money": None, "time": None})
+        self.assertEqual(response.data['owned_item_count'], 0)
+        self.assertIsNone(response.data['current_adventure'])
+
+    def test_snapshot_reports_settled_adventure(self):
+        '''
+        Test that a finished or settled adventure is reported as ready to collect.
+        '''
+        CurrentAdventure.objects.filter(user=self.user).delete()
+        AdventureResult.objects.create(user=self.user, adventure=self.adventure, xp_reward=5, money_reward=5, message="Done")
+        response = self.client.post('/users/snapshot/', {"discord_id": self.user.discord_id}, format='json')
+        self.assertIsNone(response.data['current_adventure'])
+        self.assertTrue(response.data['adventure_ready'])
+
+class ProfileBatchTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.users = [CustomUser.objects.create(discord_id=str(i), username=f"User{i}") for i in range(3)]
+
+    def test_batch_lookup_in_chunks(self):
+        '''
+        Test that profiles come back in request order with one IN query per chunk of ids.
+        '''
+        discord_ids = ["2", "0", "missing", "2"] + [f"absent{i}" for i in range(profiles.CHUNK_SIZE)]
+        with self.assertNumQueries(2):
+            response = self.client.post('/users/profiles/batch', {"discord_ids": discord_ids}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([profile['discord_id'] for profile in response.data['profiles']], ["2", "0"])
+        self.assertEqual(len(response.data['missing']), profiles.CHUNK_SIZE + 1)
+        self.assertEqual(response.data['created'], [])
+
+    def test_batch_creates_missing_users(self):
+        '''
+        Test that create_missing bulk creates the missing users with the default profile.
+        '''
+        response = self.client.post('/users/profiles/batch', {"discord_ids": ["0", "new1", "new2"], "create_missing": True}, format='json')
+        self.assertEqual(response.data['created'], ["new1", "new2"])
+        self.assertEqual(response.data['missing'], [])
+        self.assertEqual([(profile['level'], profile['money']) for profile in response.data['profiles']], [(1, 100)] * 3)
+        self.assertEqual(CustomUser.objects.count(), 5)
+
+    def test_member_sync_upserts_usernames(self):
+        '''
+        Test that member sync creates missing users, renames changed ones and leaves the rest alone.
+        '''
+        members = [
+            {"discord_id": "0", "username": "User0"},
+            {"discord_id": "1", "username": "Renamed"},
+            {"discord_id": "new", "username": "NewMember"},
+        ]
+        response = self.client.post('/users/members/sync', {"members": members}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"created": 1, "updated": 1, "unchanged": 1})
+        self.assertEqual(CustomUser.objects.get(discord_id="1").username, "Renamed")
+        self.assertEqual(CustomUser.objects.get(discord_id="new").username, "NewMember")
+
+        response = self.client.post('/users/members/sync', {"members": members}, format='json')
+        self.assertEqual(response.data, {"created": 0, "updated": 0, "unchanged": 3})
+
+    def test_batch_validation(self):
+        '''
+        Test that an empty or oversized list of ids is rejected.
+        '''
+        response = self.client.post('/users/profiles/batch', {"discord_ids": []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post('/users/profiles/batch', {"discord_ids": ["1"] * (MAX_BATCH_SIZE + 1)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+class LeaderboardRankTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        leaderboards.reset_caches()
+        self.users = [CustomUser.objects.create(discord_id=str(i), username=f"User{i}", money=money) for i, money in enumerate([500, 300, 300, 200, 100, 50])]
+
+    def test_rank_and_neighbours(self):
+        '''
+        Test that the rank endpoint returns the user's position with the users around them, ties broken by id.
+        '''
+        with self.assertNumQueries(4):
+            response = self.client.generic('GET', '/users/leaderboard/money/rank', json.dumps({"discord_id": "2"}), content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['rank'], 3)
+        self.assertEqual(response.data['user']['discord_id'], "2")
+        self.assertEqual([(entry['rank'], entry['discord_id']) for entry in response.data['neighbours']], [(1, "0"), (2, "1"), (3, "2"), (4, "3"), (5, "4")])
+
+    def test_rank_matches_leaderboard(self):
+        '''
+        Test that every user's rank matches their position on the full leaderboard.
+        '''
+        board = list(leaderboards.top('money', limit=None))
+        for position, user in enumerate(board, start=1):
+            self.assertEqual(leaderboards.rank('money', user), position)
+
+    def test_keyset_pagination(self):
+        '''
+        Test that paging forward and back through a leaderboard visits every user once, in order, with their rank.
+        '''
+        pages = []
+        response = self.client.get('/users/leaderboard/money', {"limit": 4})
+        pages.append(response.data)
+        while pages[-1]['next']:
+            response = self.client.get('/users/leaderboard/money', {"limit": 4, "cursor": pages[-1]['next']})
+            pages.append(response.data)
+
+        seen = [(user['rank'], user['discord_id']) for page in pages for user in page['results']]
+        self.assertEqual(seen, [(rank, str(rank - 1)) for rank in range(1, 7)])
+        self.assertIsNone(pages[0]['previous'])
+
+        response = self.client.get('/users/leaderboard/money', {"limit": 4, "cursor": pages[-1]['previous']})
+        self.assertEqual(response.data['results'], pages[0]['results'])
+        self.assertIsNone(response.data['previous'])
+
+        response = self.client.get('/users/leaderboard/money', {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_pagination_after_deletion(self):
+        '''
+        Test that ranks and links stay right when a user is deleted between page fetches.
+        '''
+        first = self.client.get('/users/leaderboard/money', {"limit": 2}).data
+        second = self.client.get('/users/leaderboard/money', {"limit": 2, "cursor": first['next']}).data
+        self.assertEqual([(user['rank'], user['discord_id']) for user in second['results']], [(3, "2"), (4, "3")])
+
+        self.users[0].delete()
+
+        response = self.client.get('/users/leaderboard/money', {"limit": 2, "cursor": second['next']})
+        self.assertEqual([(user['rank'], user['discord_id']) for user in response.data['results']], [(4, "4"), (5, "5")])
+        self.assertIsNone(response.data['next'])
+
+        response = self.client.get('/users/leaderboard/money', {"limit": 2, "cursor": second['previous']})
+        self.assertEqual([(user['rank'], user['discord_id']) for user in response.data['results']], [(1, "1"), (2, "2")])
+        self.assertIsNone(response.data['previous'])
+        self.assertIsNotNone(response.data['next'])
+
+    def test_rank_errors(self):
+        '''
+        Test that unknown leaderboards and users are reported.
+        '''
+        response = self.client.get('/users/leaderboard/height/rank', {"discord_id": "0"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get('/users/leaderboard/level/rank', {"discord_id": "missing"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+@override_settings(LEADERBOARD_CACHE_ENABLED=True)
+class LeaderboardCacheTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        leaderboards.reset_caches()
+        self.users = [CustomUser.objects.create(discord_id=str(i), username=f"User{i}", money=1000 - i * 100) for i in range(5)]
+        self.cache = leaderboards.caches['money']
+
+    def tearDown(self):
+        self.cache.size = settings.LEADERBOARD_CACHE_SIZE
+        leaderboards.reset_caches()
+
+    def board(self):
+        return [row['discord_id'] for _, row in leaderboards.cached_top('money', 3)]
+
+    def test_reads_come_from_memory(self):
+        '''
+        Test that the leaderboard is read from the database once and then served from memory.
+        '''
+        with self.assertNumQueries(1):
+            self.client.get('/users/leaderboard/money')
+        with self.assertNumQueries(0):
+            response = self.client.get('/users/leaderboard/money')
+        self.assertEqual([user['discord_id'] for user in response.data['results'][:3]], ["0", "1", "2"])
+
+    def test_unchanged_page_returns_not_modified(self):
+        '''
+        Test that a leaderboard page is answered with a 304 while it is unchanged and with a new ETag once it changes.
+        '''
+        response = self.client.get('/users/leaderboard/money')
+        etag = response['ETag']
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+
+        with self.assertNumQueries(0), patch('users.leaderboards.page') as page:
+            response = self.client.get('/users/leaderboard/money', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+        page.assert_not_called()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            wallet.apply(self.users[4].pk, money=5000)
+        response = self.client.get('/users/leaderboard/money', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data['results'][0]['discord_id'], self.users[4].discord_id)
+
+    def test_unchanged_rank_returns_not_modified(self):
+        '''
+        Test that a user's rank is answered with a 304 without any query until the leaderboard changes.
+        '''
+        response = self.client.get('/users/leaderboard/money/rank', {"discord_id": "2"})
+        etag = response['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/users/leaderboard/money/rank', {"discord_id": "2"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            wallet.apply(self.users[4].pk, money=5000)
+        response = self.client.get('/users/leaderboard/money/rank', {"discord_id": "2"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['rank'], 4)
+
+    def test_wallet_changes_update_the_cache(self):
+        '''
+        Test that wallet changes reorder cached users and that users entering or leaving the top are handled.
+        '''
+        self.cache.size = 3
+        self.board()
+        with self.captureOnCommitCallbacks(execute=True):
+            wallet.apply(self.users[2].pk, money=500)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.board(), ["2", "0", "1"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            wallet.apply(self.users[2].pk, money=-1250)
+        self.assertEqual(self.board(), ["0", "1", "3"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            wallet.apply(self.users[4].pk, money=5000)
+        self.assertEqual(self.board(), ["4", "0", "1"])
+
+    def test_change_during_load_is_not_overwritten(self):
+        '''
+        Test that a wallet change committed while the cache is loading is not replaced by the older query result.
+        '''
+        original_top = leaderboards.top
+        calls = []
+
+        def top_then_change(kind, limit):
+            users = list(original_top(kind, limit))
+            calls.append(kind)
+            if len(calls) == 1:
+                # The change commits after the load's query ran but before its rows are installed.
+                CustomUser.objects.filter(pk=self.users[4].pk).update(money=5000)
+                leaderboards.caches['money'].update(self.users[4].pk, money=5000)
+            return users
+
+        with patch('users.leaderboards.top', side_effect=top_then_change):
+            self.assertEqual(self.board(), ["4", "0", "1"])
+        self.assertEqual(len(calls), 2)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.board(), ["4", "0", "1"])
+
+class WalletTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create(discord_id="12345", username="TestUser", money=100, xp=0)
+        self.machine = slots.get_machine()
+
+    def test_apply_returns_new_balance(self):
+        '''
+        Test that a wallet change is applied in one statement and returns the new balance.
+        '''
+        with self.assertNumQueries(1 if wallet.supports_update_returning() else 2):
+            balance = wallet.apply(self.user.pk, money=50, xp=10)
+        self.assertEqual(balance, wallet.Balance(money=150, xp=10))
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.money, 150)
+        self.assertEqual(self.user.xp, 10)
+
+    def test_apply_insufficient_funds(self):
+        '''
+        Test that a change guarded by require_money or going below zero is not applied.
+        '''
+        self.assertIsNone(wallet.apply(self.user.pk, money=-101))
+        self.assertIsNone(wallet.apply(self.user.pk, money=200, require_money=101))
+        self.assertIsNone(wallet.apply(0, money=1))
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.money, 100)
+
+    def test_coinflip_win(self):
+        '''
+        Test that winning a coin flip adds the bet to the balance.
+        '''
+        with patch('users.views_gamble.flip_coins', return_value=["heads"]):
+            response = self.client.post('/users/coinflip/', {"discord_id": self.user.discord_id, "username": "TestUser", "bet": 40, "side": "heads"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['win'])
+        self.assertEqual(response.data['balance'], 140)
+
+    def test_coinflip_insufficient_funds(self):
+        '''
+        Test that betting more than the balance is rejected.
+        '''
+        response = self.client.post('/users/coinflip/', {"discord_id": self.user.discord_id, "username": "TestUser", "bet": 101, "side": "heads"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("non_field_errors", response.data['error'])
+
+    def test_slots_loss(self):
+        '''
+        Test that losing at slots removes the bet from the balance.
+        '''
+        with patch.object(self.machine, 'spin_many', return_value=[self.machine.result(('🍒', '🍋', '🍒'))]):
+            response = self.client.post('/users/slots/', {"discord_id": self.user.discord_id, "bet": 30}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data['win'])
+        self.assertEqual(response.data['balance'], 70)
+
+    def test_coinflip_batch(self):
+        '''
+        Test that a batch of coin flips is settled with a single balance update and stops when the bankroll runs out.
+        '''
+        results = ["heads", "tails", "tails", "tails", "heads"]
+        with patch('users.views_gamble.flip_coins', return_value=results):
+            with self.assertNumQueries(2):
+                response = self.client.post('/users/coinflip/', {"discord_id": self.user.discord_id, "username": "TestUser", "bet": 40, "side": "heads", "count": 5}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([game['result'] for game in response.data['games']], ["heads", "tails", "tails", "tails"])
+        self.assertEqual(response.data['summary'], {"played": 4, "wins": 1, "net": -80, "stopped_early": True})
+        self.assertEqual(response.data['balance'], 20)
+
+    def test_slots_batch_stop_loss(self):
+        '''
+        Test that a batch of slot spins stops once the loss limit is reached.
+        '''
+        spins = [('🍒', '🍒', '🍒'), ('🍒', '🍋', '🍒'), ('🍒', '🍋', '🍒'), ('🍒', '🍋', '🍒'), ('🍒', '🍋', '🍒')]
+        with patch.object(self.machine, 'spin_many', return_value=[self.machine.result(spin) for spin in spins]):
+            response = self.client.post('/users/slots/', {"discord_id": self.user.discord_id, "bet": 10, "count": 5, "stop_loss": 5}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['summary'], {"played": 5, "wins": 1, "net": -10, "stopped_early": False})
+
+        with patch.object(self.machine, 'spin_many', return_value=[self.machine.result(spin) for spin in spins[1:]]):
+            response = self.client.post('/users/slots/', {"discord_id": self.user.discord_id, "bet": 10, "count": 4, "stop_loss": 15}, format='json')
+        self.assertEqual(response.data['summary'], {"played": 2, "wins": 0, "net": -20, "stopped_early": True})
+        self.assertEqual(response.data['balance'], 70)
+
+class SlotMachineTestCase(TestCase):
+    def test_alias_table_matches_weights(self):
+        '''
+        Test that the alias table gives every index its weight of the probability mass.
+        '''
+        weights = [0.25, 0.25, 0.25, 0.18, 0.06, 0.01]
+        table = slots.AliasTable(weights)
+        mass = [0.0] * len(weights)
+        for column in range(len(table)):
+            mass[column] += table.probability[column] / len(table)
+            mass[table.alias[column]] += (1 - table.probability[column]) / len(table)
+        for expected, actual in zip(weights, mass):
+            self.assertAlmostEqual(expected, actual)
+
+    def test_payout_table(self):
+        '''
+        Test that the compiled payout table follows the machine's rules.
+        '''
+        machine = slots.get_machine('classic')
+        self.assertEqual(len(machine.payouts), 6 ** 3)
+        self.assertEqual(machine.result(('7️⃣', '7️⃣', '7️⃣')).multiplier, 10)
+        self.assertEqual(machine.result(('🍒', '🍒', '🍋')).multiplier, 2)
+        self.assertEqual(machine.result(('🔔', '🔔', '🍋')).multiplier, 1.5)
+        self.assertEqual(machine.result(('🍒', '🍋', '🍒')).multiplier, 0)
+        for index, symbols in enumerate(machine.outcomes):
+            self.assertEqual(machine.index(symbols), index)
+
+    def test_spin_many(self):
+        '''
+        Test that batched spins return valid outcomes with their payouts.
+        '''
+        machine = slots.get_machine()
+        spins = machine.spin_many(50, random.Random(7))
+        self.assertEqual(len(spins), 50)
+        for spin in spins:
+            self.assertEqual(spin, machine.result(spin.symbols))
+
+class SimulateGamblingTestCase(TestCase):
+    def run_simulation(self):
+        out = StringIO()
+        call_command('simulate_gambling', '--spins', '20000', '--chunk-size', '5000', '--players', '50', '--rounds', '20', '--seed', '3', stdout=out)
+        return [line for line in out.getvalue().splitlines() if 'finished in' not in line]
+
+    def test_simulation_is_reproducible(self):
+        '''
+        Test that the simulator reports every game and gives the same numbers for the same seed.
+        '''
+        lines = self.run_simulation()
+        self.assertTrue(any(line.startswith('slots') for line in lines))
+        self.assertTrue(any(line.startswith('coinflip') for line in lines))
+        self.assertEqual(sum('return to player' in line for line in lines), 2)
+        self.assertEqual(lines, self.run_simulation())
+
+class LedgerTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create(discord_id="12345", username="TestUser", money=100, xp=0)
+
+    def tearDown(self):
+        ledger.buffer.entries.clear()
+        ledger.buffer.failures = 0
+        ledger.buffer.retry_at = 0
+        if ledger.buffer.timer is not None:
+            ledger.buffer.timer.cancel()
+            ledger.buffer.timer = None
+
+    def test_entries_are_buffered(self):
+        '''
+        Test that ledger entries are held in memory and written with one bulk insert.
+        '''
+        with patch.object(ledger.buffer, 'batch_size', 3), patch.object(ledger.buffer, 'flush_interval', 3600):
+            for _ in range(2):
+                with self.captureOnCommitCallbacks(execute=True):
+                    wallet.apply(self.user.pk, money=-10, reason='coinflip')
+            self.assertEqual(LedgerEntry.objects.count(), 0)
+            self.assertEqual(len(ledger.buffer), 2)
+            self.assertIsNotNone(ledger.buffer.timer)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                wallet.apply(self.user.pk, money=25, xp=5, reason='adventure')
+        self.assertEqual(len(ledger.buffer), 0)
+        self.assertIsNone(ledger.buffer.timer)
+        self.assertEqual(LedgerEntry.objects.filter(user=self.user).count(), 3)
+
+        entries = list(ledger.history(self.user))
+        self.assertEqual(entries[0].reason, 'adventure')
+        self.assertEqual(entries[0].delta_money, 25)
+
+    def test_entries_of_deleted_users_are_dropped(self):
+        '''
+        Test that a buffered entry whose user was deleted is dropped without failing the request that flushes it.
+        '''
+        other_user = CustomUser.objects.create(discord_id="67890", username="OtherUser", money=100, xp=0)
+        with patch.object(ledger.buffer, 'batch_size', 2), patch.object(ledger.buffer, 'flush_interval', 3600):
+            with self.captureOnCommitCallbacks(execute=True):
+                wallet.apply(self.user.pk, money=-10, reason='coinflip')
+            response = self.client.delete('/users/delete_user/', {"discord_id": self.user.discord_id}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                with patch('users.views_gamble.flip_coins', return_value=["heads"]):
+                    response = self.client.post('/users/coinflip/', {"discord_id": other_user.discord_id, "username": "OtherUser", "bet": 10, "side": "heads"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(ledger.buffer), 0)
+        self.assertEqual(list(LedgerEntry.objects.values_list('user_id', 'delta_money')), [(other_user.pk, 10)])
+
+    def test_failed_flush_is_retried(self):
+        '''
+        Test that entries are queued again when the insert fails, and that reads flush the buffer first.
+        '''
+        with patch.object(ledger.buffer, 'flush_interval', 3600):
+            with self.captureOnCommitCallbacks(execute=True):
+                wallet.apply(self.user.pk, money=-10, reason='coinflip')
+
+            with patch.object(LedgerEntry.objects, 'bulk_create', side_effect=DatabaseError("disk I/O error")), self.assertLogs('users.ledger', 'ERROR'):
+                self.assertEqual(ledger.flush(), 0)
+            self.assertEqual(len(ledger.buffer), 1)
+
+            self.assertEqual([entry.delta_money for entry in ledger.history(self.user)], [-10])
+        self.assertEqual(len(ledger.buffer), 0)
+
+    def test_persistent_flush_failure_is_bounded(self):
+        '''
+        Test that a flush that keeps failing backs off, caps the buffer and drops entries after the retry limit.
+        '''
+        with patch.object(ledger.buffer, 'flush_interval', 3600), patch.object(ledger.buffer, 'max_retries', 3), patch.object(ledger.buffer, 'max_buffer', 2):
+            with self.captureOnCommitCallbacks(execute=True):
+                wallet.apply(self.user.pk, money=-10, reason='coinflip')
+
+            with patch.object(LedgerEntry.objects, 'bulk_create', side_effect=DatabaseError("constraint failed")):
+                with self.assertLogs('users.ledger', 'ERROR'):
+                    self.assertEqual(ledger.flush(), 0)
+                self.assertEqual(len(ledger.buffer), 1)
+                self.assertGreater(ledger.buffer.retry_at, time.monotonic())
+
+                with self.assertLogs('users.ledger', 'ERROR') as logs:
+                    for money in (1, 2, 3):
+                        with self.captureOnCommitCallbacks(execute=True):
+                            wallet.apply(self.user.pk, money=money, reason='adventure')
+                self.assertEqual([entry.delta_money for entry in ledger.buffer.entries], [2, 3])
+                self.assertIn("Dropped ledger entry: user=%d money=-10" % self.user.pk, "\n".join(logs.output))
+
+                with self.assertLogs('users.ledger', 'ERROR'):
+                    self.assertEqual(ledger.flush(), 0)
+                self.assertEqual(len(ledger.buffer), 2)
+                with self.assertLogs('users.ledger', 'ERROR') as logs:
+                    self.assertEqual(ledger.flush(), 0)
+                self.assertEqual(len(ledger.buffer), 0)
+                self.assertIn("after 3 attempts", "\n".join(logs.output))
+
+            self.assertEqual(ledger.buffer.failures, 0)
+        self.assertEqual(LedgerEntry.objects.count(), 0)
+
+    def test_failed_change_is_not_recorded(self):
+        '''
+        Test that a rejected bet leaves no ledger entry.
+        '''
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/users/coinflip/', {"discord_id": self.user.discord_id, "username": "TestUser", "bet": 101, "side": "heads"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(ledger.buffer), 0)
+
+    def test_totals(self):
+        '''
+        Test that totals sums the ledger per reason within a time window.
+        '''
+        with self.captureOnCommitCallbacks(execute=True):
+            with patch('users.views_gamble.flip_coins', return_value=["heads"]):
+                self.client.post('/users/coinflip/', {"discord_id": self.user.discord_id, "username": "TestUser", "bet": 40, "side": "heads"}, format='json')
+                self.client.post('/users/coinflip/', {"discord_id": self.user.discord_id, "username": "TestUser", "bet": 10, "side": "tails"}, format='json')
+            wallet.apply(self.user.pk, xp=7, reason='admin')
+        ledger.flush()
+
+        totals = ledger.totals(timezone.now() - timedelta(minutes=1), timezone.now() + timedelta(minutes=1))
+        self.assertEqual(totals, [
+            {"reason": "admin", "money": 0, "xp": 7, "count": 1},
+            {"reason": "coinflip", "money": 30, "xp": 0, "count": 2},
+        ])
@@ -19,8 +19,12 @@ urlpatterns = [
     path('coinflip/', views_gamble.CoinFlipBetView.as_view(), name='coinflip_bet'),
     path('slots/', views_gamble.SlotsView.as_view(), name='slots'),
     path('profile/', views_user.GetProfileView.as_view(), name='profile'),
+    path('snapshot/', views_user.UserSnapshotView.as_view(), name='snapshot'),
+    path('profiles/batch', views_user.ProfileBatchView.as_view(), name='profiles_batch'),
+    path('members/sync', views_user.MemberSyncView.as_view(), name='members_sync'),
     path('delete_user/', views_admin.DeleteUserView.as_view(), name='delete_user'),
     path('level_up/', views_user.LevelUpView.as_view(), name='level_up'),
     path('leaderboard/level', views_leaderboard.LevelLeaderboardView.as_view(), name='level_leaderboard'),
     path('leaderboard/money', views_leaderboard.MoneyLeaderboardView.as_view(), name='money_leaderboard'),
+    path('leaderboard/<str:kind>/rank', views_leaderboard.LeaderboardRankView.as_view(), name='leaderboard_rank'),
 ]
\ No newline at end of file
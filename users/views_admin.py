@@ -12,6 +12,7 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from .models import CustomUser
+from . import wallet
 
     
 class GiveMoneyView(APIView):
@@ -39,10 +40,11 @@ class GiveMoneyView(APIView):
         if not user:
             return Response({"error": "User not found."}, status=status.HTTP_404_NOT_FOUND)
 
-        user.money += amount
-        user.save()
+        balance = wallet.apply(user.pk, money=amount, reason='admin')
+        if balance is None:
+            return Response({"error": "User not found."}, status=status.HTTP_404_NOT_FOUND)
 
-        return Response({"message": f"Successfully added {amount} money to {user.username}'s account.", "balance": user.money}, status=status.HTTP_200_OK)
+        return Response({"message": f"Successfully added {amount} money to {user.username}'s account.", "balance": balance.money}, status=status.HTTP_200_OK)
     
 class GiveXPView(APIView):
     '''
@@ -69,10 +71,11 @@ class GiveXPView(APIView):
         if not user:
             return Response({"error": "User not found."}, status=status.HTTP_404_NOT_FOUND)
 
-        user.xp += amount
-        user.save()
+        balance = wallet.apply(user.pk, xp=amount, reason='admin')
+        if balance is None:
+            return Response({"error": "User not found."}, status=status.HTTP_404_NOT_FOUND)
 
-        return Response({"message": f"Successfully added {amount} xp to {user.username}'s account.", "xp": user.xp}, status=status.HTTP_200_OK)
+        return Response({"message": f"Successfully added {amount} xp to {user.username}'s account.", "xp": balance.xp}, status=status.HTTP_200_OK)
 
 class DeleteUserView(APIView):
     '''
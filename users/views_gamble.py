@@ -4,15 +4,59 @@ Author: Reagan Zierke
 Date: 2025-04-27
 Description: Views for the Users app.
 This file contains the views for gambling-related operations such as coin flip betting.
+Each view can play a batch of games in one request, the outcomes are drawn together and the
+net change is applied to the balance with a single wallet update.
 """
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from . import serializers as cereal
+from . import slots, wallet
 import random
 
 
+COIN_SIDES = ['heads', 'tails']
+
+
+def flip_coins(count):
+    '''
+    Returns count coin flip results.
+    '''
+
+    return random.choices(COIN_SIDES, k=count)
+
+
+def play_games(money, bet, changes, stop_loss=None):
+    '''
+    Plays a batch of games in order against a starting balance of money.
+    Play stops before a bet that the balance can't cover, or once the net loss reaches stop_loss.
+    Returns the number of games played, the net change, and the balance the user needs to play them.
+    '''
+
+    played = 0
+    net = 0
+    required = 0
+
+    for change in changes:
+        if money + net < bet:
+            break
+        required = max(required, bet - net)
+        net += change
+        played += 1
+        if stop_loss is not None and -net >= stop_loss:
+            break
+
+    return played, net, required
+
+
+def summarize(games, net, count):
+    return {
+        "played": len(games),
+        "wins": sum(1 for game in games if game['win']),
+        "net": net,
+        "stopped_early": len(games) < count,
+    }
 
 
 class CoinFlipBetView(APIView):
@@ -20,6 +64,7 @@ class CoinFlipBetView(APIView):
     View to place a bet on a coin flip.
     This view requires a discord_id, bet amount, and side (heads or tails) in the request data.
     It checks if the user has enough money to place the bet and updates their balance accordingly.
+    An optional count plays several flips at once and stop_loss ends the batch once that much has been lost.
     '''
 
     def post(self, request):
@@ -30,20 +75,24 @@ class CoinFlipBetView(APIView):
 
         serializer = cereal.CoinFlipBetSerializer(data=request.data)
         if serializer.is_valid():
-            bet = serializer.data.get('bet')
-            side = serializer.data.get('side')
+            bet = serializer.validated_data['bet']
+            side = serializer.validated_data['side'].lower()
+            count = serializer.validated_data['count']
 
-            result = random.choice(["heads", "tails"])
-            if result == side.lower():
-                serializer.user.money += bet  
-                win = True
-            else:
-                serializer.user.money -= bet 
-                win= False
+            games = [{"result": result, "win": result == side} for result in flip_coins(count)]
+            for game in games:
+                game['change'] = bet if game['win'] else -bet
 
-            serializer.user.save()
+            played, net, required = play_games(serializer.user.money, bet, [game['change'] for game in games], serializer.validated_data.get('stop_loss'))
+            games = games[:played]
 
-            return Response({"win": win, "balance": serializer.user.money, "result": result}, status=status.HTTP_200_OK)
+            balance = wallet.apply(serializer.user.pk, money=net, require_money=required, reason='coinflip')
+            if balance is None:
+                return Response({"error": {"non_field_errors": ["Insufficient funds."]}}, status=status.HTTP_400_BAD_REQUEST)
+
+            if count == 1:
+                return Response({"win": games[0]['win'], "balance": balance.money, "result": games[0]['result']}, status=status.HTTP_200_OK)
+            return Response({"games": games, "summary": summarize(games, net, count), "balance": balance.money}, status=status.HTTP_200_OK)
 
         else:
             return Response({"error": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
@@ -54,7 +103,8 @@ class SlotsView(APIView):
     View to play a slot machine game.
     This view requires a discord_id and bet amount in the request data.
     It checks if the user has enough money to place the bet and updates their balance accordingly.
-    The slot machine uses a weighted random choice for the third slot to increase the chances of winning.
+    The reels and payouts come from the machine picked with the optional machine field (see slots.py).
+    An optional count plays several spins at once and stop_loss ends the batch once that much has been lost.
     '''
 
     def post(self, request):
@@ -65,53 +115,34 @@ class SlotsView(APIView):
 
         serializer = cereal.SlotsSerializer(data=request.data)
         if serializer.is_valid():
-            bet = serializer.data.get('bet')
-            emojis = ['🍒', '🍋', '🍉', '🔔', '💎', '7️⃣']
-            weights = [0.25, 0.25, 0.25, 0.18, 0.06, 0.01]
-
-            slot1 = random.choice(emojis)
-            slot2 = random.choice(emojis)
-            slot3 = random.choices(emojis, weights=weights, k=1)[0] 
-
-            winning_combinations = {
-                ('7️⃣', '7️⃣', '7️⃣'): 10,
-                ('💎', '💎', '💎'): 5,
-                ('🔔', '🔔', '🔔'): 4,
-                ('🍉', '🍉', '🍉'): 3,
-                ('🍋', '🍋', '🍋'): 3,
-                ('🍒', '🍒', '🍒'): 3,
-                ('🍒', '🍒'): 2,
-            }
-
-            if (slot1, slot2, slot3) in winning_combinations:
-                win = True
-                multiplier = winning_combinations[(slot1, slot2, slot3)]
-            elif (slot1, slot2) in winning_combinations:
-                win = True
-                multiplier = winning_combinations[(slot1, slot2)]
-            elif slot1 == slot2:
-                win = True
-                multiplier = 1.5
-            else:
-                win = False
-
-            if win:
-                serializer.user.money += int(bet * multiplier)
-                serializer.user.save()
-                message = f"Congratulations! You won {int(bet * multiplier)} coins!"
-            else:
-                serializer.user.money -= bet
-                serializer.user.save()
-                message = f"Sorry, you lost {bet} coins."
-            
-            print(f"User {discord_id} played slots: {slot1}, {slot2}, {slot3}. Result: {message}")
-            return Response({"slots": [slot1, slot2, slot3], "message": message, "balance": serializer.user.money, "emojis": emojis, "win" : win}, status=status.HTTP_200_OK)
-
-            
-
-            
-            
-
-
-
-
+            bet = serializer.validated_data['bet']
+            count = serializer.validated_data['count']
+
+            machine = slots.get_machine(serializer.validated_data['machine'])
+
+            games = []
+            for spin in machine.spin_many(count):
+                win = spin.multiplier > 0
+                games.append({
+                    "slots": list(spin.symbols),
+                    "win": win,
+                    "change": int(bet * spin.multiplier) if win else -bet,
+                })
+
+            played, net, required = play_games(serializer.user.money, bet, [game['change'] for game in games], serializer.validated_data.get('stop_loss'))
+            games = games[:played]
+
+            balance = wallet.apply(serializer.user.pk, money=net, require_money=required, reason='slots')
+            if balance is None:
+                return Response({"error": {"non_field_errors": ["Insufficient funds."]}}, status=status.HTTP_400_BAD_REQUEST)
+
+            if count == 1:
+                game = games[0]
+                if game['win']:
+                    message = f"Congratulations! You won {game['change']} coins!"
+                else:
+                    message = f"Sorry, you lost {bet} coins."
+                return Response({"slots": game['slots'], "message": message, "balance": balance.money, "emojis": machine.symbols, "win": game['win']}, status=status.HTTP_200_OK)
+            return Response({"games": games, "summary": summarize(games, net, count), "balance": balance.money, "emojis": machine.symbols}, status=status.HTTP_200_OK)
+        else:
+            return Response({"error": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
@@ -1,29 +1,112 @@
+"""
+File: views_leaderboard.py
+Author: Reagan Zierke
+Date: 2025-04-27
+Description: Views for the Users app.
+This file contains the leaderboard views, the top of each board and a user's own position on it.
+"""
+
+from django.conf import settings
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from . import serializers as cereal
 from .models import CustomUser
+from . import leaderboards
+from core.conditional import conditional_response, make_etag, matches
+
+MAX_PAGE_SIZE = 100
+
 
-class LevelLeaderboardView(APIView):
+class LeaderboardPageView(APIView):
     '''
-    View to get the top 10 users by level.
-    This view returns a list of the top 10 users sorted by their level in descending order.
+    Base view for a paginated leaderboard.
+    Takes an optional limit (page size, default 10) and cursor (the next or previous token of another page)
+    in the request data or query string, and returns the page's ranked results with its next and previous tokens.
+    With the leaderboard cache enabled the ETag comes from the leaderboard's version, the cursor and the limit,
+    so a client holding the current page gets a 304 without the page being queried. Otherwise it is a hash of the page.
     '''
 
+    kind = None
+
     def get(self, request):
-        users = CustomUser.objects.all().order_by('-level')
-        users = users[:10]
-        serializer = cereal.CustomUserSerializer(users, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        limit = request.data.get('limit') or request.query_params.get('limit') or 10
+        cursor = request.data.get('cursor') or request.query_params.get('cursor')
+
+        try:
+            limit = int(limit)
+        except (TypeError, ValueError):
+            return Response({"error": "limit must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            return Response({"error": f"limit must be between 1 and {MAX_PAGE_SIZE}."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            if cursor is not None:
+                leaderboards.decode_cursor(cursor)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if settings.LEADERBOARD_CACHE_ENABLED:
+            etag = make_etag(leaderboards.version(self.kind), limit, cursor)
+            return conditional_response(request, etag, lambda: leaderboards.page(self.kind, limit, cursor), no_cache=True)
+
+        page = leaderboards.page(self.kind, limit, cursor)
+        return conditional_response(request, make_etag(page), lambda: page, no_cache=True)
+
+class LevelLeaderboardView(LeaderboardPageView):
+    '''
+    View to get the users by level, 10 per page by default.
+    Users are sorted by their total xp in descending order,
+    which orders by level first and breaks ties by the xp towards the next level.
+    '''
+
+    kind = 'level'
     
-class MoneyLeaderboardView(APIView):
+class MoneyLeaderboardView(LeaderboardPageView):
     '''
-    View to get the top 10 users by money.
-    This view returns a list of the top 10 users sorted by their level in descending order.
+    View to get the users by money, 10 per page by default.
+    Users are sorted by their money in descending order.
     '''
 
-    def get(self, request):
-        users = CustomUser.objects.all().order_by('-money')
-        users = users[:10]
-        serializer = cereal.CustomUserSerializer(users, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
\ No newline at end of file
+    kind = 'money'
+
+class LeaderboardRankView(APIView):
+    '''
+    View to get a user's position on a leaderboard.
+    This view requires a discord_id in the request data and returns the user's rank with the users just ahead and behind.
+    '''
+
+    def get(self, request, kind):
+        discord_id = request.data.get('discord_id') or request.query_params.get('discord_id')
+
+        if not discord_id:
+            return Response({"error": "discord_id is required"}, status=status.HTTP_400_BAD_REQUEST)
+        if kind not in leaderboards.LEADERBOARDS:
+            return Response({"error": f"Unknown leaderboard '{kind}'."}, status=status.HTTP_404_NOT_FOUND)
+
+        if settings.LEADERBOARD_CACHE_ENABLED:
+            # Deleting the user bumps the version too, so a 304 never hides a missing user.
+            etag = make_etag(leaderboards.version(kind), discord_id)
+            if matches(request, etag):
+                return conditional_response(request, etag, None, private=True, no_cache=True)
+
+        user = CustomUser.objects.filter(discord_id=discord_id).first()
+        if not user:
+            return Response({"error": "User not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        rank = leaderboards.rank(kind, user)
+        above, below = leaderboards.neighbours(kind, user)
+
+        entries = cereal.CustomUserSerializer([*above, user, *below], many=True).data
+        for position, entry in enumerate(entries, start=rank - len(above)):
+            entry['rank'] = position
+
+        body = {
+            "kind": kind,
+            "rank": rank,
+            "user": entries[len(above)],
+            "neighbours": entries,
+        }
+        if not settings.LEADERBOARD_CACHE_ENABLED:
+            etag = make_etag(body)
+        return conditional_response(request, etag, lambda: body, private=True, no_cache=True)
@@ -11,6 +11,7 @@ from rest_framework.response import Response
 from rest_framework import status
 from . import serializers as cereal
 from .models import CustomUser
+from . import leveling, profiles, snapshot
 
 class GetProfileView(APIView):
     '''
@@ -37,16 +38,71 @@ class GetProfileView(APIView):
 
         if not created and user.username != username:
             user.username = username
-            user.save()
+            user.save(update_fields=['username'])
 
         serializer = cereal.CustomUserSerializer(user)
         return Response(serializer.data, status=status.HTTP_200_OK if not created else status.HTTP_201_CREATED)
 
+class UserSnapshotView(APIView):
+    '''
+    View to get everything the bot shows about a user in one request.
+    This view requires a discord_id in the request data, and takes an optional username.
+    It returns the profile, the best gear per bonus, the owned gear and the current adventure,
+    and gets or creates the user like GetProfileView.
+    '''
+
+    def post(self, request):
+        discord_id = request.data.get('discord_id')
+        username = request.data.get('username')
+        if not discord_id:
+            return Response({"error": "discord_id is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        user, created = snapshot.get_snapshot_user(discord_id, username)
+        return Response(snapshot.serialize_snapshot(user), status=status.HTTP_200_OK if not created else status.HTTP_201_CREATED)
+
+class ProfileBatchView(APIView):
+    '''
+    View to get the profiles of many users at once.
+    This view requires a list of discord_ids in the request data, and takes create_missing to create missing users.
+    It returns the profiles in the order of the ids, with the ids that are still missing and the ids that were created.
+    '''
+
+    def post(self, request):
+        serializer = cereal.ProfileBatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        discord_ids = profiles.unique(serializer.validated_data['discord_ids'])
+        users, created = profiles.get_profiles(discord_ids, create=serializer.validated_data['create_missing'])
+
+        found = [users[discord_id] for discord_id in discord_ids if discord_id in users]
+        return Response({
+            "profiles": cereal.CustomUserSerializer(found, many=True).data,
+            "missing": [discord_id for discord_id in discord_ids if discord_id not in users],
+            "created": created,
+        }, status=status.HTTP_200_OK)
+
+class MemberSyncView(APIView):
+    '''
+    View to register guild members in bulk.
+    This view requires a list of members, each with a discord_id and username, in the request data.
+    Missing users are created, changed usernames are updated, and the counts of each are returned.
+    '''
+
+    def post(self, request):
+        serializer = cereal.MemberSyncSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        # A member listed twice keeps the last username sent.
+        members = {member['discord_id']: member['username'] for member in serializer.validated_data['members']}
+        return Response(profiles.sync_members(members), status=status.HTTP_200_OK)
+
 class LevelUpView(APIView):
     '''
     View to level up a user.
     This view requires a discord_id in the request data.
-    It checks if the user has enough XP to level up and updates their level and XP accordingly.
+    It checks if the user has enough XP to level up and spends it on as many levels as it covers.
     '''
 
     def post(self, request):
@@ -58,10 +114,13 @@ class LevelUpView(APIView):
 
         if serializer.is_valid():
             user = serializer.user
-            user.xp -= user.xp_needed
-            user.level += 1
-            user.save()
-            new_xp_needed = user.xp_needed
-            return Response({"message": f"Congratulations! You leveled up to level {user.level}.", "xp" : user.xp, "level" : user.level, "xp_needed" : new_xp_needed}, status=status.HTTP_200_OK)
+            levels_gained = leveling.level_up(user)
+            if not levels_gained:
+                return Response({"error": {"non_field_errors": ["Not enough XP to level up."]}}, status=status.HTTP_400_BAD_REQUEST)
+
+            message = f"Congratulations! You leveled up to level {user.level}."
+            if levels_gained > 1:
+                message = f"Congratulations! You gained {levels_gained} levels and reached level {user.level}."
+            return Response({"message": message, "xp" : user.xp, "level" : user.level, "xp_needed" : user.xp_needed, "levels_gained": levels_gained}, status=status.HTTP_200_OK)
         else:
             return Response({"error": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
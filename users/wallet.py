@@ -0,0 +1,82 @@
+"""
+File: wallet.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Wallet service for the Users app.
+This file contains the single place where a user's money and xp are changed.
+Every change is one conditional UPDATE with the new balance returned by the same statement,
+so concurrent bets, purchases and rewards for the same user never overwrite each other.
+"""
+
+from collections import namedtuple
+from django.db import connection
+from django.db.models import F
+from .models import CustomUser
+from . import leaderboards, ledger
+
+Balance = namedtuple('Balance', ['money', 'xp'])
+
+
+def supports_update_returning():
+    '''
+    Returns True if the database can return columns from an UPDATE statement.
+    '''
+
+    if connection.vendor == 'postgresql':
+        return True
+    return connection.vendor == 'sqlite' and connection.features.can_return_columns_from_insert
+
+
+def apply(user_id, money=0, xp=0, require_money=0, reason=None):
+    '''
+    Adds money and xp (either may be negative) to a user in a single conditional UPDATE.
+    The change only applies if the user has at least require_money beforehand and money would not go below zero.
+    If a reason is given, the change is recorded in the ledger.
+    Returns the new Balance, or None if the user does not exist or does not have enough money.
+    '''
+
+    minimum = max(require_money, -money, 0)
+
+    if not supports_update_returning():
+        updated = CustomUser.objects.filter(pk=user_id, money__gte=minimum).update(
+            money=F('money') + money,
+            xp=F('xp') + xp,
+            total_xp=F('total_xp') + xp,
+        )
+        if not updated:
+            return None
+        row = CustomUser.objects.filter(pk=user_id).values_list('money', 'xp', 'total_xp').get()
+        return changed(user_id, row, money, xp, reason)
+
+    quote = connection.ops.quote_name
+    table = quote(CustomUser._meta.db_table)
+    pk_column = quote(CustomUser._meta.pk.column)
+    money_column = quote(CustomUser._meta.get_field('money').column)
+    xp_column = quote(CustomUser._meta.get_field('xp').column)
+    total_xp_column = quote(CustomUser._meta.get_field('total_xp').column)
+
+    sql = (
+        f"UPDATE {table} SET {money_column} = {money_column} + %s, {xp_column} = {xp_column} + %s, "
+        f"{total_xp_column} = {total_xp_column} + %s "
+        f"WHERE {pk_column} = %s AND {money_column} >= %s "
+        f"RETURNING {money_column}, {xp_column}, {total_xp_column}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [money, xp, xp, user_id, minimum])
+        row = cursor.fetchone()
+
+    if row is None:
+        return None
+    return changed(user_id, row, money, xp, reason)
+
+
+def changed(user_id, row, money, xp, reason):
+    '''
+    Records a successful change in the ledger and the leaderboard cache and returns the new Balance.
+    row holds the new money, xp and total_xp.
+    '''
+
+    if reason:
+        ledger.record(user_id, reason, money=money, xp=xp)
+    leaderboards.changed(user_id, money=row[0], xp=row[1], total_xp=row[2])
+    return Balance(row[0], row[1])